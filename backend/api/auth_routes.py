@@ -1,7 +1,15 @@
+from datetime import datetime
+
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
 
+from auth_cache import token_denylist, user_status_cache
+from auth_utils import role_required
+from database import db
 from models import User
+from passwords import HasherBusy, login_throttle, password_hasher
+
+ROLES = ("admin", "cashier", "waiter")
 
 auth_bp = Blueprint("auth_bp", __name__)
 
@@ -47,6 +55,12 @@ def login():
                   type: string
       401:
         description: Credenciales inválidas
+      403:
+        description: Usuario inactivo
+      429:
+        description: Demasiados intentos fallidos; ver Retry-After
+      503:
+        description: Demasiados inicios de sesión en proceso; ver Retry-After
     """
     data = request.get_json() or {}
     username = data.get("username")
@@ -55,12 +69,104 @@ def login():
     if not username or not password:
         return jsonify({"error": "username y password son obligatorios"}), 400
 
+    # Se rechaza antes de consultar la base de datos y de verificar el hash
+    retry_after = login_throttle.retry_after(username, request.remote_addr)
+    if retry_after:
+        response = jsonify({"error": "Demasiados intentos fallidos, intenta más tarde"})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 429
+
     user = User.query.filter_by(username=username).first()
-    if not user or not user.check_password(password):
+    try:
+        # Un usuario que no existe también paga una verificación completa
+        password_hash = user.password_hash if user is not None else password_hasher.dummy_hash()
+        valid = password_hasher.verify(password_hash, password) and user is not None
+    except HasherBusy:
+        response = jsonify({"error": "Demasiados inicios de sesión en proceso, intenta de nuevo"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    if not valid:
+        login_throttle.record_failure(username, request.remote_addr)
         return jsonify({"error": "Credenciales inválidas"}), 401
+    if user.active is False:
+        return jsonify({"error": "Usuario inactivo"}), 403
+
+    login_throttle.reset(username)
+    # Hashes creados con otro método o costo se regeneran con el configurado
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password_hash = password_hasher.hash(password)
+        db.session.commit()
 
     access_token = create_access_token(
         identity=user.id, additional_claims={"role": user.role, "username": user.username}
     )
 
     return jsonify({"access_token": access_token, "user": user.to_dict()})
+
+
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    """
+    Revoca el token actual; deja de ser válido aunque no haya expirado.
+    ---
+    tags:
+      - auth
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Sesión cerrada
+    """
+    claims = get_jwt()
+    token_denylist.revoke(claims["jti"], datetime.utcfromtimestamp(claims["exp"]))
+    return jsonify({"message": "Sesión cerrada"})
+
+
+@auth_bp.route("/users/<int:user_id>", methods=["PUT"])
+@role_required("admin")
+def update_user(user_id):
+    """
+    Activa/desactiva un usuario o cambia su rol. Aplica de inmediato en este
+    proceso y en los demás workers en cuanto expira su caché
+    (AUTH_CACHE_TTL_SECONDS).
+    ---
+    tags:
+      - auth
+    parameters:
+      - in: path
+        name: user_id
+        type: integer
+        required: true
+      - in: body
+        name: body
+        schema:
+          type: object
+          properties:
+            active: {type: boolean}
+            role:
+              type: string
+              enum: [admin, cashier, waiter]
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Usuario actualizado
+      400:
+        description: Datos inválidos
+      404:
+        description: Usuario no encontrado
+    """
+    user = User.query.get_or_404(user_id)
+    data = request.get_json() or {}
+
+    if "role" in data:
+        if data["role"] not in ROLES:
+            return jsonify({"error": f"role debe ser uno de: {', '.join(ROLES)}"}), 400
+        user.role = data["role"]
+    if "active" in data:
+        user.active = bool(data["active"])
+
+    db.session.commit()
+    user_status_cache.invalidate(user.id)
+    return jsonify(user.to_dict())
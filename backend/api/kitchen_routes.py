@@ -0,0 +1,47 @@
+from flask import Blueprint, jsonify, request
+
+from auth_utils import role_required
+from kitchen import kitchen_index
+
+kitchen_bp = Blueprint("kitchen_bp", __name__)
+
+
+@kitchen_bp.route("/queue", methods=["GET"])
+@role_required("admin", "cashier", "waiter")
+def get_kitchen_queue():
+    """
+    Líneas pendientes de las órdenes abiertas, agrupadas por estación
+    (categoría del menú). Las pantallas de cocina consultan con
+    `since=<version>` (la `version` de la respuesta anterior) y reciben solo
+    las líneas nuevas o modificadas y los ids de las que ya no están
+    pendientes. Se responde desde memoria; con el broker local cada
+    consulta revisa además una marca de las órdenes abiertas para ver los
+    cambios hechos en otros workers.
+    ---
+    tags:
+      - kitchen
+    parameters:
+      - in: query
+        name: since
+        type: string
+        required: false
+        description: "Versión recibida en la consulta anterior (epoch:n)"
+      - in: query
+        name: category
+        type: string
+        required: false
+        description: Solo una estación (p. ej. Tacos)
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: "version, full (true = lista completa), stations y removed"
+      400:
+        description: since inválido
+    """
+    try:
+        snapshot = kitchen_index.snapshot(request.args.get("since"), request.args.get("category"))
+    except ValueError:
+        return jsonify({"error": "since debe ser una versión recibida antes (epoch:n)"}), 400
+
+    return jsonify(snapshot)
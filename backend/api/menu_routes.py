@@ -1,12 +1,37 @@
-from flask import Blueprint, jsonify, request
+from decimal import Decimal, InvalidOperation
+
+from flask import Blueprint, current_app, jsonify, request
 
 from auth_utils import role_required
 from database import db
+from menu_cache import ALL_ITEMS_KEY, CATEGORIES_KEY, menu_cache
 from models import MenuItem
+from money import from_cents, to_cents
 
 menu_bp = Blueprint("menu_bp", __name__)
 
 
+def _parse_price(value) -> Decimal | None:
+    """Precio del JSON como Decimal en pesos; None si no es un importe válido."""
+    if isinstance(value, bool):
+        return None
+    try:
+        cents = to_cents(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return from_cents(cents) if cents >= 0 else None
+
+
+def _cached_response(key: str):
+    """Responde con el JSON pre-renderizado y su ETag (304 si no cambió)."""
+    body, etag = menu_cache.get(key)
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    # Los clientes pueden guardar la respuesta pero deben revalidarla
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 # ==========================
 # RUTAS DEL MENÚ
 # ==========================
@@ -44,13 +69,10 @@ def get_menu():
                 type: boolean
     """
     category = request.args.get("category")
-    query = MenuItem.query.filter_by(available=True)
 
     if category and category != "Todos":
-        query = query.filter_by(category=category)
-
-    items = query.all()
-    return jsonify([item.to_dict() for item in items])
+        return _cached_response(category)
+    return _cached_response(ALL_ITEMS_KEY)
 
 
 @menu_bp.route("/<int:item_id>", methods=["GET"])
@@ -110,7 +132,7 @@ def create_menu_item():
       201:
         description: Creado
       400:
-        description: Faltan campos obligatorios
+        description: Faltan campos obligatorios o precio inválido
       403:
         description: No autorizado (rol)
     """
@@ -120,9 +142,13 @@ def create_menu_item():
     if not all(field in data for field in required_fields):
         return jsonify({"error": "Faltan campos obligatorios"}), 400
 
+    price = _parse_price(data["price"])
+    if price is None:
+        return jsonify({"error": "El precio debe ser un número mayor o igual a 0"}), 400
+
     new_item = MenuItem(
         name=data["name"],
-        price=data["price"],
+        price=price,
         category=data["category"],
         description=data.get("description"),
         available=data.get("available", True),
@@ -130,6 +156,7 @@ def create_menu_item():
     )
 
     db.session.add(new_item)
+    menu_cache.bump_version()
     db.session.commit()
     return jsonify(new_item.to_dict()), 201
 
@@ -163,19 +190,27 @@ def update_menu_item(item_id):
     responses:
       200:
         description: Actualizado
+      400:
+        description: Precio inválido
       404:
         description: No encontrado
     """
     item = MenuItem.query.get_or_404(item_id)
     data = request.get_json() or {}
 
+    if "price" in data:
+        price = _parse_price(data["price"])
+        if price is None:
+            return jsonify({"error": "El precio debe ser un número mayor o igual a 0"}), 400
+        item.price = price
+
     item.name = data.get("name", item.name)
-    item.price = data.get("price", item.price)
     item.category = data.get("category", item.category)
     item.description = data.get("description", item.description)
     item.available = data.get("available", item.available)
     item.image_url = data.get("image_url", item.image_url)
 
+    menu_cache.bump_version()
     db.session.commit()
     return jsonify(item.to_dict())
 
@@ -203,6 +238,7 @@ def delete_menu_item(item_id):
     """
     item = MenuItem.query.get_or_404(item_id)
     db.session.delete(item)
+    menu_cache.bump_version()
     db.session.commit()
     return jsonify({"message": "Item eliminado correctamente"}), 200
 
@@ -222,5 +258,4 @@ def get_categories():
           items:
             type: string
     """
-    categories = db.session.query(MenuItem.category).distinct().all()
-    return jsonify([cat[0] for cat in categories])
+    return _cached_response(CATEGORIES_KEY)
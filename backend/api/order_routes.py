@@ -1,61 +1,136 @@
-from datetime import date, datetime
-from decimal import Decimal, ROUND_HALF_UP
-
-from flask import Blueprint, jsonify, request, send_file
-from sqlalchemy import func
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    send_file,
+    stream_with_context,
+    url_for,
+)
+from sqlalchemy import insert, update
 
 from auth_utils import role_required, get_current_user_id
 from database import db
-from models import DailySales, MenuItem, Order, OrderItem
-from utils.ticket_generator import TicketGenerator
+from events import event_bus, parse_event_id
+from exports import export_query, stream_csv, stream_ndjson
+from models import MenuItem, Order, OrderItem
+from replica import read_only
+from rollups import record_order
+from serializers import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    order_load_options,
+    paginate_orders,
+    parse_fields,
+    serialize_order,
+    serialize_orders,
+    ticket_data,
+)
+from ticket_batch import batch_orders, stream_pdf, stream_zip
+from ticket_numbers import ticket_allocator
+from ticket_queue import RENDERING, QueueFull, ticket_queue
+from money import from_cents, to_cents
+from totals import apply_subtotal_delta
+from utils.escpos import EscPosGenerator
 
 order_bp = Blueprint("order_bp", __name__)
-_ticket_generator = TicketGenerator()
 
+_escpos_generator = EscPosGenerator()
 
-def _quantize(value: Decimal) -> Decimal:
-    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
+def _build_order_lines(items_payload: list) -> tuple[list, int, list]:
+    """
+    Resuelve todos los productos solicitados con una sola consulta IN.
 
-def _recalculate_order_totals(order: Order) -> None:
-    """Recalcula los totales de una orden basándose en sus items."""
-    subtotal_dec = Decimal("0.00")
-    
-    for item in order.items:
-        subtotal_dec += Decimal(str(item.subtotal))
-    
-    iva_dec = _quantize(subtotal_dec * Decimal("0.16"))
-    total_dec = _quantize(subtotal_dec + iva_dec)
-    
-    order.subtotal = float(subtotal_dec)
-    order.iva = float(iva_dec)
-    order.total = float(total_dec)
-
-
-def _update_daily_sales(order: Order) -> None:
-    """Actualiza el resumen de ventas diarias."""
-    today = date.today()
-    daily_sales = DailySales.query.filter_by(date=today).first()
-
-    if not daily_sales:
-        daily_sales = DailySales(
-            date=today,
-            total_orders=0,
-            total_sales=0.0,
-            total_iva=0.0,
-            cash_sales=0.0,
-            card_sales=0.0,
+    Devuelve `(lineas, subtotal_lineas, ids_no_disponibles)`: las líneas
+    listas para insertar (sin `order_id`), la suma de sus subtotales en
+    centavos y todos los ids que no existen o no están disponibles.
+    """
+    requested_ids = {item_data.get("id") for item_data in items_payload}
+    menu_items = {
+        menu_item.id: menu_item
+        for menu_item in MenuItem.query.filter(
+            MenuItem.id.in_(requested_ids), MenuItem.available.is_(True)
+        )
+    }
+
+    unavailable = sorted(
+        {item_id for item_id in requested_ids if item_id not in menu_items}, key=str
+    )
+    if unavailable:
+        return [], 0, unavailable
+
+    lines = []
+    lines_subtotal = 0
+    for item_data in items_payload:
+        menu_item = menu_items[item_data.get("id")]
+        quantity = int(item_data.get("quantity", 1))
+        line_total = to_cents(menu_item.price) * quantity
+        lines_subtotal += line_total
+
+        lines.append(
+            {
+                "menu_item_id": menu_item.id,
+                "quantity": quantity,
+                "unit_price": menu_item.price,
+                "subtotal": from_cents(line_total),
+                "notes": item_data.get("notes"),
+            }
         )
-        db.session.add(daily_sales)
+    return lines, lines_subtotal, []
+
+
+def _unavailable_response(unavailable: list):
+    return (
+        jsonify(
+            {
+                "error": "Productos no disponibles: "
+                + ", ".join(str(item_id) for item_id in unavailable),
+                "unavailable_ids": unavailable,
+            }
+        ),
+        400,
+    )
+
+
+def _insert_order_lines(order: Order, lines: list) -> list[int]:
+    """
+    Inserta todas las líneas de una orden con un solo INSERT multi-fila.
+    Devuelve los ids de las líneas nuevas.
+    """
+    new_ids = db.session.execute(
+        insert(OrderItem).returning(OrderItem.id),
+        [dict(line, order_id=order.id) for line in lines],
+    ).scalars().all()
+    # La colección en memoria ya no refleja la base de datos
+    db.session.expire(order, ["items"])
+    return new_ids
+
+
+def _publish(event_type: str, payload: dict, **delta) -> None:
+    """
+    Publica un cambio de orden para los clientes SSE: los datos de la orden
+    (sin líneas) más solo lo que cambió. Se llama después del commit.
+    """
+    order = {key: value for key, value in payload.items() if key != "items"}
+    event_bus.publish(event_type, {"order": order, **delta})
+
 
-    daily_sales.total_orders += 1
-    daily_sales.total_sales += order.total
-    daily_sales.total_iva += order.iva
+def _ticket_pending_response(order: Order):
+    status_url = url_for("order_bp.ticket_status", order_id=order.id)
+    response = jsonify({"status": RENDERING, "version": order.version, "status_url": status_url})
+    response.headers["Location"] = status_url
+    response.headers["Retry-After"] = "1"
+    return response, 202
 
-    if order.payment_method == "cash":
-        daily_sales.cash_sales += order.total
-    elif order.payment_method == "card":
-        daily_sales.card_sales += order.total
+
+def _bump_version(order: Order) -> None:
+    """Marca un cambio en la orden; invalida los tickets ya renderizados."""
+    order.version = Order.version + 1
 
 
 @order_bp.route("/", methods=["POST"])
@@ -123,20 +198,30 @@ def create_order():
         if not data.get("delivery_phone") or not data.get("delivery_address"):
             return jsonify({"error": "Para órdenes a domicilio se requiere teléfono y dirección"}), 400
 
-    # Obtener el último número de ticket
-    last_order = Order.query.order_by(Order.ticket_number.desc()).first()
-    new_ticket_number = (last_order.ticket_number + 1) if last_order else 1
+    # Validar todos los productos antes de reservar número de ticket
+    items_payload = data.get("items", [])
+    lines = []
+    if items_payload:
+        lines, lines_subtotal, unavailable = _build_order_lines(items_payload)
+        if unavailable:
+            return _unavailable_response(unavailable)
+        # Liberar la conexión de la lectura: el ticket se reserva con otra
+        db.session.commit()
+
+    # Reservar número de ticket (contador atómico, sin leer la tabla de órdenes)
+    ticket_scope, new_ticket_number = ticket_allocator.allocate()
 
     # Crear orden con status "open"
     new_order = Order(
         ticket_number=new_ticket_number,
+        ticket_scope=ticket_scope,
         customer_name=data.get("customer_name", "Cliente General"),
         order_type=order_type,
         delivery_phone=data.get("delivery_phone"),
         delivery_address=data.get("delivery_address"),
-        subtotal=0.0,
-        iva=0.0,
-        total=0.0,
+        subtotal=0,
+        iva=0,
+        total=0,
         payment_method=data.get("payment_method", "cash"),
         status="open",
         created_by_user_id=user_id,
@@ -147,34 +232,15 @@ def create_order():
     db.session.flush()
 
     # Agregar items iniciales si se proporcionan
-    items_payload = data.get("items", [])
-    if items_payload:
-        for item_data in items_payload:
-            menu_item = MenuItem.query.get(item_data.get("id"))
-            if not menu_item or not menu_item.available:
-                db.session.rollback()
-                return jsonify({"error": f"Producto {item_data.get('id')} no disponible"}), 400
-
-            quantity = int(item_data.get("quantity", 1))
-            unit_price = Decimal(str(menu_item.price))
-            line_total = _quantize(unit_price * quantity)
-
-            order_item = OrderItem(
-                order_id=new_order.id,
-                menu_item_id=menu_item.id,
-                quantity=quantity,
-                unit_price=float(unit_price),
-                subtotal=float(line_total),
-                notes=item_data.get("notes"),
-            )
-            db.session.add(order_item)
-
-        # Recalcular totales
-        db.session.flush()
-        _recalculate_order_totals(new_order)
+    if lines:
+        _insert_order_lines(new_order, lines)
+        apply_subtotal_delta(new_order, lines_subtotal)
 
     db.session.commit()
-    return jsonify(new_order.to_dict()), 201
+
+    payload = serialize_order(new_order.id)
+    _publish("order_created", payload, items=payload["items"])
+    return jsonify(payload), 201
 
 
 @order_bp.route("/<int:order_id>/items", methods=["POST"])
@@ -226,31 +292,21 @@ def add_items_to_order(order_id):
     if not items_payload:
         return jsonify({"error": "Se requieren items para agregar"}), 400
 
-    # Agregar nuevos items
-    for item_data in items_payload:
-        menu_item = MenuItem.query.get(item_data.get("id"))
-        if not menu_item or not menu_item.available:
-            return jsonify({"error": f"Producto {item_data.get('id')} no disponible"}), 400
-
-        quantity = int(item_data.get("quantity", 1))
-        unit_price = Decimal(str(menu_item.price))
-        line_total = _quantize(unit_price * quantity)
-
-        order_item = OrderItem(
-            order_id=order.id,
-            menu_item_id=menu_item.id,
-            quantity=quantity,
-            unit_price=float(unit_price),
-            subtotal=float(line_total),
-            notes=item_data.get("notes"),
-        )
-        db.session.add(order_item)
+    lines, lines_subtotal, unavailable = _build_order_lines(items_payload)
+    if unavailable:
+        return _unavailable_response(unavailable)
 
-    db.session.flush()
-    _recalculate_order_totals(order)
+    # Agregar nuevos items
+    new_ids = set(_insert_order_lines(order, lines))
+    apply_subtotal_delta(order, lines_subtotal)
+    _bump_version(order)
     db.session.commit()
 
-    return jsonify(order.to_dict())
+    payload = serialize_order(order.id)
+    _publish(
+        "items_added", payload, items=[item for item in payload["items"] if item["id"] in new_ids]
+    )
+    return jsonify(payload)
 
 
 @order_bp.route("/<int:order_id>/items/<int:item_id>", methods=["DELETE"])
@@ -287,13 +343,16 @@ def remove_item_from_order(order_id, item_id):
 
     order_item = OrderItem.query.filter_by(id=item_id, order_id=order_id).first_or_404()
     
+    removed_subtotal = to_cents(order_item.subtotal)
     db.session.delete(order_item)
-    db.session.flush()
     
-    _recalculate_order_totals(order)
+    apply_subtotal_delta(order, -removed_subtotal)
+    _bump_version(order)
     db.session.commit()
 
-    return jsonify(order.to_dict())
+    payload = serialize_order(order.id)
+    _publish("item_removed", payload, item_id=item_id)
+    return jsonify(payload)
 
 
 @order_bp.route("/<int:order_id>/items/<int:item_id>", methods=["PUT"])
@@ -344,17 +403,24 @@ def update_order_item(order_id, item_id):
         if new_quantity <= 0:
             return jsonify({"error": "La cantidad debe ser mayor a 0"}), 400
         
+        old_subtotal = to_cents(order_item.subtotal)
+        new_subtotal = to_cents(order_item.unit_price) * new_quantity
+
         order_item.quantity = new_quantity
-        order_item.subtotal = float(_quantize(Decimal(str(order_item.unit_price)) * new_quantity))
+        order_item.subtotal = from_cents(new_subtotal)
+        apply_subtotal_delta(order, new_subtotal - old_subtotal)
     
     if "notes" in data:
         order_item.notes = data["notes"]
     
-    db.session.flush()
-    _recalculate_order_totals(order)
+    _bump_version(order)
     db.session.commit()
 
-    return jsonify(order.to_dict())
+    payload = serialize_order(order.id)
+    _publish(
+        "item_updated", payload, item=next(item for item in payload["items"] if item["id"] == item_id)
+    )
+    return jsonify(payload)
 
 
 @order_bp.route("/<int:order_id>/complete", methods=["PUT"])
@@ -396,28 +462,49 @@ def complete_order(order_id):
 
     data = request.get_json() or {}
     
+    # Cambio de status condicionado a que siga abierto: si dos cajeros cobran
+    # el mismo ticket a la vez, solo uno lo completa y lo suma a las ventas.
+    values = {
+        "status": "completed",
+        "completed_at": datetime.utcnow(),
+        "version": Order.version + 1,
+    }
     # Actualizar método de pago si se proporciona
     if "payment_method" in data:
-        order.payment_method = data["payment_method"]
+        values["payment_method"] = data["payment_method"]
 
-    order.status = "completed"
-    order.completed_at = datetime.utcnow()
+    result = db.session.execute(
+        update(Order).where(Order.id == order.id, Order.status == "open").values(**values)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        return jsonify({"error": "Solo se pueden completar tickets abiertos"}), 400
     
-    # Actualizar ventas diarias
-    _update_daily_sales(order)
+    # Actualizar ventas diarias y acumulados por hora y por producto
+    record_order(order)
     
     db.session.commit()
-    return jsonify(order.to_dict())
+
+    # El ticket se renderiza en segundo plano mientras se cobra
+    ticket_queue.prerender(order.id)
+
+    payload = serialize_order(order.id)
+    _publish("order_completed", payload)
+    return jsonify(payload)
 
 
 @order_bp.route("/", methods=["GET"])
 @role_required("admin", "cashier", "waiter")
+@read_only
 def get_orders():
     """
-    Obtiene todas las órdenes con filtros opcionales:
+    Obtiene órdenes paginadas (más recientes primero) con filtros opcionales:
     - ?date=YYYY-MM-DD
     - ?status=open|completed|cancelled
     - ?order_type=local|takeout|delivery
+    - ?limit=N (máximo 200)
+    - ?cursor=<next_cursor de la página anterior>
+    - ?fields=id,ticket_number,total (omite items/created_by si no se piden)
     ---
     tags:
       - orders
@@ -431,30 +518,67 @@ def get_orders():
       - in: query
         name: order_type
         type: string
+      - in: query
+        name: limit
+        type: integer
+        default: 50
+      - in: query
+        name: cursor
+        type: string
+      - in: query
+        name: fields
+        type: string
     security:
       - BearerAuth: []
     responses:
       200:
-        description: Lista de órdenes
+        description: Página de órdenes y cursor de la siguiente página
+        schema:
+          type: object
+          properties:
+            orders:
+              type: array
+              items:
+                type: object
+            next_cursor:
+              type: string
+      400:
+        description: Parámetros inválidos
     """
     date_filter = request.args.get("date")
     status = request.args.get("status")
     order_type = request.args.get("order_type")
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+
+    if limit <= 0:
+        return jsonify({"error": "El límite debe ser mayor a 0"}), 400
+    limit = min(limit, MAX_PAGE_SIZE)
 
-    query = Order.query
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return jsonify({"error": f"Campos desconocidos: {exc}"}), 400
+
+    criteria = []
 
     if date_filter:
-        target_date = datetime.strptime(date_filter, "%Y-%m-%d").date()
-        query = query.filter(func.date(Order.created_at) == target_date)
+        day_start = datetime.strptime(date_filter, "%Y-%m-%d")
+        day_end = day_start + timedelta(days=1)
+        # Rango semiabierto [inicio, fin) para que se use el índice de created_at
+        criteria += [Order.created_at >= day_start, Order.created_at < day_end]
 
     if status:
-        query = query.filter_by(status=status)
+        criteria.append(Order.status == status)
     
     if order_type:
-        query = query.filter_by(order_type=order_type)
+        criteria.append(Order.order_type == order_type)
+
+    try:
+        page = paginate_orders(criteria, request.args.get("cursor"), limit, fields)
+    except ValueError:
+        return jsonify({"error": "Cursor inválido"}), 400
 
-    orders = query.order_by(Order.created_at.desc()).all()
-    return jsonify([order.to_dict() for order in orders])
+    return jsonify(page)
 
 
 @order_bp.route("/open", methods=["GET"])
@@ -469,10 +593,66 @@ def get_open_orders():
       - BearerAuth: []
     responses:
       200:
-        description: Lista de órdenes abiertas
+        description: Lista de órdenes abiertas (header X-Last-Event-ID)
+    """
+    # Id del último evento antes de leer: el cliente se suscribe a /events
+    # con ese Last-Event-ID y no pierde cambios entre la lectura y el stream.
+    last_event_id = event_bus.broker.latest_id()
+    response = jsonify(serialize_orders([Order.status == "open"], [Order.created_at.desc()]))
+    response.headers["X-Last-Event-ID"] = last_event_id
+    return response
+
+
+@order_bp.route("/events", methods=["GET"])
+@role_required("admin", "cashier", "waiter")
+def order_events():
+    """
+    Flujo Server-Sent Events con los cambios de órdenes, en lugar de
+    consultar /open periódicamente. Eventos: order_created, items_added,
+    item_updated, item_removed, order_completed, order_cancelled y resync
+    (el cliente debe volver a pedir /open). Para reanudar se envía el
+    header Last-Event-ID (o el parámetro last_event_id).
+    ---
+    tags:
+      - orders
+    produces:
+      - text/event-stream
+    parameters:
+      - in: header
+        name: Last-Event-ID
+        type: string
+        description: Id `epoch:n` del último evento recibido
+      - in: query
+        name: last_event_id
+        type: string
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Flujo de eventos
+      400:
+        description: Last-Event-ID inválido
     """
-    orders = Order.query.filter_by(status="open").order_by(Order.created_at.desc()).all()
-    return jsonify([order.to_dict() for order in orders])
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if last_id and last_id.isdigit():
+        # Id numérico de clientes anteriores a los epochs: nunca es de este
+        # arranque, así que se trata como de otro epoch (resync)
+        last_id = f"0:{last_id}"
+    if last_id:
+        try:
+            parse_event_id(last_id)
+        except ValueError:
+            return jsonify({"error": "Last-Event-ID debe ser un id recibido antes (epoch:n)"}), 400
+    else:
+        last_id = None
+
+    stream = event_bus.stream(last_id, current_app.config.get("EVENTS_KEEPALIVE_SECONDS", 15))
+    return Response(
+        stream,
+        mimetype="text/event-stream",
+        # Sin buffers intermedios (nginx) para que cada evento salga al momento
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @order_bp.route("/<int:order_id>", methods=["GET"])
@@ -496,8 +676,7 @@ def get_order(order_id):
       404:
         description: No encontrada
     """
-    order = Order.query.get_or_404(order_id)
-    return jsonify(order.to_dict())
+    return jsonify(serialize_order(order_id))
 
 
 @order_bp.route("/<int:order_id>/cancel", methods=["PUT"])
@@ -518,68 +697,305 @@ def cancel_order(order_id):
     responses:
       200:
         description: Orden cancelada
+      400:
+        description: La orden cambió de status durante la cancelación
       404:
         description: No encontrada
     """
     order = Order.query.get_or_404(order_id)
-    order.status = "cancelled"
-    db.session.commit()
-    return jsonify(order.to_dict())
+    previous_status = order.status
+
+    if previous_status != "cancelled":
+        result = db.session.execute(
+            update(Order)
+            .where(Order.id == order.id, Order.status == previous_status)
+            .values(status="cancelled", version=Order.version + 1)
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            return jsonify({"error": "La orden cambió de status, intenta de nuevo"}), 400
+
+        # Una venta ya registrada se descuenta de las ventas del día y de los acumulados
+        if previous_status == "completed":
+            record_order(order, sign=-1)
+
+        db.session.commit()
+
+        payload = serialize_order(order.id)
+        _publish("order_cancelled", payload, previous_status=previous_status)
+        return jsonify(payload)
+
+    return jsonify(serialize_order(order.id))
 
 
 @order_bp.route("/<int:order_id>/ticket", methods=["GET"])
 @role_required("admin", "cashier")
 def download_ticket(order_id):
     """
-    Genera y descarga el ticket PDF de una orden.
+    Descarga el ticket PDF de una orden.
+    Si el ticket aún no está listo se encola su renderizado y se responde
+    202 con la URL para consultar su estado. Con `format=escpos` se
+    devuelve el ticket como comandos ESC/POS (se genera al momento).
     ---
     tags:
       - orders
     produces:
       - application/pdf
+      - application/octet-stream
     parameters:
       - in: path
         name: order_id
         type: integer
         required: true
+      - in: query
+        name: format
+        type: string
+        enum: [pdf, escpos]
+        default: pdf
+        description: escpos devuelve comandos crudos para impresora térmica
     security:
       - BearerAuth: []
     responses:
       200:
-        description: Ticket PDF
+        description: Ticket PDF (o ESC/POS)
+      400:
+        description: Formato inválido
+      202:
+        description: Ticket en proceso de renderizado
       404:
         description: Orden no encontrada
+      503:
+        description: Cola de renderizado llena
     """
-    order = Order.query.get_or_404(order_id)
-    
-    order_data = {
-        "ticket_number": order.ticket_number,
-        "customer_name": order.customer_name,
-        "order_type": order.order_type,
-        "delivery_phone": order.delivery_phone,
-        "delivery_address": order.delivery_address,
-        "items": [
-            {
-                "name": item.menu_item.name,
-                "quantity": item.quantity,
-                "price": item.unit_price,
-                "notes": item.notes,
-            }
-            for item in order.items
-        ],
-        "subtotal": order.subtotal,
-        "iva": order.iva,
-        "total": order.total,
-        "payment_method": order.payment_method,
-    }
+    ticket_format = request.args.get("format", "pdf")
+    if ticket_format not in ("pdf", "escpos"):
+        return jsonify({"error": "format debe ser pdf o escpos"}), 400
+
+    order = (
+        Order.query.options(*order_load_options())
+        .filter_by(id=order_id)
+        .first_or_404()
+    )
 
-    filepath = _ticket_generator.generate_ticket(order_data)
+    if ticket_format == "escpos":
+        # Unos cientos de bytes: más barato generarlo que encolarlo
+        data = _escpos_generator.render(ticket_data(order))
+        download_name = f"ticket_{order.ticket_number:04d}.bin"
+        order.printed = True
+        db.session.commit()
+        return send_file(
+            BytesIO(data),
+            mimetype="application/octet-stream",
+            as_attachment=True,
+            download_name=download_name,
+        )
+
+    # El PDF depende solo del contenido de la orden: se reutiliza mientras
+    # la versión no cambie. Marcarlo como impreso no cambia la versión.
+    cache = current_app.extensions["ticket_cache"]
+    cache_key = (order.id, order.version)
+    pdf = cache.get(cache_key)
+    if pdf is None:
+        try:
+            pdf = ticket_queue.submit(order)
+        except QueueFull:
+            response = jsonify({"error": "Hay demasiados tickets en proceso, intenta de nuevo"})
+            response.headers["Retry-After"] = "2"
+            return response, 503
+
+    if pdf is None:
+        return _ticket_pending_response(order)
+
+    download_name = f"ticket_{order.ticket_number:04d}.pdf"
     order.printed = True
     db.session.commit()
 
     return send_file(
-        filepath,
+        BytesIO(pdf),
         mimetype="application/pdf",
         as_attachment=True,
-        download_name=f"ticket_{order.ticket_number:04d}.pdf",
+        download_name=download_name,
+    )
+
+
+@order_bp.route("/<int:order_id>/ticket/status", methods=["GET"])
+@role_required("admin", "cashier")
+def ticket_status(order_id):
+    """
+    Estado del ticket PDF de la versión actual de una orden.
+    ---
+    tags:
+      - orders
+    parameters:
+      - in: path
+        name: order_id
+        type: integer
+        required: true
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: "status: ready | rendering | failed | missing"
+      404:
+        description: Orden no encontrada
+    """
+    order = Order.query.get_or_404(order_id)
+    return jsonify({
+        "status": ticket_queue.status(order),
+        "version": order.version,
+        "ticket_url": url_for("order_bp.download_ticket", order_id=order.id),
+    })
+
+
+@order_bp.route("/export", methods=["GET"])
+@role_required("admin")
+@read_only
+def export_orders():
+    """
+    Exporta el historial de órdenes para contabilidad, una fila por línea
+    de orden. Se genera y envía por partes con memoria constante sin
+    importar el rango de fechas.
+    ---
+    tags:
+      - orders
+    produces:
+      - text/csv
+      - application/x-ndjson
+    parameters:
+      - in: query
+        name: from
+        type: string
+        description: Fecha inicial de creación (YYYY-MM-DD, incluida)
+      - in: query
+        name: to
+        type: string
+        description: Fecha final de creación (YYYY-MM-DD, incluida)
+      - in: query
+        name: status
+        type: string
+        enum: [open, completed, cancelled]
+      - in: query
+        name: format
+        type: string
+        enum: [csv, ndjson]
+        default: csv
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Archivo CSV o NDJSON
+      400:
+        description: Parámetros inválidos
+    """
+    export_format = request.args.get("format", "csv")
+    if export_format not in ("csv", "ndjson"):
+        return jsonify({"error": "format debe ser csv o ndjson"}), 400
+
+    try:
+        start = request.args.get("from")
+        start = datetime.strptime(start, "%Y-%m-%d") if start else None
+        end = request.args.get("to")
+        end = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1) if end else None
+    except ValueError:
+        return jsonify({"error": "from y to deben tener formato YYYY-MM-DD"}), 400
+
+    stmt = export_query(start, end, request.args.get("status"))
+    if export_format == "csv":
+        body, mimetype = stream_csv(stmt), "text/csv"
+    else:
+        body, mimetype = stream_ndjson(stmt), "application/x-ndjson"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=orders.{export_format}"},
+    )
+
+
+@order_bp.route("/tickets/batch", methods=["GET"])
+@role_required("admin", "cashier")
+@read_only
+def export_tickets():
+    """
+    Exporta en un solo archivo los tickets de las órdenes completadas de un
+    día o de una lista de ids (cierre del día). La respuesta se envía por
+    partes conforme se genera.
+    ---
+    tags:
+      - orders
+    produces:
+      - application/pdf
+      - application/zip
+    parameters:
+      - in: query
+        name: date
+        type: string
+        description: Fecha de creación (YYYY-MM-DD)
+      - in: query
+        name: ids
+        type: string
+        description: Ids de orden separados por coma
+      - in: query
+        name: format
+        type: string
+        enum: [pdf, zip]
+        default: pdf
+        description: pdf = un ticket por página; zip = un PDF por ticket
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Archivo con los tickets
+      400:
+        description: Parámetros inválidos
+      404:
+        description: No hay órdenes completadas que exportar
+    """
+    export_format = request.args.get("format", "pdf")
+    if export_format not in ("pdf", "zip"):
+        return jsonify({"error": "format debe ser pdf o zip"}), 400
+
+    date_filter = request.args.get("date")
+    ids_filter = request.args.get("ids")
+    if not date_filter and not ids_filter:
+        return jsonify({"error": "Se requiere date o ids"}), 400
+
+    try:
+        day = datetime.strptime(date_filter, "%Y-%m-%d").date() if date_filter else None
+    except ValueError:
+        return jsonify({"error": "date debe tener formato YYYY-MM-DD"}), 400
+    try:
+        ids = [int(value) for value in ids_filter.split(",")] if ids_filter else None
+    except ValueError:
+        return jsonify({"error": "ids debe ser una lista de enteros separados por coma"}), 400
+
+    orders = batch_orders(day, ids)
+    if not orders:
+        return jsonify({"error": "No hay órdenes completadas que exportar"}), 404
+
+    label = day.isoformat() if day else "seleccion"
+    if export_format == "zip":
+        body, mimetype = stream_zip(orders), "application/zip"
+    else:
+        body, mimetype = stream_pdf(orders), "application/pdf"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=tickets_{label}.{export_format}"},
     )
+
+
+@order_bp.route("/tickets/queue", methods=["GET"])
+@role_required("admin")
+def ticket_queue_metrics():
+    """
+    Métricas de la cola de renderizado de tickets de este proceso.
+    ---
+    tags:
+      - orders
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Profundidad de la cola, contadores y uso del caché
+    """
+    return jsonify(ticket_queue.metrics())
@@ -5,13 +5,16 @@ from sqlalchemy import func
 
 from auth_utils import role_required
 from database import db
-from models import DailySales, MenuItem, Order, OrderItem
+from models import DailyItemSales, DailySales, HourlySales, MenuItem, User
+from replica import read_only
+from rollups import as_local, hour_bucket, local_day_bounds
 
 report_bp = Blueprint("report_bp", __name__)
 
 
 @report_bp.route("/daily", methods=["GET"])
 @role_required("admin")
+@read_only
 def get_daily_report():
     """
     Obtiene el reporte de ventas del día.
@@ -55,9 +58,11 @@ def get_daily_report():
 
 @report_bp.route("/best-sellers", methods=["GET"])
 @role_required("admin")
+@read_only
 def get_best_sellers():
     """
     Obtiene los productos más vendidos en los últimos N días (default 7).
+    Lee los acumulados diarios por producto, por lo que cuenta días completos.
     ---
     tags:
       - reports
@@ -74,20 +79,22 @@ def get_best_sellers():
         description: Productos más vendidos
     """
     days = request.args.get("days", 7, type=int)
-    start_date = datetime.now() - timedelta(days=days)
+    start_date = (datetime.now() - timedelta(days=days)).date()
 
+    # Lee los acumulados diarios por producto (rango por fecha, sin unir órdenes)
+    total_sold = func.sum(DailyItemSales.quantity)
     result = (
         db.session.query(
             MenuItem.name,
             MenuItem.category,
-            func.sum(OrderItem.quantity).label("total_sold"),
-            func.sum(OrderItem.subtotal).label("total_revenue"),
+            total_sold.label("total_sold"),
+            func.sum(DailyItemSales.revenue).label("total_revenue"),
         )
-        .join(OrderItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(Order.created_at >= start_date, Order.status == "completed")
+        .join(DailyItemSales, DailyItemSales.menu_item_id == MenuItem.id)
+        .filter(DailyItemSales.date >= start_date)
         .group_by(MenuItem.id)
-        .order_by(func.sum(OrderItem.quantity).desc())
+        .having(total_sold > 0)
+        .order_by(total_sold.desc())
         .limit(10)
         .all()
     )
@@ -98,7 +105,7 @@ def get_best_sellers():
                 "name": r[0],
                 "category": r[1],
                 "total_sold": int(r[2]),
-                "total_revenue": float(r[3]),
+                "total_revenue": round(float(r[3]), 2),
             }
             for r in result
         ]
@@ -107,9 +114,11 @@ def get_best_sellers():
 
 @report_bp.route("/sales-by-category", methods=["GET"])
 @role_required("admin")
+@read_only
 def get_sales_by_category():
     """
     Obtiene ventas agrupadas por categoría en los últimos N días (default 7).
+    Lee los acumulados diarios por producto, por lo que cuenta días completos.
     ---
     tags:
       - reports
@@ -126,18 +135,19 @@ def get_sales_by_category():
         description: Ventas por categoría
     """
     days = request.args.get("days", 7, type=int)
-    start_date = datetime.now() - timedelta(days=days)
+    start_date = (datetime.now() - timedelta(days=days)).date()
 
+    items_sold = func.sum(DailyItemSales.line_count)
     result = (
         db.session.query(
             MenuItem.category,
-            func.count(OrderItem.id).label("items_sold"),
-            func.sum(OrderItem.subtotal).label("total_revenue"),
+            items_sold.label("items_sold"),
+            func.sum(DailyItemSales.revenue).label("total_revenue"),
         )
-        .join(OrderItem, OrderItem.menu_item_id == MenuItem.id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(Order.created_at >= start_date, Order.status == "completed")
+        .join(DailyItemSales, DailyItemSales.menu_item_id == MenuItem.id)
+        .filter(DailyItemSales.date >= start_date)
         .group_by(MenuItem.category)
+        .having(items_sold > 0)
         .all()
     )
 
@@ -146,8 +156,156 @@ def get_sales_by_category():
             {
                 "category": r[0],
                 "items_sold": int(r[1]),
-                "total_revenue": float(r[2]),
+                "total_revenue": round(float(r[2]), 2),
             }
             for r in result
         ]
     )
+
+
+_BREAKDOWN_COLUMNS = {
+    "order_type": HourlySales.order_type,
+    "payment_method": HourlySales.payment_method,
+    "user": HourlySales.created_by_user_id,
+}
+
+
+@report_bp.route("/hourly", methods=["GET"])
+@role_required("admin")
+@read_only
+def get_hourly_sales():
+    """
+    Obtiene las ventas por hora de un día local del servidor (lee solo los
+    acumulados por hora). Cada `hour` va en hora local con su offset
+    (p. ej. 2026-10-17T13:00:00-06:00).
+    ---
+    tags:
+      - reports
+    parameters:
+      - in: query
+        name: date
+        type: string
+        required: false
+        description: Día local en formato YYYY-MM-DD (default hoy)
+      - in: query
+        name: order_type
+        type: string
+        required: false
+      - in: query
+        name: payment_method
+        type: string
+        required: false
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Ventas agrupadas por hora
+    """
+    target_date_str = request.args.get("date")
+    if target_date_str:
+        target_date = datetime.strptime(target_date_str, "%Y-%m-%d").date()
+    else:
+        target_date = date.today()
+    # Los buckets están en UTC: se piden las horas UTC que cubren el día local
+    day_start, day_end = local_day_bounds(target_date)
+
+    query = db.session.query(
+        HourlySales.hour,
+        func.sum(HourlySales.total_orders).label("total_orders"),
+        func.sum(HourlySales.total_sales).label("total_sales"),
+    ).filter(HourlySales.hour >= day_start, HourlySales.hour < day_end)
+
+    for param in ("order_type", "payment_method"):
+        value = request.args.get(param)
+        if value:
+            query = query.filter(getattr(HourlySales, param) == value)
+
+    result = query.group_by(HourlySales.hour).order_by(HourlySales.hour).all()
+
+    return jsonify(
+        [
+            {
+                "hour": as_local(r[0]).isoformat(),
+                "total_orders": int(r[1]),
+                "total_sales": round(float(r[2]), 2),
+            }
+            for r in result
+            if r[1]
+        ]
+    )
+
+
+@report_bp.route("/breakdown", methods=["GET"])
+@role_required("admin")
+@read_only
+def get_sales_breakdown():
+    """
+    Ventas de los últimos N días (default 7) agrupadas por tipo de orden,
+    método de pago o usuario (lee solo los acumulados por hora).
+    ---
+    tags:
+      - reports
+    parameters:
+      - in: query
+        name: by
+        type: string
+        enum: [order_type, payment_method, user]
+        required: false
+        default: order_type
+      - in: query
+        name: days
+        type: integer
+        required: false
+        default: 7
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Ventas agrupadas
+      400:
+        description: Agrupación inválida
+    """
+    group_by = request.args.get("by", "order_type")
+    column = _BREAKDOWN_COLUMNS.get(group_by)
+    if column is None:
+        return jsonify({"error": "Agrupación inválida"}), 400
+
+    days = request.args.get("days", 7, type=int)
+    start_hour = hour_bucket(datetime.utcnow() - timedelta(days=days))
+
+    result = (
+        db.session.query(
+            column,
+            func.sum(HourlySales.total_orders).label("total_orders"),
+            func.sum(HourlySales.total_sales).label("total_sales"),
+            func.sum(HourlySales.total_iva).label("total_iva"),
+        )
+        .filter(HourlySales.hour >= start_hour)
+        .group_by(column)
+        .order_by(func.sum(HourlySales.total_sales).desc())
+        .all()
+    )
+
+    usernames = {}
+    if group_by == "user":
+        user_ids = [r[0] for r in result if r[0]]
+        usernames = dict(
+            db.session.query(User.id, User.username).filter(User.id.in_(user_ids))
+        )
+
+    rows = []
+    for r in result:
+        if not r[1]:
+            continue
+        # created_by_user_id = 0 agrupa las órdenes sin usuario
+        row = {
+            group_by: r[0] or None,
+            "total_orders": int(r[1]),
+            "total_sales": round(float(r[2]), 2),
+            "total_iva": round(float(r[3]), 2),
+        }
+        if group_by == "user":
+            row["username"] = usernames.get(r[0])
+        rows.append(row)
+
+    return jsonify(rows)
@@ -6,31 +6,63 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from werkzeug.utils import import_string
 from flasgger import Swagger
 
+from auth_cache import token_denylist, user_status_cache
+from commands import register_commands
 from config import DevelopmentConfig, config_by_name
-from database import db, init_db
+from database import configure_engine, db, init_db
 from errors import register_error_handlers
+from events import event_bus
+from kitchen import kitchen_index
+from menu_cache import menu_cache
+from passwords import login_throttle, password_hasher
+from replica import replica_router
+from ticket_numbers import ticket_allocator
+from ticket_queue import ticket_queue
+from utils.ticket_cache import TicketCache
 
 migrate = Migrate()
 jwt = JWTManager()
 
 
-def create_app(config_name: str | None = None) -> Flask:
-    """Crea y configura la aplicación Flask."""
+def create_app(config_name: str | None = None, config_overrides: dict | None = None) -> Flask:
+    """
+    Crea y configura la aplicación Flask.
+    `config_overrides` permite sobreescribir valores puntuales (p. ej. en tests).
+    """
     load_dotenv()
     app = Flask(__name__)
 
     env_name = config_name or os.getenv("FLASK_ENV") or os.getenv("ENV") or "development"
     app.config.from_object(config_by_name.get(env_name, DevelopmentConfig))
+    if config_overrides:
+        app.config.update(config_overrides)
+
+    # Serialización de las respuestas JSON (orjson si está instalado)
+    app.json = import_string(app.config.get("JSON_PROVIDER", "json_provider:FastJSONProvider"))(app)
 
     # CORS para desarrollo (en producción, especifica orígenes permitidos)
     CORS(app)
 
     # Inicializar extensiones
     db.init_app(app)
+    configure_engine(app)
+    replica_router.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    user_status_cache.init_app(app)
+    token_denylist.init_app(app)
+    password_hasher.init_app(app)
+    login_throttle.init_app(app)
+    ticket_allocator.init_app(app)
+    menu_cache.init_app(app)
+    # Caché de tickets PDF renderizados (por proceso)
+    app.extensions["ticket_cache"] = TicketCache(app.config["TICKET_CACHE_MAX_BYTES"])
+    ticket_queue.init_app(app)
+    event_bus.init_app(app)
+    kitchen_index.init_app(app)
 
     @jwt.unauthorized_loader
     def _unauthorized_callback(msg):
@@ -44,20 +76,33 @@ def create_app(config_name: str | None = None) -> Flask:
     def _expired_token_callback(jwt_header, jwt_payload):
         return jsonify({"error": "Token expired"}), 401
 
+    @jwt.token_in_blocklist_loader
+    def _token_in_blocklist_callback(jwt_header, jwt_payload):
+        return token_denylist.is_revoked(jwt_payload["jti"])
+
+    @jwt.revoked_token_loader
+    def _revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({"error": "Token revoked"}), 401
+
     # Registrar blueprints
     from api.menu_routes import menu_bp
     from api.order_routes import order_bp
     from api.report_routes import report_bp
     from api.auth_routes import auth_bp
+    from api.kitchen_routes import kitchen_bp
 
     app.register_blueprint(menu_bp, url_prefix="/api/menu")
     app.register_blueprint(order_bp, url_prefix="/api/orders")
     app.register_blueprint(report_bp, url_prefix="/api/reports")
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(kitchen_bp, url_prefix="/api/kitchen")
 
     # Manejadores de error globales
     register_error_handlers(app)
 
+    # Comandos CLI de mantenimiento (flask orders ...)
+    register_commands(app)
+
     # Crear tablas y seeds iniciales
     init_db(app)
 
@@ -0,0 +1,116 @@
+import threading
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from database import db
+from models import RevokedToken, User
+
+
+class UserStatus(NamedTuple):
+    active: bool
+    role: str
+
+
+class UserStatusCache:
+    """
+    Caché por proceso del estado de cada usuario (activo y rol actual).
+
+    `role_required` lo consulta en cada petición; una entrada dura
+    AUTH_CACHE_TTL_SECONDS, así un cambio hecho en otro worker se respeta a
+    más tardar en ese tiempo. Los cambios hechos por este proceso llaman a
+    `invalidate()` y se aplican de inmediato.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["user_status_cache"] = {"lock": threading.Lock(), "entries": {}}
+
+    def get(self, user_id) -> UserStatus | None:
+        """Estado del usuario, o None si no existe."""
+        user_id = int(user_id)
+        state = current_app.extensions["user_status_cache"]
+        now = time.monotonic()
+
+        with state["lock"]:
+            entry = state["entries"].get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        row = db.session.execute(
+            select(User.active, User.role).where(User.id == user_id)
+        ).first()
+        # `active` es NULL en usuarios creados antes de que tuviera default
+        status = UserStatus(row.active is not False, row.role) if row else None
+        with state["lock"]:
+            state["entries"][user_id] = (now + current_app.config["AUTH_CACHE_TTL_SECONDS"], status)
+        return status
+
+    def invalidate(self, user_id) -> None:
+        state = current_app.extensions["user_status_cache"]
+        with state["lock"]:
+            state["entries"].pop(int(user_id), None)
+
+
+class TokenDenylist:
+    """
+    Lista de JTIs revocados, en memoria.
+
+    Se recarga de la tabla `revoked_tokens` cada AUTH_CACHE_TTL_SECONDS (una
+    consulta por proceso, no por petición); los tokens que revoca este
+    proceso se agregan al momento.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["token_denylist"] = {
+            "lock": threading.Lock(),
+            "jtis": frozenset(),
+            # Revocados por este proceso: sobreviven a una recarga concurrente
+            "local": {},
+            "expires_at": 0.0,
+        }
+
+    def is_revoked(self, jti: str) -> bool:
+        state = current_app.extensions["token_denylist"]
+        if state["expires_at"] <= time.monotonic():
+            self._reload(state)
+        return jti in state["jtis"]
+
+    def revoke(self, jti: str, expires_at: datetime) -> None:
+        """Revoca un token y borra de la tabla los que ya expiraron."""
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+        db.session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+        db.session.commit()
+
+        state = current_app.extensions["token_denylist"]
+        with state["lock"]:
+            state["local"][jti] = expires_at
+            state["jtis"] = state["jtis"] | {jti}
+
+    def _reload(self, state) -> None:
+        jtis = frozenset(
+            db.session.execute(
+                select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+            ).scalars()
+        )
+        now = datetime.utcnow()
+        with state["lock"]:
+            state["local"] = {
+                jti: expires_at for jti, expires_at in state["local"].items() if expires_at > now
+            }
+            state["jtis"] = jtis.union(state["local"])
+            state["expires_at"] = time.monotonic() + current_app.config["AUTH_CACHE_TTL_SECONDS"]
+
+
+user_status_cache = UserStatusCache()
+token_denylist = TokenDenylist()
@@ -2,11 +2,18 @@ from functools import wraps
 from flask import jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
 
+from auth_cache import user_status_cache
+
 
 def role_required(*roles):
     """
     Decorador para validar roles usando JWT.
     Ejemplo: @role_required("admin") o @role_required("admin", "cashier", "waiter")
+
+    Además del token (firma, expiración y lista de revocados), verifica que
+    el usuario siga activo y usa su rol actual en lugar del que trae el
+    token. Ambos salen de un caché en memoria con TTL corto, así que el
+    camino común no consulta la base de datos.
     """
 
     def wrapper(fn):
@@ -14,8 +21,10 @@ def role_required(*roles):
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
             claims = get_jwt()
-            user_role = claims.get("role")
-            if user_role not in roles:
+            status = user_status_cache.get(claims["sub"])
+            if status is None or not status.active:
+                return jsonify({"error": "Unauthorized", "message": "Usuario inactivo"}), 401
+            if status.role not in roles:
                 return jsonify({"error": "Forbidden", "message": "No tienes permisos para esta acción"}), 403
             return fn(*args, **kwargs)
 
@@ -0,0 +1,67 @@
+"""
+Costo por petición de la verificación de autenticación en role_required:
+solo el JWT (antes), JWT + consulta a `users` en cada petición (ingenuo) y
+JWT + caché de estado de usuario (actual).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_auth [--requests 5000]
+"""
+import argparse
+import time
+
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy import select
+
+from app import create_app
+from auth_cache import user_status_cache
+from database import db
+from models import User
+
+
+def _claims_only():
+    verify_jwt_in_request()
+    return get_jwt().get("role") in ("admin",)
+
+
+def _naive_query():
+    verify_jwt_in_request()
+    claims = get_jwt()
+    row = db.session.execute(
+        select(User.active, User.role).where(User.id == int(claims["sub"]))
+    ).first()
+    return row.active and row.role in ("admin",)
+
+
+def _cached():
+    verify_jwt_in_request()
+    status = user_status_cache.get(get_jwt()["sub"])
+    return status.active and status.role in ("admin",)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    with app.app_context():
+        token = app.test_client().post(
+            "/api/auth/login", json={"username": "admin", "password": "admin123"}
+        ).get_json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for label, check in (
+            ("solo JWT (antes)", _claims_only),
+            ("JWT + consulta a users", _naive_query),
+            ("JWT + caché (actual)", _cached),
+        ):
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                with app.test_request_context(headers=headers):
+                    assert check()
+            elapsed = time.perf_counter() - start
+            print(f"{label:<26} {elapsed / args.requests * 1e6:>8.1f} µs/petición")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Serialización de 1000 órdenes abiertas con 10 items cada una (la respuesta
+de `GET /api/orders/open` de un día pesado): to_dict() y luego el JSON con
+el proveedor de Flask, FastJSONProvider con el módulo json y con orjson.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_json [--orders 1000] [--items 10] [--repeat 20]
+"""
+import argparse
+import time
+from unittest.mock import patch
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+
+from app import create_app
+from database import db
+from json_provider import FastJSONProvider
+from models import MenuItem, Order, OrderItem
+from serializers import order_load_options
+
+
+def _seed(orders: int, items: int) -> None:
+    menu = MenuItem.query.all()
+    db.session.execute(insert(Order), [
+        {"ticket_number": number, "customer_name": f"Mesa {number % 40}", "order_type": "local",
+         "subtotal": 0, "iva": 0, "total": 0, "status": "open", "printed": False}
+        for number in range(1, orders + 1)
+    ])
+    order_ids = db.session.scalars(db.select(Order.id)).all()
+    db.session.execute(insert(OrderItem), [
+        {"order_id": order_id, "menu_item_id": menu[line % len(menu)].id, "quantity": 2,
+         "unit_price": menu[line % len(menu)].price, "subtotal": menu[line % len(menu)].price * 2,
+         "notes": "sin cebolla" if line % 3 == 0 else None}
+        for order_id in order_ids
+        for line in range(items)
+    ])
+    db.session.commit()
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app("testing", {"DEBUG": False})
+    with app.app_context():
+        _seed(args.orders, args.items)
+        orders = Order.query.options(*order_load_options()).filter_by(status="open").all()
+
+        payload = None
+
+        def build():
+            nonlocal payload
+            payload = [order.to_dict() for order in orders]
+
+        print(f"to_dict()                        {_time(build, args.repeat):7.1f} ms")
+
+        flask_provider = DefaultJSONProvider(app)
+        fast_provider = FastJSONProvider(app)
+        size = len(fast_provider.response(payload).get_data())
+        print(f"Flask DefaultJSONProvider        {_time(lambda: flask_provider.response(payload), args.repeat):7.1f} ms")
+        with patch("json_provider.orjson", None):
+            print(f"FastJSONProvider (json)          {_time(lambda: fast_provider.response(payload), args.repeat):7.1f} ms")
+        print(f"FastJSONProvider (orjson)        {_time(lambda: fast_provider.response(payload), args.repeat):7.1f} ms")
+        print(f"{args.orders} órdenes x {args.items} items, {size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
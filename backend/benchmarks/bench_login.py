@@ -0,0 +1,58 @@
+"""
+Logins por segundo con el método de hash configurado, con varios clientes
+concurrentes. Sirve para elegir PASSWORD_HASH_METHOD/PASSWORD_HASH_WORKERS:
+el costo debe dejar al menos los logins del cambio de turno por segundo.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_login [--method scrypt:32768:8:1] [--workers 2] \\
+        [--logins 40] [--clients 1,4,8]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app import create_app
+from config import BaseConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--method", default=BaseConfig.PASSWORD_HASH_METHOD)
+    parser.add_argument("--workers", type=int, default=BaseConfig.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--clients", default="1,4,8")
+    args = parser.parse_args()
+
+    password_hash = generate_password_hash("mesero123", method=args.method)
+    start = time.perf_counter()
+    for _ in range(10):
+        check_password_hash(password_hash, "mesero123")
+    print(f"{args.method}: {(time.perf_counter() - start) / 10 * 1000:.1f} ms por verificación")
+
+    app = create_app("testing", {
+        "PASSWORD_HASH_METHOD": args.method,
+        "PASSWORD_HASH_WORKERS": args.workers,
+        "LOGIN_MAX_FAILURES": args.logins,
+        "LOGIN_MAX_FAILURES_PER_IP": args.logins,
+    })
+    credentials = {"username": "mesero1", "password": "mesero123"}
+
+    def login(_):
+        with app.app_context():
+            response = app.test_client().post("/api/auth/login", json=credentials)
+            assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        for clients in (int(value) for value in args.clients.split(",")):
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                start = time.perf_counter()
+                list(pool.map(login, range(args.logins)))
+                elapsed = time.perf_counter() - start
+            print(f"{clients:>3} clientes, {args.workers} hilos de hash: "
+                  f"{args.logins / elapsed:6.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
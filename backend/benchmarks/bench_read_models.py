@@ -0,0 +1,94 @@
+"""
+Listado de órdenes: modelos del ORM (Order/OrderItem/MenuItem/User con
+carga anticipada, como antes) contra read_models.OrderRow. Mide la latencia
+de cargar + serializar y la memoria que ocupan las órdenes cargadas
+(incluye el identity map de la sesión en el caso del ORM).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_read_models [--orders 10000] [--items 5] [--repeat 5]
+"""
+import argparse
+import time
+import tracemalloc
+
+from sqlalchemy import insert
+
+from app import create_app
+from database import db
+from models import MenuItem, Order, OrderItem, User
+from read_models import load_orders
+from serializers import order_load_options
+
+
+def _seed(orders: int, items: int) -> None:
+    menu = MenuItem.query.all()
+    user_id = User.query.first().id
+    db.session.execute(insert(Order), [
+        {"ticket_number": number, "customer_name": f"Mesa {number % 40}", "order_type": "local",
+         "subtotal": 0, "iva": 0, "total": 0, "status": "open", "printed": False,
+         "created_by_user_id": user_id}
+        for number in range(1, orders + 1)
+    ])
+    order_ids = db.session.scalars(db.select(Order.id)).all()
+    db.session.execute(insert(OrderItem), [
+        {"order_id": order_id, "menu_item_id": menu[line % len(menu)].id, "quantity": 2,
+         "unit_price": menu[line % len(menu)].price, "subtotal": menu[line % len(menu)].price * 2,
+         "notes": "sin cebolla" if line % 3 == 0 else None}
+        for order_id in order_ids
+        for line in range(items)
+    ])
+    db.session.commit()
+
+
+def _load_orm():
+    return Order.query.options(*order_load_options()).filter_by(status="open").order_by(Order.id).all()
+
+
+def _load_rows():
+    return load_orders([Order.status == "open"], [Order.id])
+
+
+def _latency(load, repeat: int) -> float:
+    total = 0.0
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        [order.to_dict() for order in load()]
+        total += time.perf_counter() - start
+    return total / repeat * 1000
+
+
+def _memory(load) -> int:
+    db.session.remove()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    orders = load()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del orders
+    db.session.remove()
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    with app.app_context():
+        _seed(args.orders, args.items)
+        assert [o.to_dict() for o in _load_rows()] == [o.to_dict() for o in _load_orm()]
+
+        print(f"{args.orders} órdenes x {args.items} items")
+        for label, load in (("ORM (antes)", _load_orm), ("OrderRow", _load_rows)):
+            latency = _latency(load, args.repeat)
+            memory = _memory(load)
+            print(f"{label:<12} {latency:8.1f} ms cargar + to_dict   "
+                  f"{memory / 1024 / 1024:7.1f} MiB ({memory / args.orders:,.0f} B/orden)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Creación concurrente de órdenes mientras otros clientes leen tickets
+abiertos (`GET /api/orders/<id>` sobre un conjunto fijo, para que el costo
+de cada lectura no crezca con las órdenes creadas), con cada configuración de SQLite: journal de rollback (el modo
+por defecto de SQLite, sin PRAGMAs) contra WAL + synchronous=NORMAL +
+busy_timeout + mmap (SQLITE_PRAGMAS por defecto).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_sqlite [--seconds 10] [--writers 4] [--readers 4]
+"""
+import argparse
+import tempfile
+import threading
+import time
+
+from app import create_app
+from config import BaseConfig
+
+PROFILES = {
+    "rollback journal": {},
+    "WAL (SQLITE_PRAGMAS)": BaseConfig.SQLITE_PRAGMAS,
+    "WAL + synchronous=FULL": {**BaseConfig.SQLITE_PRAGMAS, "synchronous": "FULL"},
+}
+ORDER = {"order_type": "local", "items": [{"id": 1, "quantity": 2}, {"id": 4, "quantity": 1}]}
+CREDENTIALS = {"username": "mesero1", "password": "mesero123"}
+
+
+def run(label: str, pragmas: dict, seconds: float, writers: int, readers: int) -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        app = create_app("testing", {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{folder}/bench.db",
+            "SQLITE_PRAGMAS": pragmas,
+        })
+        token = app.test_client().post("/api/auth/login", json=CREDENTIALS).get_json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        open_ids = [
+            app.test_client().post("/api/orders/", json=ORDER, headers=headers).get_json()["id"]
+            for _ in range(50)
+        ]
+
+        counts = {"write": 0, "read": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def client(kind):
+            client = app.test_client()
+            reads = 0
+            while time.monotonic() < deadline:
+                if kind == "write":
+                    response = client.post("/api/orders/", json=ORDER, headers=headers)
+                else:
+                    order_id = open_ids[reads % len(open_ids)]
+                    reads += 1
+                    response = client.get(f"/api/orders/{order_id}", headers=headers)
+                with lock:
+                    counts[kind if response.status_code < 400 else "errors"] += 1
+
+        threads = [threading.Thread(target=client, args=("write",)) for _ in range(writers)]
+        threads += [threading.Thread(target=client, args=("read",)) for _ in range(readers)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+
+        with app.app_context():
+            from database import db
+            db.engine.dispose()
+
+    print(f"{label:<24} órdenes {counts['write'] / elapsed:7.1f}/s   "
+          f"lecturas {counts['read'] / elapsed:7.1f}/s   errores {counts['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.writers} escritores, {args.readers} lectores, {args.seconds:.0f} s")
+    for label, pragmas in PROFILES.items():
+        run(label, pragmas, args.seconds, args.writers, args.readers)
+
+
+if __name__ == "__main__":
+    main()
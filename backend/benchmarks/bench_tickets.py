@@ -0,0 +1,85 @@
+"""
+Tickets por segundo: PDF escrito a disco vs. renderizado en memoria vs.
+acierto en el caché de tickets vs. ESC/POS, y bytes por ticket.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_tickets [--tickets 200]
+"""
+import argparse
+import tempfile
+import time
+
+from utils.escpos import EscPosGenerator
+from utils.ticket_cache import TicketCache
+from utils.ticket_generator import TicketGenerator
+
+SAMPLE_ORDER = {
+    "ticket_number": 1,
+    "customer_name": "Juan Pérez",
+    "order_type": "delivery",
+    "delivery_phone": "33-1234-5678",
+    "delivery_address": "Calle Morelos #123, Col. Centro, Guadalajara, Jalisco",
+    "items": [
+        {"name": "Tacos al Pastor", "quantity": 3, "price": 45.00, "notes": "Sin cebolla"},
+        {"name": "Quesadilla", "quantity": 2, "price": 35.00, "notes": None},
+        {"name": "Agua de Horchata", "quantity": 2, "price": 25.00, "notes": None},
+    ],
+    "subtotal": 255.00,
+    "iva": 40.80,
+    "total": 295.80,
+    "payment_method": "cash",
+}
+
+
+def _rate(label, count, fn):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count / elapsed:>10.1f} tickets/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        generator = TicketGenerator(folder)
+        escpos = EscPosGenerator()
+        cache = TicketCache()
+
+        def from_disk(i):
+            # Flujo anterior: escribir el PDF y volver a leerlo para enviarlo
+            with open(generator.generate_ticket(SAMPLE_ORDER), "rb") as pdf:
+                pdf.read()
+
+        def in_memory(i):
+            generator.render(SAMPLE_ORDER)
+
+        def raw_escpos(i):
+            escpos.render(SAMPLE_ORDER)
+
+        def cached(i):
+            # Reimpresiones: misma orden y versión
+            key = (1, 1)
+            if cache.get(key) is None:
+                cache.put(key, generator.render(SAMPLE_ORDER))
+
+        _rate("disco (generate_ticket)", args.tickets, from_disk)
+        _rate("memoria (render)", args.tickets, in_memory)
+        _rate("caché (reimpresión)", args.tickets * 100, cached)
+        _rate("ESC/POS (render)", args.tickets * 10, raw_escpos)
+
+        start = time.perf_counter()
+        generator.render_many(SAMPLE_ORDER for _ in range(args.tickets))
+        elapsed = time.perf_counter() - start
+        print(f"{'lote PDF (render_many)':<28} {args.tickets / elapsed:>10.1f} tickets/s")
+
+        print()
+        print(f"{'bytes por ticket PDF':<28} {len(generator.render(SAMPLE_ORDER)):>10}")
+        print(f"{'bytes por ticket ESC/POS':<28} {len(escpos.render(SAMPLE_ORDER)):>10}")
+
+
+if __name__ == "__main__":
+    main()
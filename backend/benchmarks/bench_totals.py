@@ -0,0 +1,71 @@
+"""
+Costo del cálculo de totales de una orden: el camino anterior con columnas
+float (float -> str -> Decimal -> quantize -> float en cada línea) contra
+el actual en centavos enteros (money.Money). Solo mide velocidad; la
+exactitud la revisa tests/test_money.py con órdenes aleatorias creadas por
+la API y un cálculo de referencia con Decimal.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_totals [--orders 100000] [--lines 5]
+"""
+import argparse
+import random
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from money import from_cents, to_cents
+from totals import order_totals_cents
+
+
+def _quantize(value: Decimal) -> Decimal:
+    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def float_totals(prices: list[float], quantities: list[int]) -> tuple[float, float, float]:
+    """Camino anterior: cada línea pasa por str y Decimal y vuelve a float."""
+    subtotal = Decimal("0.00")
+    for price, quantity in zip(prices, quantities):
+        line = _quantize(Decimal(str(price)) * quantity)
+        subtotal += Decimal(str(float(line)))
+    iva = _quantize(subtotal * Decimal("0.16"))
+    return float(subtotal), float(iva), float(_quantize(subtotal + iva))
+
+
+def cents_totals(prices: list[Decimal], quantities: list[int]) -> tuple[Decimal, Decimal, Decimal]:
+    """Camino actual: precios Decimal de la columna, aritmética en centavos."""
+    subtotal = 0
+    for price, quantity in zip(prices, quantities):
+        subtotal += to_cents(price) * quantity
+    subtotal, iva, total = order_totals_cents(subtotal)
+    return from_cents(subtotal), from_cents(iva), from_cents(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--lines", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    orders = [
+        ([rng.randrange(50, 45_000) for _ in range(args.lines)],
+         [rng.randint(1, 4) for _ in range(args.lines)])
+        for _ in range(args.orders)
+    ]
+    float_orders = [([cents / 100 for cents in prices], quantities) for prices, quantities in orders]
+    money_orders = [([from_cents(cents) for cents in prices], quantities) for prices, quantities in orders]
+
+    for label, totals, data in (
+        ("float -> str -> Decimal", float_totals, float_orders),
+        ("centavos enteros", cents_totals, money_orders),
+    ):
+        start = time.perf_counter()
+        day_total = 0
+        for prices, quantities in data:
+            day_total += totals(prices, quantities)[2]
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24} {elapsed / args.orders * 1e6:6.2f} µs/orden   total del día {day_total!r}")
+
+
+if __name__ == "__main__":
+    main()
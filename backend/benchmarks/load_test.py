@@ -0,0 +1,121 @@
+"""
+Prueba de carga: peticiones por segundo de `GET /api/menu/` y de creación de
+órdenes (`POST /api/orders/`) con el servidor de desarrollo (`flask run`)
+contra el perfil de producción de gunicorn (gunicorn_config.py).
+
+Cada servidor arranca como subproceso con su propia base SQLite temporal.
+
+Uso (desde backend/):
+    python -m benchmarks.load_test [--seconds 10] [--clients 16] [--servers dev,gunicorn]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ORDER = {"order_type": "local", "items": [{"id": 1, "quantity": 2}, {"id": 4, "quantity": 1}]}
+
+
+def _server_command(name: str, port: int) -> list[str]:
+    if name == "dev":
+        return [sys.executable, "-m", "flask", "--app", "app:create_app", "run", "--port", str(port)]
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn_config.py",
+            "--bind", f"127.0.0.1:{port}", "--access-logfile", "/dev/null"]
+
+
+def _request(url: str, body: dict | None = None, token: str | None = None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    with urllib.request.urlopen(urllib.request.Request(url, data, headers), timeout=30) as response:
+        return json.loads(response.read())
+
+
+def _wait_until_up(base_url: str, process) -> None:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("El servidor terminó al arrancar")
+        try:
+            _request(f"{base_url}/")
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def _hammer(call, clients: int, seconds: float) -> tuple[float, int]:
+    """Llama `call` desde `clients` hilos durante `seconds`; devuelve (req/s, errores)."""
+    counts = [0] * clients
+    errors = [0] * clients
+    deadline = time.monotonic() + seconds
+
+    def client(index):
+        while time.monotonic() < deadline:
+            try:
+                call()
+                counts[index] += 1
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                errors[index] += 1
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.monotonic() - start), sum(errors)
+
+
+def run(name: str, port: int, clients: int, seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        env = dict(
+            os.environ,
+            FLASK_ENV="production",
+            DATABASE_URL=f"sqlite:///{folder}/load_test.db",
+            LOGIN_MAX_FAILURES_PER_IP="100000",
+        )
+        process = subprocess.Popen(_server_command(name, port), env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            _wait_until_up(base_url, process)
+            token = _request(f"{base_url}/api/auth/login",
+                             {"username": "mesero1", "password": "mesero123"})["access_token"]
+
+            menu_rps, menu_errors = _hammer(
+                lambda: _request(f"{base_url}/api/menu/"), clients, seconds
+            )
+            order_rps, order_errors = _hammer(
+                lambda: _request(f"{base_url}/api/orders/", ORDER, token), clients, seconds
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(f"{name:<9} GET /api/menu/ {menu_rps:8.1f} req/s ({menu_errors} errores)   "
+          f"POST /api/orders/ {order_rps:7.1f} req/s ({order_errors} errores)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--servers", default="dev,gunicorn")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clientes, {args.seconds:.0f} s por endpoint, {os.cpu_count()} CPU")
+    for name in args.servers.split(","):
+        run(name, args.port, args.clients, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import click
+from flask.cli import AppGroup
+
+orders_cli = AppGroup("orders", help="Mantenimiento de órdenes.")
+
+
+@orders_cli.command("check-totals")
+@click.option("--repair", is_flag=True, help="Corrige los totales que no coinciden.")
+@click.option("--status", default=None, help="Revisar solo órdenes con este status.")
+def check_totals_command(repair, status):
+    """Verifica que los totales de cada orden coincidan con sus líneas."""
+    from totals import check_order_totals
+
+    drifting = check_order_totals(repair=repair, status=status)
+    for entry in drifting:
+        click.echo(
+            f"Orden {entry['order_id']} (ticket #{entry['ticket_number']:04d}, {entry['status']}): "
+            f"guardado {entry['stored_total']:.2f}, esperado {entry['expected_total']:.2f}"
+        )
+
+    action = "corregidas" if repair else "con diferencias"
+    click.echo(f"{len(drifting)} órdenes {action}")
+
+
+@orders_cli.command("export-tickets")
+@click.option("--date", "day", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="Exportar las órdenes completadas creadas ese día.")
+@click.option("--ids", default=None, help="Ids de orden separados por coma.")
+@click.option("--format", "export_format", type=click.Choice(["pdf", "zip"]), default="pdf")
+@click.option("--output", type=click.Path(dir_okay=False), default=None,
+              help="Archivo de salida (por defecto tickets_<fecha>.<formato>).")
+def export_tickets_command(day, ids, export_format, output):
+    """Exporta los tickets de un día (o de una lista de ids) a un PDF o ZIP."""
+    from ticket_batch import batch_orders, stream_pdf, stream_zip
+
+    if day is None and not ids:
+        raise click.UsageError("Se requiere --date o --ids")
+
+    orders = batch_orders(
+        day.date() if day else None,
+        [int(value) for value in ids.split(",")] if ids else None,
+    )
+    if not orders:
+        click.echo("No hay órdenes completadas que exportar")
+        return
+
+    label = day.date().isoformat() if day else "seleccion"
+    output = output or f"tickets_{label}.{export_format}"
+    stream = stream_zip(orders) if export_format == "zip" else stream_pdf(orders)
+    with open(output, "wb") as export_file:
+        for chunk in stream:
+            export_file.write(chunk)
+    click.echo(f"{len(orders)} tickets exportados a {output}")
+
+
+reports_cli = AppGroup("reports", help="Mantenimiento de acumulados de reportes.")
+
+
+@reports_cli.command("rebuild-hourly")
+@click.option("--from", "date_from", type=click.DateTime(["%Y-%m-%d"]), default=None)
+@click.option("--to", "date_to", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="Fecha final (exclusiva).")
+def rebuild_hourly_command(date_from, date_to):
+    """Reconstruye las ventas por hora a partir del historial de órdenes (días locales)."""
+    from rollups import local_day_bounds, rebuild_hourly_sales
+
+    start = local_day_bounds(date_from.date())[0] if date_from else None
+    end = local_day_bounds(date_to.date())[0] if date_to else None
+    buckets = rebuild_hourly_sales(start, end)
+    click.echo(f"{buckets} buckets por hora reconstruidos")
+
+
+@reports_cli.command("rebuild-items")
+@click.option("--from", "date_from", type=click.DateTime(["%Y-%m-%d"]), default=None)
+@click.option("--to", "date_to", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="Fecha final (exclusiva).")
+def rebuild_items_command(date_from, date_to):
+    """Reconstruye las ventas diarias por producto a partir del historial."""
+    from rollups import rebuild_daily_item_sales
+
+    rows = rebuild_daily_item_sales(
+        date_from.date() if date_from else None, date_to.date() if date_to else None
+    )
+    click.echo(f"{rows} filas de ventas por producto reconstruidas")
+
+
+def register_commands(app):
+    """Registra los comandos de mantenimiento en `flask <grupo> <comando>`."""
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(reports_cli)
@@ -2,15 +2,108 @@ import os
 from datetime import timedelta
 
 
+def _engine_options(database_uri: str) -> dict:
+    """
+    Pool de conexiones para PostgreSQL (u otro servidor), por worker. SQLite
+    usa las opciones por defecto de Flask-SQLAlchemy y SQLITE_PRAGMAS.
+    """
+    if database_uri.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Segundos antes de reemplazar una conexión (evita cortes del servidor/proxy)
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+    }
+
+
 class BaseConfig:
     """Configuración base para la aplicación."""
 
     SECRET_KEY = os.getenv("SECRET_KEY", "change-this-secret")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///restaurant.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Crear las tablas con db.create_all() al arrancar (desarrollo y pruebas).
+    # En false el esquema lo maneja Alembic (`flask db upgrade`); tampoco se
+    # usa si la base ya tiene la tabla alembic_version.
+    DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "true").lower() in ("1", "true", "yes")
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
+    # Réplica de solo lectura opcional para reportes y listados
+    # (endpoints marcados con `replica.read_only`)
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+    SQLALCHEMY_BINDS = (
+        {"replica": {"url": DATABASE_REPLICA_URL, **_engine_options(DATABASE_REPLICA_URL)}}
+        if DATABASE_REPLICA_URL
+        else {}
+    )
+    # Si la réplica va más de REPLICA_MAX_LAG_SECONDS atrasada (o no responde)
+    # se lee de la primaria; su estado se revisa cada REPLICA_CHECK_SECONDS
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+    REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+    # PRAGMAs para cada conexión SQLite: con WAL los lectores no esperan al
+    # escritor; synchronous=NORMAL es seguro con WAL (solo se puede perder la
+    # última transacción si se va la luz, nunca se corrompe la base)
+    SQLITE_PRAGMAS = {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    }
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=8)
+    # Segundos que se confía en el estado de un usuario (activo/rol) y en la
+    # lista de tokens revocados antes de volver a leerlos de la base de datos
+    AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+
+    # Contraseñas: método y costo en formato de werkzeug. Los hashes con otro
+    # método se regeneran en el siguiente login correcto.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # Hilos que verifican contraseñas (0 = en la petición) y tope de espera
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    # Intentos fallidos de login permitidos por usuario y por IP en la ventana
+    LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "5"))
+    LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "30"))
+    LOGIN_FAILURE_WINDOW_SECONDS = float(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "300"))
     DEBUG = False
+    # Proveedor JSON de Flask ("modulo:Clase"); el de Flask es
+    # "flask.json.provider:DefaultJSONProvider"
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "json_provider:FastJSONProvider")
+
+    # Numeración de tickets
+    # TICKET_RESET: never (consecutivo global) | daily | shift
+    TICKET_RESET = os.getenv("TICKET_RESET", "never")
+    # Horas (locales) en que inicia cada turno cuando TICKET_RESET=shift
+    TICKET_SHIFT_START_HOURS = [
+        int(hour) for hour in os.getenv("TICKET_SHIFT_START_HOURS", "6,15").split(",")
+    ]
+    # Números reservados por worker en cada viaje a la base de datos (1 = sin bloques)
+    TICKET_BLOCK_SIZE = int(os.getenv("TICKET_BLOCK_SIZE", "1"))
+
+    # Tickets PDF: se renderizan en memoria y se guardan en un caché LRU por proceso
+    TICKET_CACHE_MAX_BYTES = int(os.getenv("TICKET_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    # Si se define, además se archiva una copia de cada ticket en esta carpeta
+    TICKET_ARCHIVE_FOLDER = os.getenv("TICKET_ARCHIVE_FOLDER")
+    # Procesos que renderizan tickets fuera de la petición (0 = en línea)
+    TICKET_RENDER_WORKERS = int(os.getenv("TICKET_RENDER_WORKERS", "2"))
+    # Tickets en proceso por worker antes de responder 503
+    TICKET_QUEUE_MAX_PENDING = int(os.getenv("TICKET_QUEUE_MAX_PENDING", "64"))
+    # Tickets fallidos que se recuerdan por worker (status "failed")
+    TICKET_QUEUE_MAX_FAILED = int(os.getenv("TICKET_QUEUE_MAX_FAILED", "256"))
+
+    # Eventos de órdenes (SSE): broker ("modulo:Clase"), eventos que se
+    # guardan para reanudar con Last-Event-ID y segundos entre keepalives
+    EVENTS_BROKER = os.getenv("EVENTS_BROKER", "events:LocalBroker")
+    EVENTS_BUFFER_SIZE = int(os.getenv("EVENTS_BUFFER_SIZE", "1000"))
+    EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+    # true si un solo proceso escribe órdenes (gunicorn_config lo activa con
+    # un worker y el broker local): la cola de cocina se mantiene solo con
+    # los eventos, sin revisar la base de datos en cada consulta
+    EVENTS_SINGLE_WRITER = os.getenv("EVENTS_SINGLE_WRITER", "false").lower() in ("1", "true", "yes")
+    # Cambios de líneas que recuerda la pantalla de cocina para `?since=`
+    KITCHEN_CHANGELOG_SIZE = int(os.getenv("KITCHEN_CHANGELOG_SIZE", "5000"))
 
 
 class DevelopmentConfig(BaseConfig):
@@ -19,13 +112,21 @@ class DevelopmentConfig(BaseConfig):
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+    # El esquema de producción sale de las migraciones (CMD del Dockerfile)
+    DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() in ("1", "true", "yes")
     # Aquí puedes agregar opciones específicas de producción (por ejemplo, logging a archivo, etc.)
 
 
 class TestingConfig(BaseConfig):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_BINDS = {}
     DEBUG = True
+    # Las pruebas renderizan en línea salvo que pidan el pool explícitamente
+    TICKET_RENDER_WORKERS = 0
+    # Hash barato: cada prueba crea usuarios e inicia sesión varias veces
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
 
 
 config_by_name = {
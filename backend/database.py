@@ -1,19 +1,86 @@
 import os
 
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    """
+    Sesión que envía los SELECT a la réplica cuando el endpoint la pidió
+    (`replica.read_only` deja el engine en `g.db_replica`). Los flush y las
+    sentencias INSERT/UPDATE/DELETE siempre van a la primaria.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, "is_select", False):
+            replica = g.get("db_replica") if has_app_context() else None
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def dialect_insert(model):
+    """
+    Devuelve un INSERT del dialecto activo, que soporta
+    `on_conflict_do_update` (upsert) tanto en SQLite como en PostgreSQL.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def configure_engine(app):
+    """
+    Con SQLite aplica SQLITE_PRAGMAS a cada conexión nueva (WAL, etc.), en la
+    primaria y en la réplica. Las opciones del pool para PostgreSQL van en
+    SQLALCHEMY_ENGINE_OPTIONS.
+    """
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    if not pragmas:
+        return
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", _set_sqlite_pragmas)
 
 
 def init_db(app):
     """
     Inicializa la base de datos y crea tablas.
     Si la tabla de menú está vacía, inserta datos de ejemplo.
+
+    Con DB_CREATE_ALL=false, o si la base ya tiene la tabla
+    alembic_version, no se crea nada: el esquema es de las migraciones y
+    create_all crearía antes de tiempo las tablas de revisiones pendientes
+    (`flask db upgrade` fallaría con "table already exists"). Si las tablas
+    aún no existen (p. ej. durante `flask db upgrade` sobre una base vacía)
+    tampoco se insertan los seeds.
     """
     from models import MenuItem, User  # Import local para evitar import circular
 
     with app.app_context():
-        db.create_all()
+        tables = inspect(db.engine).get_table_names()
+        if app.config.get("DB_CREATE_ALL", True) and "alembic_version" not in tables:
+            # Solo en la primaria: la réplica (si hay) recibe el esquema por replicación
+            db.create_all(bind_key=None)
+            tables = inspect(db.engine).get_table_names()
+
+        if not {MenuItem.__tablename__, User.__tablename__} <= set(tables):
+            return
 
         if MenuItem.query.count() == 0:
             seed_menu()
@@ -0,0 +1,160 @@
+import json
+import secrets
+import threading
+from collections import deque
+from typing import NamedTuple
+
+from flask import current_app
+from werkzeug.utils import import_string
+
+
+def parse_event_id(raw: str) -> tuple[str, int]:
+    """`"<epoch>:<n>"` -> `(epoch, n)`; ValueError si no tiene ese formato."""
+    epoch, separator, number = raw.partition(":")
+    if not epoch or not separator:
+        raise ValueError(raw)
+    return epoch, int(number)
+
+
+class Event(NamedTuple):
+    # "<epoch>:<n>" (ver LocalBroker)
+    id: str
+    type: str
+    data: dict
+
+    def to_sse(self) -> str:
+        """Formato `text/event-stream` (un evento termina con línea vacía)."""
+        payload = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class LocalBroker:
+    """
+    Broker en proceso: guarda los últimos EVENTS_BUFFER_SIZE eventos en un
+    buffer circular y despierta a los suscriptores con una Condition.
+
+    Los ids son `"<epoch>:<n>"`: `epoch` es aleatorio en cada arranque del
+    proceso y `n` es consecutivo. Un Last-Event-ID de otro arranque (el
+    contador volvió a empezar) siempre se trata como eventos perdidos.
+
+    Solo ve los eventos del proceso que los publica; con varios workers se
+    configura EVENTS_BROKER con un broker compartido que implemente los
+    mismos métodos (`publish`, `latest_id`, `since`, `wait`) y declare
+    `shared = True`.
+    """
+
+    # Los eventos de otros procesos no llegan aquí (ver kitchen.KitchenIndex)
+    shared = False
+
+    def __init__(self, app):
+        self._events = deque(maxlen=app.config.get("EVENTS_BUFFER_SIZE", 1000))
+        self._epoch = secrets.token_hex(4)
+        self._last_id = 0
+        self._condition = threading.Condition()
+
+    def publish(self, event_type: str, data: dict) -> Event:
+        with self._condition:
+            self._last_id += 1
+            event = Event(self._event_id(self._last_id), event_type, data)
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def latest_id(self) -> str:
+        with self._condition:
+            return self._event_id(self._last_id)
+
+    def since(self, last_id: str) -> tuple[list[Event], bool]:
+        """
+        Eventos posteriores a `last_id`. El segundo valor indica si se
+        perdieron eventos (ya salieron del buffer o el id es de otro
+        arranque del proceso) y el cliente debe recargar su estado.
+        Lanza ValueError si `last_id` no tiene el formato de un id.
+        """
+        epoch, number = parse_event_id(last_id)
+        with self._condition:
+            return self._since(epoch, number)
+
+    def wait(self, last_id: str, timeout: float) -> tuple[list[Event], bool]:
+        """Como `since`, pero espera hasta `timeout` segundos si no hay nada nuevo."""
+        epoch, number = parse_event_id(last_id)
+        with self._condition:
+            if epoch == self._epoch:
+                self._condition.wait_for(lambda: self._last_id != number, timeout)
+            return self._since(epoch, number)
+
+    def _event_id(self, number: int) -> str:
+        return f"{self._epoch}:{number}"
+
+    def _since(self, epoch: str, number: int) -> tuple[list[Event], bool]:
+        if epoch != self._epoch or number > self._last_id:
+            return [], True
+        if not self._events:
+            return [], False
+        first = self._last_id - len(self._events) + 1
+        if number < first - 1:
+            return [], True
+        return list(self._events)[number - first + 1:], False
+
+
+class EventBus:
+    """
+    Publicación de cambios de órdenes para los clientes conectados por SSE.
+
+    Los handlers publican después de hacer commit, así nunca se anuncia un
+    cambio que terminó en rollback.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        broker_class = import_string(app.config.get("EVENTS_BROKER", "events:LocalBroker"))
+        app.extensions["event_bus"] = broker_class(app)
+
+    @property
+    def broker(self):
+        return current_app.extensions["event_bus"]
+
+    def publish(self, event_type: str, data: dict) -> Event:
+        return self.broker.publish(event_type, data)
+
+    def stream(self, last_id: str | None, keepalive: float):
+        """
+        Flujo SSE. Sin `last_id` empieza desde el evento más reciente; con
+        `last_id` (Last-Event-ID) reenvía lo que el cliente se perdió. Si ya
+        no se puede reconstruir se envía `resync` para que el cliente vuelva
+        a pedir las órdenes abiertas. Cada `keepalive` segundos sin eventos
+        se manda un comentario.
+
+        El generador no necesita el contexto de la aplicación, así la
+        conexión SSE no retiene la sesión de base de datos.
+        """
+        broker = self.broker
+        # El punto de partida se fija al conectar, no al empezar a enviar
+        if last_id is None:
+            events, gap = [], False
+            last_id = broker.latest_id()
+        else:
+            events, gap = broker.since(last_id)
+        return _sse_stream(broker, last_id, events, gap, keepalive)
+
+
+def _sse_stream(broker, last_id: str, events: list, gap: bool, keepalive: float):
+    # Los clientes reintentan a los 3 segundos si se corta la conexión
+    yield "retry: 3000\n\n"
+
+    while True:
+        if gap:
+            yield "event: resync\ndata: {}\n\n"
+            last_id = broker.latest_id()
+        for event in events:
+            yield event.to_sse()
+            last_id = event.id
+        events, gap = broker.wait(last_id, keepalive)
+        if not events and not gap:
+            yield ": keepalive\n\n"
+
+
+event_bus = EventBus()
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from database import db
+from models import MenuItem, Order, OrderItem, User
+
+EXPORT_BATCH_SIZE = 1000
+
+# Una fila por línea de orden; las órdenes sin líneas salen en una sola fila
+# con las columnas del item vacías.
+EXPORT_COLUMNS = (
+    "order_id",
+    "ticket_number",
+    "created_at",
+    "completed_at",
+    "status",
+    "order_type",
+    "payment_method",
+    "customer_name",
+    "created_by",
+    "order_subtotal",
+    "order_iva",
+    "order_total",
+    "item_id",
+    "item_name",
+    "item_category",
+    "quantity",
+    "unit_price",
+    "line_subtotal",
+    "notes",
+)
+
+
+def export_query(start: datetime | None = None, end: datetime | None = None, status=None):
+    """Líneas de órdenes creadas en `[start, end)`, en orden cronológico."""
+    stmt = (
+        select(
+            Order.id,
+            Order.ticket_number,
+            Order.created_at,
+            Order.completed_at,
+            Order.status,
+            Order.order_type,
+            Order.payment_method,
+            Order.customer_name,
+            User.username,
+            Order.subtotal,
+            Order.iva,
+            Order.total,
+            OrderItem.id,
+            MenuItem.name,
+            MenuItem.category,
+            OrderItem.quantity,
+            OrderItem.unit_price,
+            OrderItem.subtotal,
+            OrderItem.notes,
+        )
+        .outerjoin(User, Order.created_by_user_id == User.id)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+        .order_by(Order.created_at, Order.id, OrderItem.id)
+    )
+    if start:
+        stmt = stmt.where(Order.created_at >= start)
+    if end:
+        stmt = stmt.where(Order.created_at < end)
+    if status:
+        stmt = stmt.where(Order.status == status)
+    return stmt
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Los importes se leen como Decimal (ver money.Money)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _row_values(row) -> list:
+    return [_export_value(value) for value in row]
+
+
+def _partitions(stmt):
+    """
+    Recorre el resultado por bloques con un cursor del servidor: nunca hay
+    más de EXPORT_BATCH_SIZE filas en memoria.
+    """
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    yield from result.partitions()
+
+
+def stream_csv(stmt):
+    """Genera el CSV (con encabezado) por bloques de filas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in _partitions(stmt):
+        writer.writerows(_row_values(row) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(stmt):
+    """Genera un objeto JSON por línea de orden, por bloques de filas."""
+    for rows in _partitions(stmt):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, _row_values(row))), ensure_ascii=False) + "\n"
+            for row in rows
+        )
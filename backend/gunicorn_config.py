@@ -0,0 +1,97 @@
+"""
+Configuración de gunicorn. El perfil se elige con FLASK_ENV, con el mismo
+valor por defecto que `create_app` (development), así el perfil de gunicorn
+y la configuración de Flask siempre coinciden:
+
+    gunicorn -c gunicorn_config.py
+
+Cada valor se puede sobreescribir con variables GUNICORN_* (ver abajo).
+"""
+import multiprocessing
+import os
+
+_ENV = os.getenv("FLASK_ENV") or os.getenv("ENV") or "development"
+_CPUS = multiprocessing.cpu_count()
+
+# El estado en memoria (eventos SSE de LocalBroker, cola de cocina, estado
+# de los tickets en renderizado) es de cada worker. Con el broker local un
+# solo worker ve todos los cambios; varios workers solo cuando EVENTS_BROKER
+# apunta a un broker compartido.
+_SHARED_BROKER = os.getenv("EVENTS_BROKER", "events:LocalBroker") != "events:LocalBroker"
+
+# Workers gthread: cada stream de eventos (/api/orders/events) abierto ocupa
+# un hilo mientras la terminal esté conectada. `threads` debe cubrir las
+# terminales conectadas más margen para las demás peticiones; con 8 hilos,
+# 8 pestañas abiertas dejaban al worker sin hilos libres. El trabajo de CPU
+# (tickets, hash de contraseñas) ya sale a sus propios pools.
+PROFILES = {
+    "production": {
+        "workers": max(2, _CPUS) if _SHARED_BROKER else 1,
+        "threads": 32,
+        "preload_app": True,
+        "reload": False,
+        "max_requests": 2000,
+        "max_requests_jitter": 200,
+    },
+    "development": {
+        "workers": 1,
+        "threads": 8,
+        # reload y preload_app no se combinan: el código se recarga en el worker
+        "preload_app": False,
+        "reload": True,
+        "max_requests": 0,
+        "max_requests_jitter": 0,
+    },
+}
+_profile = PROFILES.get(_ENV, PROFILES["development"])
+
+wsgi_app = "app:create_app()"
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", _profile["workers"]))
+threads = int(os.getenv("GUNICORN_THREADS", _profile["threads"]))
+preload_app = _profile["preload_app"]
+
+# Con un solo worker y el broker local ese worker ve todos los cambios; la
+# aplicación se crea después de leer este archivo y toma el valor de aquí
+if workers == 1 and not _SHARED_BROKER:
+    os.environ.setdefault("EVENTS_SINGLE_WRITER", "true")
+reload = _profile["reload"]
+
+# Reciclar workers de vez en cuando (con jitter para que no reinicien juntos)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", _profile["max_requests"]))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", _profile["max_requests_jitter"]))
+
+# Un worker sin responder `timeout` segundos se reinicia; al apagar se dan
+# `graceful_timeout` segundos para terminar las peticiones en curso
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """
+    Con preload_app el maestro crea la aplicación (y abre conexiones al
+    crear tablas y seeds). Cada worker descarta los pools heredados (la
+    primaria y la réplica, si hay) para no compartir sockets con el maestro
+    ni con los otros workers; las conexiones nuevas se abren en el worker.
+    """
+    if not server.cfg.preload_app:
+        return
+    from database import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Al terminar el worker se esperan los tickets en proceso y se cierra su pool."""
+    from ticket_queue import ticket_queue
+
+    ticket_queue.shutdown(worker.app.wsgi())
@@ -0,0 +1,64 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional (requirements.txt)
+    orjson = None
+
+
+def _default(value):
+    # Importes (money.Money) como número y fechas en ISO 8601, igual que to_dict()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de la aplicación (JSON_PROVIDER).
+
+    Con orjson instalado serializa con él, directo a bytes; si no, usa el
+    módulo json. En ambos casos Decimal sale como número y date/datetime en
+    ISO 8601 (Flask usaría texto y fecha HTTP). Sin modo debug la respuesta
+    va compacta; en debug con sangría.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=self._orjson_option()).decode()
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+
+        if orjson is None:
+            dump_args = {"indent": 2} if pretty else {"separators": (",", ":")}
+            body = f"{self.dumps(obj, **dump_args)}\n"
+        else:
+            option = self._orjson_option() | orjson.OPT_APPEND_NEWLINE
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            body = orjson.dumps(obj, default=_default, option=option)
+
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _orjson_option(self) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
@@ -0,0 +1,281 @@
+import os
+import secrets
+import threading
+from collections import OrderedDict, defaultdict
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from database import db
+from events import event_bus, parse_event_id
+from models import MenuItem, Order, OrderItem
+
+# Eventos que agregan o reemplazan líneas y eventos que cierran la orden
+_LINE_EVENTS = {"order_created", "items_added", "item_updated"}
+_CLOSING_EVENTS = {"order_completed", "order_cancelled"}
+
+
+def _kitchen_line(order: dict, item: dict) -> dict:
+    return {
+        "id": item["id"],
+        "order_id": order["id"],
+        "ticket_number": order["ticket_number"],
+        "customer_name": order["customer_name"],
+        "order_type": order["order_type"],
+        "ordered_at": order["created_at"],
+        "name": item["menu_item"]["name"],
+        "category": item["menu_item"]["category"],
+        "quantity": item["quantity"],
+        "notes": item["notes"],
+    }
+
+
+class KitchenIndex:
+    """
+    Índice en memoria de las líneas pendientes (órdenes abiertas) agrupadas
+    por estación, es decir, por categoría del menú.
+
+    La versión del índice es `"<epoch>:<n>"`: `epoch` identifica esta copia
+    del índice (cambia en cada worker y en cada reconstrucción) y `n` cuenta
+    sus cambios, así `?since=<version>` devuelve solo las líneas que
+    cambiaron después. Una versión de otro epoch (otro worker, otro
+    arranque) recibe la lista completa.
+
+    Cómo se mantiene al día depende del broker de eventos:
+
+    - Broker compartido (`shared = True`): ve los cambios de todos los
+      workers; se aplican sus eventos sin tocar la base de datos y si se
+      perdieron eventos el índice se reconstruye.
+    - LocalBroker con EVENTS_SINGLE_WRITER (un solo proceso escribe
+      órdenes, como el perfil de producción de gunicorn con el broker
+      local): sus eventos son todos los cambios y se usan igual que los de
+      un broker compartido.
+    - LocalBroker con varios procesos: solo ve los eventos de este worker,
+      así que no basta. En cada consulta se lee, fuera del candado, una
+      marca barata de las órdenes abiertas (cuántas, id máximo y suma de
+      `version`); si cambió, se vuelven a leer las líneas abiertas y se
+      registran solo las diferencias.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["kitchen_index"] = {
+            "lock": threading.Lock(),
+            "loaded": False,
+            # Proceso dueño del índice: un worker recién creado no hereda el del maestro
+            "pid": None,
+            "epoch": None,
+            "version": 0,
+            # Versión desde la que el historial de cambios está completo
+            "floor": 0,
+            # Último evento aplicado (broker compartido) o marca de la base de datos
+            "event_id": None,
+            "watermark": None,
+            "lines": {},
+            "by_category": defaultdict(dict),
+            "by_order": defaultdict(set),
+            # line_id -> (versión, categoría); en orden de versión
+            "changes": OrderedDict(),
+        }
+
+    def snapshot(self, since: str | None = None, category: str | None = None) -> dict:
+        """
+        Líneas pendientes por estación. Con `since` devuelve solo los
+        cambios posteriores (`full: false`), salvo que sea de otro epoch o el
+        historial ya no alcance; entonces devuelve todo (`full: true`).
+        Lanza ValueError si `since` no tiene el formato de una versión.
+        """
+        # Las versiones tienen el mismo formato que los ids de eventos
+        since = parse_event_id(since) if since is not None else None
+        state = current_app.extensions["kitchen_index"]
+        broker = event_bus.broker
+        follow_events = getattr(broker, "shared", False) or current_app.config.get(
+            "EVENTS_SINGLE_WRITER", False
+        )
+        # La marca se lee sin el candado: las consultas concurrentes no se
+        # forman detrás de la base de datos
+        watermark = None if follow_events else self._watermark()
+        with state["lock"]:
+            if follow_events:
+                self._follow(state, broker)
+            else:
+                self._sync(state, watermark)
+            version = f"{state['epoch']}:{state['version']}"
+
+            if (
+                since is not None
+                and since[0] == state["epoch"]
+                and state["floor"] <= since[1] <= state["version"]
+            ):
+                stations = defaultdict(list)
+                removed = []
+                for line_id, (changed_at, line_category) in reversed(state["changes"].items()):
+                    if changed_at <= since[1]:
+                        break
+                    if category and line_category != category:
+                        continue
+                    line = state["lines"].get(line_id)
+                    if line is None:
+                        removed.append(line_id)
+                    else:
+                        stations[line_category].append(line)
+                return {"version": version, "full": False, "stations": stations, "removed": removed}
+
+            categories = [category] if category else list(state["by_category"])
+            stations = {
+                name: list(state["by_category"][name].values())
+                for name in categories
+                if state["by_category"].get(name)
+            }
+            return {"version": version, "full": True, "stations": stations, "removed": []}
+
+    def _follow(self, state, broker) -> None:
+        """Aplica los eventos nuevos; si se perdieron, reconstruye el índice."""
+        if state["pid"] != os.getpid():
+            state["loaded"] = False
+        if state["loaded"]:
+            events, gap = broker.since(state["event_id"])
+            if not gap:
+                for event in events:
+                    self._apply(state, event)
+                return
+        event_id = broker.latest_id()
+        self._rebuild(state, self._open_lines())
+        state["event_id"] = event_id
+
+    def _watermark(self) -> tuple:
+        return tuple(db.session.execute(
+            select(func.count(Order.id), func.max(Order.id), func.sum(Order.version))
+            .where(Order.status == "open")
+        ).one())
+
+    def _sync(self, state, watermark: tuple) -> None:
+        # La marca se leyó antes que las líneas: un cambio entre ambas
+        # lecturas (o una marca más vieja de otra consulta concurrente) solo
+        # provoca una relectura de más en la siguiente consulta
+        if state["pid"] != os.getpid():
+            state["loaded"] = False
+        if not state["loaded"]:
+            self._rebuild(state, self._open_lines())
+        elif watermark != state["watermark"]:
+            self._refresh(state, self._open_lines())
+        state["watermark"] = watermark
+
+    def _open_lines(self) -> dict:
+        """Líneas de todas las órdenes abiertas, con una consulta."""
+        rows = db.session.execute(
+            select(
+                OrderItem.id,
+                Order.id,
+                Order.ticket_number,
+                Order.customer_name,
+                Order.order_type,
+                Order.created_at,
+                MenuItem.name,
+                MenuItem.category,
+                OrderItem.quantity,
+                OrderItem.notes,
+            )
+            .join(Order, OrderItem.order_id == Order.id)
+            .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+            .where(Order.status == "open")
+            .order_by(Order.created_at, OrderItem.id)
+        )
+        return {
+            line_id: {
+                "id": line_id,
+                "order_id": order_id,
+                "ticket_number": ticket_number,
+                "customer_name": customer_name,
+                "order_type": order_type,
+                "ordered_at": created_at.isoformat() if created_at else None,
+                "name": name,
+                "category": category,
+                "quantity": quantity,
+                "notes": notes,
+            }
+            for (line_id, order_id, ticket_number, customer_name, order_type, created_at,
+                 name, category, quantity, notes) in rows
+        }
+
+    def _rebuild(self, state, lines: dict) -> None:
+        """Índice nuevo (otro epoch) con las líneas dadas y sin historial."""
+        state.update(
+            loaded=True,
+            pid=os.getpid(),
+            epoch=secrets.token_hex(4),
+            version=0,
+            floor=0,
+            lines={},
+            by_category=defaultdict(dict),
+            by_order=defaultdict(set),
+            changes=OrderedDict(),
+        )
+        for line in lines.values():
+            self._put(state, line)
+
+    def _refresh(self, state, lines: dict) -> None:
+        """Aplica como una sola versión las diferencias contra las líneas leídas."""
+        changed = [line for line_id, line in lines.items() if state["lines"].get(line_id) != line]
+        gone = [line_id for line_id in state["lines"] if line_id not in lines]
+        if not changed and not gone:
+            return
+        state["version"] += 1
+        for line in changed:
+            self._put(state, line, state["version"])
+        for line_id in gone:
+            self._remove(state, line_id, state["version"])
+
+    def _apply(self, state, event) -> None:
+        order = event.data["order"]
+        state["event_id"] = event.id
+        state["version"] += 1
+        version = state["version"]
+
+        if event.type in _LINE_EVENTS:
+            items = event.data["items"] if "items" in event.data else [event.data["item"]]
+            for item in items:
+                self._put(state, _kitchen_line(order, item), version)
+        elif event.type == "item_removed":
+            self._remove(state, event.data["item_id"], version)
+        elif event.type in _CLOSING_EVENTS:
+            for line_id in list(state["by_order"].get(order["id"], ())):
+                self._remove(state, line_id, version)
+
+    def _put(self, state, line: dict, version: int | None = None) -> None:
+        previous = state["lines"].get(line["id"])
+        if previous is not None and previous["category"] != line["category"]:
+            state["by_category"][previous["category"]].pop(line["id"], None)
+        state["lines"][line["id"]] = line
+        state["by_category"][line["category"]][line["id"]] = line
+        state["by_order"][line["order_id"]].add(line["id"])
+        if version is not None:
+            self._record_change(state, line["id"], line["category"], version)
+
+    def _remove(self, state, line_id: int, version: int) -> None:
+        line = state["lines"].pop(line_id, None)
+        if line is None:
+            return
+        state["by_category"][line["category"]].pop(line_id, None)
+        order_lines = state["by_order"][line["order_id"]]
+        order_lines.discard(line_id)
+        if not order_lines:
+            del state["by_order"][line["order_id"]]
+        self._record_change(state, line_id, line["category"], version)
+
+    def _record_change(self, state, line_id: int, category: str, version: int) -> None:
+        changes = state["changes"]
+        changes.pop(line_id, None)
+        changes[line_id] = (version, category)
+        # Las líneas eliminadas quedan como marcas en el historial; se
+        # descartan las más viejas y `floor` indica desde dónde es confiable
+        limit = current_app.config.get("KITCHEN_CHANGELOG_SIZE", 5000)
+        while len(changes) > limit:
+            _, (dropped_version, _) = changes.popitem(last=False)
+            state["floor"] = max(state["floor"], dropped_version)
+
+
+kitchen_index = KitchenIndex()
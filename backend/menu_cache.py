@@ -0,0 +1,95 @@
+import hashlib
+import threading
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import select
+
+from database import db, dialect_insert
+from models import Counter, MenuItem
+
+MENU_VERSION_COUNTER = "menu_version"
+CATEGORIES_KEY = "__categories__"
+ALL_ITEMS_KEY = "__all__"
+_EMPTY_KEY = "__empty__"
+
+
+class MenuCache:
+    """
+    Caché en proceso del menú ya serializado.
+
+    Guarda el JSON (bytes) de cada categoría, del menú completo y de la lista
+    de categorías, junto con su ETag. Todo queda ligado a la versión del menú
+    en la tabla `counters`, que se incrementa en la misma transacción que
+    cualquier cambio al menú; así los demás workers detectan el cambio con
+    una sola lectura por llave primaria y un acierto no hace trabajo de ORM.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["menu_cache"] = {
+            "lock": threading.Lock(),
+            "version": None,
+            "entries": {},
+        }
+
+    def current_version(self) -> int:
+        value = db.session.execute(
+            select(Counter.value).where(Counter.name == MENU_VERSION_COUNTER)
+        ).scalar()
+        return value or 0
+
+    def bump_version(self) -> None:
+        """Incrementa la versión del menú dentro de la transacción actual."""
+        stmt = dialect_insert(Counter).values(name=MENU_VERSION_COUNTER, value=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Counter.name], set_={"value": Counter.value + 1}
+        )
+        db.session.execute(stmt)
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        """
+        Devuelve `(json_bytes, etag)` para una categoría, ALL_ITEMS_KEY o
+        CATEGORIES_KEY. Una categoría sin productos disponibles devuelve "[]".
+        """
+        version = self.current_version()
+        state = current_app.extensions["menu_cache"]
+
+        with state["lock"]:
+            if state["version"] != version:
+                state["entries"] = self._render_all()
+                state["version"] = version
+            entries = state["entries"]
+
+        return entries.get(key) or entries[_EMPTY_KEY]
+
+    def _render_all(self) -> dict:
+        """Serializa todo el menú con una sola consulta."""
+        items = MenuItem.query.order_by(MenuItem.id).all()
+
+        by_category = defaultdict(list)
+        available = []
+        for item in items:
+            if item.available:
+                data = item.to_dict()
+                available.append(data)
+                by_category[item.category].append(data)
+
+        categories = list(dict.fromkeys(item.category for item in items))
+
+        entries = {key: _render(value) for key, value in by_category.items()}
+        entries[ALL_ITEMS_KEY] = _render(available)
+        entries[CATEGORIES_KEY] = _render(categories)
+        entries[_EMPTY_KEY] = _render([])
+        return entries
+
+
+def _render(data) -> tuple[bytes, str]:
+    body = current_app.json.dumps(data).encode()
+    return body, hashlib.sha1(body).hexdigest()
+
+
+menu_cache = MenuCache()
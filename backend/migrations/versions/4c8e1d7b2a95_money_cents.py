@@ -0,0 +1,59 @@
+"""money columns as bigint cents
+
+Revision ID: 4c8e1d7b2a95
+Revises: e7a2c5d8f913
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e1d7b2a95'
+down_revision = 'e7a2c5d8f913'
+branch_labels = None
+depends_on = None
+
+# tabla -> (columnas de importe, nullable)
+MONEY_COLUMNS = {
+    'menu_items': (('price',), False),
+    'orders': (('subtotal', 'iva', 'total'), False),
+    'order_items': (('unit_price', 'subtotal'), False),
+    'daily_sales': (('total_sales', 'total_iva', 'cash_sales', 'card_sales'), True),
+    'hourly_sales': (('total_sales', 'total_iva'), False),
+    'daily_item_sales': (('revenue',), False),
+}
+
+
+def upgrade():
+    for table, (columns, nullable) in MONEY_COLUMNS.items():
+        # Pesos -> centavos; ROUND descarta el error de representación del float
+        op.execute(
+            f"UPDATE {table} SET " + ", ".join(f"{column} = ROUND({column} * 100)" for column in columns)
+        )
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Float(),
+                    # int4 llega solo a ~21.4 millones de pesos; los acumulados lo pasan
+                    type_=sa.BigInteger(),
+                    existing_nullable=nullable,
+                    postgresql_using=f'{column}::bigint',
+                )
+
+
+def downgrade():
+    for table, (columns, nullable) in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.BigInteger(),
+                    type_=sa.Float(),
+                    existing_nullable=nullable,
+                )
+        op.execute(
+            f"UPDATE {table} SET " + ", ".join(f"{column} = {column} / 100.0" for column in columns)
+        )
@@ -0,0 +1,36 @@
+"""hourly sales rollup
+
+Revision ID: 5e9f0b3c7a21
+Revises: c2b7e94a5d10
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9f0b3c7a21'
+down_revision = 'c2b7e94a5d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('hourly_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('order_type', sa.String(length=20), nullable=False),
+    sa.Column('payment_method', sa.String(length=20), nullable=False),
+    sa.Column('created_by_user_id', sa.Integer(), nullable=False),
+    sa.Column('total_orders', sa.Integer(), nullable=False),
+    sa.Column('total_sales', sa.Float(), nullable=False),
+    sa.Column('total_iva', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('hour', 'order_type', 'payment_method', 'created_by_user_id', name='uq_hourly_sales_bucket')
+    )
+    # Después de aplicar: flask reports rebuild-hourly
+
+
+def downgrade():
+    op.drop_table('hourly_sales')
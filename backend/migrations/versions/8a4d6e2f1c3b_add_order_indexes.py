@@ -0,0 +1,38 @@
+"""add order and order item indexes
+
+Revision ID: 8a4d6e2f1c3b
+Revises: 3f1c2a9d8b7e
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4d6e2f1c3b'
+down_revision = '3f1c2a9d8b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_status_created_at', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_order_type_created_at', ['order_type', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_items_menu_item_id'), ['menu_item_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_menu_item_id'))
+        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_created_at_id')
+        batch_op.drop_index('ix_orders_order_type_created_at')
+        batch_op.drop_index('ix_orders_status_created_at')
@@ -0,0 +1,35 @@
+"""daily per-item sales aggregate
+
+Revision ID: 9d3a1f6b2e84
+Revises: 5e9f0b3c7a21
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3a1f6b2e84'
+down_revision = '5e9f0b3c7a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_item_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('line_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('date', 'menu_item_id', name='uq_daily_item_sales_date_item')
+    )
+    # Después de aplicar: flask reports rebuild-items
+
+
+def downgrade():
+    op.drop_table('daily_item_sales')
@@ -0,0 +1,66 @@
+"""ticket counters and per-scope ticket numbers
+
+Revision ID: c2b7e94a5d10
+Revises: 8a4d6e2f1c3b
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2b7e94a5d10'
+down_revision = '8a4d6e2f1c3b'
+branch_labels = None
+depends_on = None
+
+# Nombre que tiene la restricción UNIQUE(ticket_number) original en cada motor
+_NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def _old_unique_name(bind):
+    if bind.dialect.name == "postgresql":
+        return "orders_ticket_number_key"
+    return "uq_orders_ticket_number"
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    op.create_table('counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    with op.batch_alter_table('orders', schema=None, naming_convention=_NAMING_CONVENTION) as batch_op:
+        batch_op.add_column(sa.Column('ticket_scope', sa.String(length=20), server_default='global', nullable=False))
+        batch_op.drop_constraint(_old_unique_name(bind), type_='unique')
+        batch_op.create_unique_constraint('uq_orders_ticket_scope_number', ['ticket_scope', 'ticket_number'])
+
+    # Continuar la numeración existente
+    op.execute(
+        "INSERT INTO counters (name, value) "
+        "SELECT 'ticket:global', COALESCE(MAX(ticket_number), 0) FROM orders"
+    )
+    if bind.dialect.name == "postgresql":
+        op.execute(sa.schema.CreateSequence(sa.Sequence('ticket_number_seq')))
+        op.execute(
+            "SELECT setval('ticket_number_seq', "
+            "COALESCE((SELECT MAX(ticket_number) FROM orders), 0) + 1, false)"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        op.execute(sa.schema.DropSequence(sa.Sequence('ticket_number_seq')))
+
+    with op.batch_alter_table('orders', schema=None, naming_convention=_NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('uq_orders_ticket_scope_number', type_='unique')
+        batch_op.create_unique_constraint(_old_unique_name(bind), ['ticket_number'])
+        batch_op.drop_column('ticket_scope')
+
+    op.drop_table('counters')
@@ -1,6 +1,9 @@
 from datetime import datetime
 
+from flask import current_app
+
 from database import db
+from money import Money
 from werkzeug.security import check_password_hash, generate_password_hash
 
 
@@ -10,7 +13,7 @@ class MenuItem(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(Money, nullable=False)
     category = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text)
     available = db.Column(db.Boolean, default=True)
@@ -33,12 +36,36 @@ class MenuItem(db.Model):
         }
 
 
+# Secuencia de tickets (solo PostgreSQL; otros motores usan la tabla counters)
+ticket_number_seq = db.Sequence("ticket_number_seq", metadata=db.metadata)
+
+
+class Counter(db.Model):
+    """Contadores con incremento atómico (p. ej. números de ticket por turno)."""
+    __tablename__ = "counters"
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
 class Order(db.Model):
     """Modelo para órdenes."""
     __tablename__ = "orders"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "ticket_scope", "ticket_number", name="uq_orders_ticket_scope_number"
+        ),
+        db.Index("ix_orders_status_created_at", "status", "created_at"),
+        db.Index("ix_orders_order_type_created_at", "order_type", "created_at"),
+        db.Index("ix_orders_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    ticket_number = db.Column(db.Integer, unique=True, nullable=False)
+    ticket_number = db.Column(db.Integer, nullable=False)
+    # Periodo de numeración del ticket: "global", un día o un turno
+    ticket_scope = db.Column(
+        db.String(20), nullable=False, default="global", server_default="global"
+    )
     customer_name = db.Column(db.String(100), default="Cliente General")
 
     # Nuevos campos para tipo de orden
@@ -46,9 +73,9 @@ class Order(db.Model):
     delivery_phone = db.Column(db.String(20))
     delivery_address = db.Column(db.Text)
 
-    subtotal = db.Column(db.Float, nullable=False, default=0.0)
-    iva = db.Column(db.Float, nullable=False, default=0.0)
-    total = db.Column(db.Float, nullable=False, default=0.0)
+    subtotal = db.Column(Money, nullable=False, default=0)
+    iva = db.Column(Money, nullable=False, default=0)
+    total = db.Column(Money, nullable=False, default=0)
 
     # Cambio: ahora status puede ser 'open' (ticket abierto)
     status = db.Column(db.String(20), default="open")  # open|completed|cancelled
@@ -62,6 +89,9 @@ class Order(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
 
+    # Se incrementa con cada cambio al contenido de la orden (items, pago, status)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
     # Relación con items de la orden
     items = db.relationship(
         "OrderItem",
@@ -70,8 +100,12 @@ class Order(db.Model):
         cascade="all, delete-orphan",
     )
 
-    def to_dict(self):
-        return {
+    def to_dict(self, fields=None):
+        """
+        Serializa la orden. Si se indica `fields`, solo se incluyen esas
+        llaves y las relaciones anidadas no solicitadas ni siquiera se cargan.
+        """
+        data = {
             "id": self.id,
             "ticket_number": self.ticket_number,
             "customer_name": self.customer_name,
@@ -84,11 +118,17 @@ class Order(db.Model):
             "status": self.status,
             "payment_method": self.payment_method,
             "printed": self.printed,
-            "created_by": self.created_by.to_dict() if self.created_by else None,
             "created_at": self.created_at.isoformat(),
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "items": [item.to_dict() for item in self.items],
+            "version": self.version,
         }
+        if fields is None or "created_by" in fields:
+            data["created_by"] = self.created_by.to_dict() if self.created_by else None
+        if fields is None or "items" in fields:
+            data["items"] = [item.to_dict() for item in self.items]
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        return data
 
 
 class OrderItem(db.Model):
@@ -97,12 +137,16 @@ class OrderItem(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
 
-    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False)
-    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_items.id"), nullable=False)
+    order_id = db.Column(
+        db.Integer, db.ForeignKey("orders.id"), nullable=False, index=True
+    )
+    menu_item_id = db.Column(
+        db.Integer, db.ForeignKey("menu_items.id"), nullable=False, index=True
+    )
 
     quantity = db.Column(db.Integer, nullable=False)
-    unit_price = db.Column(db.Float, nullable=False)
-    subtotal = db.Column(db.Float, nullable=False)
+    unit_price = db.Column(Money, nullable=False)
+    subtotal = db.Column(Money, nullable=False)
     notes = db.Column(db.Text)
 
     # Relación con el menu item
@@ -127,10 +171,10 @@ class DailySales(db.Model):
     date = db.Column(db.Date, unique=True, nullable=False)
 
     total_orders = db.Column(db.Integer, default=0)
-    total_sales = db.Column(db.Float, default=0.0)
-    total_iva = db.Column(db.Float, default=0.0)
-    cash_sales = db.Column(db.Float, default=0.0)
-    card_sales = db.Column(db.Float, default=0.0)
+    total_sales = db.Column(Money, default=0)
+    total_iva = db.Column(Money, default=0)
+    cash_sales = db.Column(Money, default=0)
+    card_sales = db.Column(Money, default=0)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -146,6 +190,65 @@ class DailySales(db.Model):
         }
 
 
+class HourlySales(db.Model):
+    """
+    Ventas pre-agregadas por hora de creación de la orden, tipo de orden,
+    método de pago y usuario que la capturó. Se actualiza al completar o
+    cancelar órdenes; `created_by_user_id = 0` agrupa órdenes sin usuario.
+    """
+    __tablename__ = "hourly_sales"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "hour",
+            "order_type",
+            "payment_method",
+            "created_by_user_id",
+            name="uq_hourly_sales_bucket",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)
+    order_type = db.Column(db.String(20), nullable=False)
+    payment_method = db.Column(db.String(20), nullable=False)
+    created_by_user_id = db.Column(db.Integer, nullable=False, default=0)
+
+    total_orders = db.Column(db.Integer, nullable=False, default=0)
+    total_sales = db.Column(Money, nullable=False, default=0)
+    total_iva = db.Column(Money, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "hour": self.hour.isoformat(),
+            "order_type": self.order_type,
+            "payment_method": self.payment_method,
+            "created_by_user_id": self.created_by_user_id or None,
+            "total_orders": self.total_orders,
+            "total_sales": float(self.total_sales),
+            "total_iva": float(self.total_iva),
+        }
+
+
+class DailyItemSales(db.Model):
+    """
+    Ventas pre-agregadas por día (de creación de la orden) y producto.
+    Se actualiza al completar o cancelar órdenes.
+    """
+    __tablename__ = "daily_item_sales"
+    __table_args__ = (
+        db.UniqueConstraint("date", "menu_item_id", name="uq_daily_item_sales_date_item"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey("menu_items.id"), nullable=False)
+
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(Money, nullable=False, default=0)
+    # Número de líneas de orden (para "items_sold" por categoría)
+    line_count = db.Column(db.Integer, nullable=False, default=0)
+
+
 class User(db.Model):
     """Modelo de usuarios para autenticación y roles."""
 
@@ -161,7 +264,9 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password, method=current_app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+        )
 
     def check_password(self, password: str) -> bool:
         return check_password_hash(self.password_hash, password)
@@ -173,4 +278,15 @@ class User(db.Model):
             "full_name": self.full_name,
             "role": self.role,
             "active": self.active,
-        }
\ No newline at end of file
+        }
+
+
+class RevokedToken(db.Model):
+    """
+    Tokens JWT revocados antes de expirar (logout). Se guardan hasta su
+    expiración; después ya no sirven de todos modos.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
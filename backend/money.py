@@ -0,0 +1,47 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+def to_cents(value) -> int:
+    """
+    Convierte un importe en pesos (Decimal, int, str o float) a centavos
+    enteros, redondeando a la mitad hacia arriba. Los float (p. ej. los que
+    llegan en el JSON) se toman por su representación decimal: 0.1 -> 10.
+    """
+    if isinstance(value, float):
+        value = repr(value)
+    if not isinstance(value, Decimal):
+        value = Decimal(value)
+    return int(value.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Centavos enteros a Decimal con dos decimales (1050 -> Decimal("10.50"))."""
+    return Decimal(cents).scaleb(-2)
+
+
+class Money(TypeDecorator):
+    """
+    Importe guardado como centavos enteros. En Python se lee y se asigna
+    como Decimal en pesos; las sumas en SQL (SUM, `total = total + ...`)
+    son sumas de enteros y no acumulan error de redondeo.
+
+    Las columnas son BIGINT: en PostgreSQL un INTEGER (int4) llega solo a
+    21,474,836.47 pesos, poco para los acumulados de ventas.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return Decimal
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
@@ -0,0 +1,156 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Llaves que recuerda LoginThrottle como máximo (usuarios + IPs)
+_THROTTLE_MAX_KEYS = 10000
+
+
+class HasherBusy(Exception):
+    """Hay demasiadas verificaciones de contraseña esperando turno."""
+
+
+class PasswordHasher:
+    """
+    Hash y verificación de contraseñas con el método de PASSWORD_HASH_METHOD
+    (formato de werkzeug, p. ej. `scrypt:32768:8:1` o `pbkdf2:sha256:600000`).
+
+    Verificar un hash es trabajo de CPU deliberadamente caro. Se hace en un
+    pool de PASSWORD_HASH_WORKERS hilos (hashlib suelta el GIL), así en el
+    cambio de turno los logins simultáneos no ocupan todos los núcleos y las
+    demás peticiones siguen atendiéndose. Con PASSWORD_HASH_MAX_PENDING
+    verificaciones en espera se lanza HasherBusy y el login responde 503.
+    Con PASSWORD_HASH_WORKERS=0 se verifica en línea.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["password_hasher"] = {
+            "lock": threading.Lock(),
+            "executor": None,
+            "pending": 0,
+            # Hash de una contraseña aleatoria con el método configurado (ver dummy_hash)
+            "dummy_hash": None,
+        }
+
+    def hash(self, password: str) -> str:
+        return generate_password_hash(password, method=current_app.config["PASSWORD_HASH_METHOD"])
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        workers = current_app.config.get("PASSWORD_HASH_WORKERS", 0)
+        if not workers:
+            return check_password_hash(password_hash, password)
+
+        state = current_app.extensions["password_hasher"]
+        with state["lock"]:
+            if state["pending"] >= current_app.config.get("PASSWORD_HASH_MAX_PENDING", 32):
+                raise HasherBusy()
+            state["pending"] += 1
+            if state["executor"] is None:
+                state["executor"] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="password-hash"
+                )
+            executor = state["executor"]
+        try:
+            return executor.submit(check_password_hash, password_hash, password).result()
+        finally:
+            with state["lock"]:
+                state["pending"] -= 1
+
+    def dummy_hash(self) -> str:
+        """
+        Hash con el método y costo configurados de una contraseña que nadie
+        conoce. El login lo verifica cuando el usuario no existe, así tarda
+        lo mismo que con un usuario real y el tiempo de respuesta no revela
+        qué usuarios existen. Se genera una sola vez por proceso.
+        """
+        state = current_app.extensions["password_hasher"]
+        if state["dummy_hash"] is None:
+            state["dummy_hash"] = self.hash(secrets.token_urlsafe(16))
+        return state["dummy_hash"]
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        True si el hash se generó con otro método o costo que el configurado.
+        Werkzeug guarda el método con sus parámetros antes del primer `$`;
+        "scrypt" y "scrypt:32768:8:1" son el mismo método, así que se compara
+        contra el prefijo de dummy_hash.
+        """
+        return password_hash.split("$", 1)[0] != self.dummy_hash().split("$", 1)[0]
+
+
+class LoginThrottle:
+    """
+    Limita los intentos fallidos de login por usuario y por IP en una
+    ventana deslizante de LOGIN_FAILURE_WINDOW_SECONDS.
+
+    Se consulta antes de buscar al usuario y de verificar el hash, así un
+    ataque de fuerza bruta se rechaza sin gastar CPU. Es por proceso: con
+    varios workers el límite efectivo se multiplica por su número.
+
+    El límite por usuario no depende de la IP: quien conozca un nombre de
+    usuario puede bloquear esa cuenta LOGIN_FAILURE_WINDOW_SECONDS con
+    LOGIN_MAX_FAILURES intentos fallidos, aunque no sepa la contraseña.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["login_throttle"] = {"lock": threading.Lock(), "failures": OrderedDict()}
+
+    def retry_after(self, username: str, ip: str | None) -> int:
+        """Segundos que faltan para poder intentar de nuevo (0 = permitido)."""
+        config = current_app.config
+        window = config["LOGIN_FAILURE_WINDOW_SECONDS"]
+        state = current_app.extensions["login_throttle"]
+        now = time.monotonic()
+        wait = 0.0
+
+        with state["lock"]:
+            for key, limit in self._limits(username, ip):
+                attempts = state["failures"].get(key)
+                if not attempts:
+                    continue
+                while attempts and attempts[0] <= now - window:
+                    attempts.popleft()
+                if len(attempts) >= limit:
+                    wait = max(wait, attempts[-limit] + window - now)
+        return int(wait) + 1 if wait > 0 else 0
+
+    def record_failure(self, username: str, ip: str | None) -> None:
+        state = current_app.extensions["login_throttle"]
+        now = time.monotonic()
+        with state["lock"]:
+            failures = state["failures"]
+            for key, limit in self._limits(username, ip):
+                attempts = failures.pop(key, None) or deque(maxlen=limit)
+                attempts.append(now)
+                failures[key] = attempts
+            while len(failures) > _THROTTLE_MAX_KEYS:
+                failures.popitem(last=False)
+
+    def reset(self, username: str) -> None:
+        """Un login correcto borra los fallos del usuario (no los de la IP)."""
+        state = current_app.extensions["login_throttle"]
+        with state["lock"]:
+            state["failures"].pop(("user", username.lower()), None)
+
+    def _limits(self, username: str, ip: str | None):
+        config = current_app.config
+        yield ("user", username.lower()), config["LOGIN_MAX_FAILURES"]
+        if ip:
+            yield ("ip", ip), config["LOGIN_MAX_FAILURES_PER_IP"]
+
+
+password_hasher = PasswordHasher()
+login_throttle = LoginThrottle()
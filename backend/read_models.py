@@ -0,0 +1,188 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import BigInteger, select, type_coerce
+
+from database import db
+from models import MenuItem, Order, OrderItem, User
+
+# Órdenes por consulta SELECT ... IN al cargar sus líneas
+ITEMS_CHUNK_SIZE = 500
+
+
+def _cents(column):
+    # Lee los centavos tal cual, sin pasar por el Decimal de money.Money
+    return type_coerce(column, BigInteger)
+
+
+class CreatorRow(NamedTuple):
+    id: int
+    username: str
+    full_name: str | None
+    role: str
+    active: bool | None
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class ItemRow(NamedTuple):
+    id: int
+    quantity: int
+    unit_price: int
+    subtotal: int
+    notes: str | None
+    menu_item_id: int
+    name: str
+    price: int
+    category: str
+    description: str | None
+    available: bool | None
+    image_url: str | None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "menu_item": {
+                "id": self.menu_item_id,
+                "name": self.name,
+                "price": self.price / 100,
+                "category": self.category,
+                "description": self.description,
+                "available": self.available,
+                "image_url": self.image_url,
+            },
+            "quantity": self.quantity,
+            "unit_price": self.unit_price / 100,
+            "subtotal": self.subtotal / 100,
+            "notes": self.notes,
+        }
+
+
+class OrderRow(NamedTuple):
+    """
+    Orden de solo lectura para los listados: solo las columnas que se
+    serializan, sin objetos del ORM ni identity map. Los importes van en
+    centavos. `to_dict()` produce lo mismo que `Order.to_dict()`.
+    """
+
+    id: int
+    ticket_number: int
+    customer_name: str | None
+    order_type: str
+    delivery_phone: str | None
+    delivery_address: str | None
+    subtotal: int
+    iva: int
+    total: int
+    status: str
+    payment_method: str | None
+    printed: bool | None
+    created_at: datetime
+    completed_at: datetime | None
+    version: int
+    created_by: CreatorRow | None
+    items: list
+
+    def to_dict(self, fields=None) -> dict:
+        data = {
+            "id": self.id,
+            "ticket_number": self.ticket_number,
+            "customer_name": self.customer_name,
+            "order_type": self.order_type,
+            "delivery_phone": self.delivery_phone,
+            "delivery_address": self.delivery_address,
+            "subtotal": self.subtotal / 100,
+            "iva": self.iva / 100,
+            "total": self.total / 100,
+            "status": self.status,
+            "payment_method": self.payment_method,
+            "printed": self.printed,
+            "created_at": self.created_at.isoformat(),
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "version": self.version,
+        }
+        if fields is None or "created_by" in fields:
+            data["created_by"] = self.created_by.to_dict() if self.created_by else None
+        if fields is None or "items" in fields:
+            data["items"] = [item.to_dict() for item in self.items]
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        return data
+
+
+_ORDER_COLUMNS = (
+    Order.id,
+    Order.ticket_number,
+    Order.customer_name,
+    Order.order_type,
+    Order.delivery_phone,
+    Order.delivery_address,
+    _cents(Order.subtotal),
+    _cents(Order.iva),
+    _cents(Order.total),
+    Order.status,
+    Order.payment_method,
+    Order.printed,
+    Order.created_at,
+    Order.completed_at,
+    Order.version,
+)
+_CREATOR_COLUMNS = (User.id, User.username, User.full_name, User.role, User.active)
+_ITEM_COLUMNS = (
+    OrderItem.order_id,
+    OrderItem.id,
+    OrderItem.quantity,
+    _cents(OrderItem.unit_price),
+    _cents(OrderItem.subtotal),
+    OrderItem.notes,
+    MenuItem.id,
+    MenuItem.name,
+    _cents(MenuItem.price),
+    MenuItem.category,
+    MenuItem.description,
+    MenuItem.available,
+    MenuItem.image_url,
+)
+
+
+def load_orders(criteria=(), order_by=(), limit: int | None = None, fields=None) -> list[OrderRow]:
+    """
+    Carga órdenes como OrderRow: una consulta para las órdenes (con su
+    creador por JOIN) y una SELECT ... IN por cada ITEMS_CHUNK_SIZE órdenes
+    para las líneas con su producto. Lo que no está en `fields` no se
+    consulta.
+    """
+    with_creator = fields is None or "created_by" in fields
+    with_items = fields is None or "items" in fields
+
+    stmt = select(*_ORDER_COLUMNS)
+    if with_creator:
+        stmt = stmt.add_columns(*_CREATOR_COLUMNS).outerjoin(User, Order.created_by_user_id == User.id)
+    stmt = stmt.where(*criteria).order_by(*order_by).limit(limit)
+
+    order_width = len(_ORDER_COLUMNS)
+    orders = []
+    for row in db.session.execute(stmt):
+        creator = None
+        if with_creator and row[order_width] is not None:
+            creator = CreatorRow(*row[order_width:])
+        orders.append(OrderRow(*row[:order_width], creator, []))
+
+    if with_items and orders:
+        _attach_items(orders)
+    return orders
+
+
+def _attach_items(orders: list[OrderRow]) -> None:
+    by_id = {order.id: order.items for order in orders}
+    ids = list(by_id)
+    for start in range(0, len(ids), ITEMS_CHUNK_SIZE):
+        rows = db.session.execute(
+            select(*_ITEM_COLUMNS)
+            .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+            .where(OrderItem.order_id.in_(ids[start:start + ITEMS_CHUNK_SIZE]))
+            .order_by(OrderItem.id)
+        )
+        for row in rows:
+            by_id[row[0]].append(ItemRow(*row[1:]))
@@ -0,0 +1,164 @@
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, g
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from database import db
+from models import Order
+
+
+class ReplicaRouter:
+    """
+    Decide si las lecturas de un endpoint pueden ir a la réplica
+    (bind `replica` de SQLALCHEMY_BINDS, definido por DATABASE_REPLICA_URL).
+
+    Cada REPLICA_CHECK_SECONDS se revisa que la réplica responda y cuánto
+    va atrasada. Si no responde o el atraso pasa de REPLICA_MAX_LAG_SECONDS
+    se usa la primaria hasta la siguiente revisión.
+
+    En PostgreSQL el atraso es el de replay de la réplica
+    (`now() - pg_last_xact_replay_timestamp()`), así que cubre cualquier
+    escritura. Es 0 solo si la réplica está recibiendo WAL en este momento
+    (`pg_stat_wal_receiver` en `streaming`) y ya aplicó todo lo recibido:
+    sin receptor los LSN se quedan iguales aunque la primaria siga
+    escribiendo, y entonces cuenta la edad del último replay, que crece
+    hasta pasar REPLICA_MAX_LAG_SECONDS. Una base que no está en recovery
+    (réplica promovida o URL equivocada) no se usa. En otros motores (SQLite
+    en desarrollo y pruebas) se estima con las órdenes nuevas: cuánto
+    tiempo lleva en la primaria la orden más vieja que aún no llega a la
+    réplica. Esa estimación no ve UPDATE ni upserts atrasados (cobro de una
+    orden, ventas del día, acumulados): con solo esos pendientes reporta 0.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["replica_router"] = {
+            "lock": threading.Lock(),
+            "healthy": False,
+            "lag": None,
+            "next_check": 0.0,
+        }
+
+        @app.teardown_request
+        def _clear_replica(exc):
+            g.pop("db_replica", None)
+
+    @property
+    def configured(self) -> bool:
+        return "replica" in (current_app.config.get("SQLALCHEMY_BINDS") or {})
+
+    def engine(self):
+        """Engine de la réplica si está disponible, o None para usar la primaria."""
+        if not self.configured:
+            return None
+        state = current_app.extensions["replica_router"]
+        with state["lock"]:
+            if state["next_check"] <= time.monotonic():
+                self._check(state)
+            healthy = state["healthy"]
+        return db.engines["replica"] if healthy else None
+
+    def mark_down(self) -> None:
+        """La réplica falló a media petición: usar la primaria hasta la siguiente revisión."""
+        state = current_app.extensions["replica_router"]
+        with state["lock"]:
+            state["healthy"] = False
+            state["next_check"] = time.monotonic() + current_app.config["REPLICA_CHECK_SECONDS"]
+
+    def status(self) -> dict:
+        state = current_app.extensions["replica_router"]
+        return {"configured": self.configured, "healthy": state["healthy"], "lag": state["lag"]}
+
+    def _check(self, state) -> None:
+        # Se llama con state["lock"] tomado
+        config = current_app.config
+        state["next_check"] = time.monotonic() + config["REPLICA_CHECK_SECONDS"]
+        try:
+            lag = self._measure_lag()
+        except SQLAlchemyError as error:
+            current_app.logger.warning("Réplica no disponible, se usa la primaria: %s", error)
+            state.update(healthy=False, lag=None)
+            return
+
+        if lag is None:
+            current_app.logger.warning("Réplica sin replay verificable, se usa la primaria")
+            state.update(healthy=False, lag=None)
+            return
+
+        state["lag"] = max(lag, 0.0)
+        state["healthy"] = state["lag"] <= config["REPLICA_MAX_LAG_SECONDS"]
+        if not state["healthy"]:
+            current_app.logger.warning("Réplica atrasada %.1f s, se usa la primaria", lag)
+
+    def _measure_lag(self) -> float | None:
+        """Segundos de atraso de la réplica; None si no se puede saber."""
+        replica_engine = db.engines["replica"]
+        if replica_engine.dialect.name == "postgresql":
+            with replica_engine.connect() as replica:
+                in_recovery, streaming, caught_up, behind = replica.execute(text(
+                    "SELECT pg_is_in_recovery(),"
+                    " EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'),"
+                    " pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(),"
+                    " EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+                )).one()
+            if not in_recovery:
+                return None
+            # Sin escrituras nuevas el timestamp envejece aunque la réplica
+            # esté al día: si recibe WAL y aplicó todo lo recibido el atraso es 0
+            if streaming and caught_up:
+                return 0.0
+            return float(behind) if behind is not None else None
+
+        with replica_engine.connect() as replica:
+            replica_last_id = replica.scalar(select(func.max(Order.id))) or 0
+        with db.engine.connect() as primary:
+            oldest_missing = primary.scalar(
+                select(func.min(Order.created_at)).where(Order.id > replica_last_id)
+            )
+        return (datetime.utcnow() - oldest_missing).total_seconds() if oldest_missing else 0.0
+
+
+replica_router = ReplicaRouter()
+
+
+def read_only(fn):
+    """
+    Marca un endpoint como de solo lectura: sus SELECT van a la réplica
+    cuando está disponible. Si la réplica falla durante la petición, el
+    endpoint se repite contra la primaria (no escribe, así que es seguro).
+
+    Los endpoints que responden por partes (`/orders/export`,
+    `/orders/tickets/batch`) leen de la réplica mientras envían: un error a
+    media descarga ya no se puede repetir porque el status y las primeras
+    partes salieron. La descarga se corta (el cliente ve la respuesta
+    incompleta y debe volver a pedirla) y la réplica se sigue usando hasta
+    la siguiente revisión.
+
+    Va debajo de `role_required`, así la verificación del usuario se hace
+    en la primaria.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        engine = replica_router.engine()
+        if engine is None:
+            return fn(*args, **kwargs)
+
+        g.db_replica = engine
+        try:
+            return fn(*args, **kwargs)
+        except OperationalError:
+            current_app.logger.warning("Falló la lectura en la réplica, se repite en la primaria")
+            replica_router.mark_down()
+            db.session.rollback()
+            g.pop("db_replica", None)
+            return fn(*args, **kwargs)
+
+    return wrapper
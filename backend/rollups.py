@@ -0,0 +1,256 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import func, insert
+
+from database import db, dialect_insert
+from models import DailyItemSales, DailySales, HourlySales, Order, OrderItem
+
+
+# Reloj de los acumulados: `created_at`/`completed_at` y HourlySales.hour
+# están en UTC (sin tzinfo); los días de los reportes (DailySales.date,
+# `?date=` de /hourly) son días locales del servidor. Los rangos se
+# convierten con local_day_bounds y las horas se muestran con as_local.
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    """Trunca una fecha a la hora."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def as_local(moment: datetime) -> datetime:
+    """Fecha UTC sin tzinfo (como created_at) a hora local con su offset."""
+    return moment.replace(tzinfo=timezone.utc).astimezone()
+
+
+def _local_midnight_utc(day: date) -> datetime:
+    midnight = datetime.combine(day, time.min).astimezone()
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_day_bounds(day: date) -> tuple[datetime, datetime]:
+    """`[inicio, fin)` del día local `day` en UTC sin tzinfo, para filtrar created_at u hour."""
+    return _local_midnight_utc(day), _local_midnight_utc(day + timedelta(days=1))
+
+
+def _bucket_key(order: Order) -> dict:
+    return {
+        "hour": hour_bucket(order.created_at),
+        "order_type": order.order_type or "local",
+        "payment_method": order.payment_method or "cash",
+        "created_by_user_id": order.created_by_user_id or 0,
+    }
+
+
+def sale_day(order: Order) -> date:
+    """Día (hora local, como `date.today()` al cobrar) en que se registró la venta."""
+    if order.completed_at is None:
+        return date.today()
+    return as_local(order.completed_at).date()
+
+
+def record_daily_sale(order: Order, sign: int = 1) -> None:
+    """
+    Suma (sign=1, al completar) o resta (sign=-1, al cancelar una orden ya
+    completada) una orden en el resumen de ventas de su día.
+
+    Es un solo UPSERT atómico (INSERT ... ON CONFLICT (date) DO UPDATE
+    SET total = total + excluded.total), así que varios workers cerrando
+    tickets al mismo tiempo no pierden actualizaciones ni chocan al crear
+    la fila del día.
+    """
+    total = sign * order.total
+    stmt = dialect_insert(DailySales).values(
+        date=sale_day(order),
+        total_orders=sign,
+        total_sales=total,
+        total_iva=sign * order.iva,
+        cash_sales=total if order.payment_method == "cash" else 0,
+        card_sales=total if order.payment_method == "card" else 0,
+        created_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailySales.date],
+        set_={
+            "total_orders": DailySales.total_orders + stmt.excluded.total_orders,
+            "total_sales": DailySales.total_sales + stmt.excluded.total_sales,
+            "total_iva": DailySales.total_iva + stmt.excluded.total_iva,
+            "cash_sales": DailySales.cash_sales + stmt.excluded.cash_sales,
+            "card_sales": DailySales.card_sales + stmt.excluded.card_sales,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def record_order_sale(order: Order, sign: int = 1) -> None:
+    """
+    Suma (sign=1, al completar) o resta (sign=-1, al cancelar una orden ya
+    completada) una orden en su bucket horario con un UPSERT atómico.
+    Se ejecuta en la transacción de la petición.
+    """
+    stmt = dialect_insert(HourlySales).values(
+        **_bucket_key(order),
+        total_orders=sign,
+        total_sales=sign * order.total,
+        total_iva=sign * order.iva,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            HourlySales.hour,
+            HourlySales.order_type,
+            HourlySales.payment_method,
+            HourlySales.created_by_user_id,
+        ],
+        set_={
+            "total_orders": HourlySales.total_orders + stmt.excluded.total_orders,
+            "total_sales": HourlySales.total_sales + stmt.excluded.total_sales,
+            "total_iva": HourlySales.total_iva + stmt.excluded.total_iva,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def rebuild_hourly_sales(start: datetime | None = None, end: datetime | None = None) -> int:
+    """
+    Reconstruye los buckets horarios a partir de las órdenes completadas con
+    `created_at` en `[start, end)` (todo el historial si no se indican).
+    Los límites se truncan a la hora para no dejar buckets a medias.
+    Devuelve el número de buckets escritos.
+    """
+    start = hour_bucket(start) if start else None
+    end = hour_bucket(end) if end else None
+
+    orders = db.session.query(
+        Order.created_at,
+        Order.order_type,
+        Order.payment_method,
+        Order.created_by_user_id,
+        Order.total,
+        Order.iva,
+    ).filter(Order.status == "completed")
+    existing = HourlySales.query
+    if start:
+        orders = orders.filter(Order.created_at >= start)
+        existing = existing.filter(HourlySales.hour >= start)
+    if end:
+        orders = orders.filter(Order.created_at < end)
+        existing = existing.filter(HourlySales.hour < end)
+
+    buckets = {}
+    for row in orders.yield_per(1000):
+        key = tuple(_bucket_key(row).values())
+        bucket = buckets.setdefault(key, [0, 0, 0])
+        bucket[0] += 1
+        bucket[1] += row.total
+        bucket[2] += row.iva
+
+    existing.delete(synchronize_session=False)
+    if buckets:
+        db.session.execute(
+            insert(HourlySales),
+            [
+                {
+                    "hour": hour,
+                    "order_type": order_type,
+                    "payment_method": payment_method,
+                    "created_by_user_id": user_id,
+                    "total_orders": count,
+                    "total_sales": sales,
+                    "total_iva": iva,
+                }
+                for (hour, order_type, payment_method, user_id), (count, sales, iva) in buckets.items()
+            ],
+        )
+    db.session.commit()
+    return len(buckets)
+
+
+def _item_lines(order_filter):
+    """Líneas agrupadas por día de la orden y producto."""
+    order_day = func.date(Order.created_at)
+    return (
+        db.session.query(
+            order_day.label("day"),
+            OrderItem.menu_item_id,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.subtotal),
+            func.count(OrderItem.id),
+        )
+        .join(Order, OrderItem.order_id == Order.id)
+        .filter(*order_filter)
+        .group_by(order_day, OrderItem.menu_item_id)
+    )
+
+
+def _as_date(value) -> date:
+    # SQLite devuelve DATE() como texto
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def record_order_items(order: Order, sign: int = 1) -> None:
+    """
+    Suma (sign=1) o resta (sign=-1) las líneas de una orden en los acumulados
+    diarios por producto, con un solo UPSERT multi-fila.
+    """
+    rows = [
+        {
+            "date": order.created_at.date(),
+            "menu_item_id": menu_item_id,
+            "quantity": sign * int(quantity),
+            "revenue": sign * revenue,
+            "line_count": sign * int(lines),
+        }
+        for _, menu_item_id, quantity, revenue, lines in _item_lines([Order.id == order.id])
+    ]
+    if not rows:
+        return
+
+    stmt = dialect_insert(DailyItemSales).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyItemSales.date, DailyItemSales.menu_item_id],
+        set_={
+            "quantity": DailyItemSales.quantity + stmt.excluded.quantity,
+            "revenue": DailyItemSales.revenue + stmt.excluded.revenue,
+            "line_count": DailyItemSales.line_count + stmt.excluded.line_count,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def rebuild_daily_item_sales(start: date | None = None, end: date | None = None) -> int:
+    """
+    Reconstruye los acumulados diarios por producto desde las órdenes
+    completadas con fecha de creación en `[start, end)`.
+    Devuelve el número de filas escritas.
+    """
+    order_filter = [Order.status == "completed"]
+    existing = DailyItemSales.query
+    if start:
+        order_filter.append(Order.created_at >= datetime.combine(start, datetime.min.time()))
+        existing = existing.filter(DailyItemSales.date >= start)
+    if end:
+        order_filter.append(Order.created_at < datetime.combine(end, datetime.min.time()))
+        existing = existing.filter(DailyItemSales.date < end)
+
+    rows = [
+        {
+            "date": _as_date(day),
+            "menu_item_id": menu_item_id,
+            "quantity": int(quantity),
+            "revenue": revenue,
+            "line_count": int(lines),
+        }
+        for day, menu_item_id, quantity, revenue, lines in _item_lines(order_filter)
+    ]
+
+    existing.delete(synchronize_session=False)
+    if rows:
+        db.session.execute(insert(DailyItemSales), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def record_order(order: Order, sign: int = 1) -> None:
+    """Actualiza todos los acumulados de ventas (del día, por hora y por producto)."""
+    record_daily_sale(order, sign)
+    record_order_sale(order, sign)
+    record_order_items(order, sign)
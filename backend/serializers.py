@@ -0,0 +1,155 @@
+import base64
+from datetime import datetime, timezone
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import Order, OrderItem
+from read_models import load_orders
+
+ORDER_FIELDS = frozenset(
+    {
+        "id",
+        "ticket_number",
+        "customer_name",
+        "order_type",
+        "delivery_phone",
+        "delivery_address",
+        "subtotal",
+        "iva",
+        "total",
+        "status",
+        "payment_method",
+        "printed",
+        "created_by",
+        "created_at",
+        "completed_at",
+        "version",
+        "items",
+    }
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def parse_fields(raw: str | None):
+    """
+    Convierte `?fields=a,b,c` en un conjunto de llaves.
+    Devuelve None si no se pidió proyección. Lanza ValueError con las
+    llaves desconocidas.
+    """
+    if not raw:
+        return None
+    fields = {field.strip() for field in raw.split(",") if field.strip()}
+    unknown = fields - ORDER_FIELDS
+    if unknown:
+        raise ValueError(", ".join(sorted(unknown)))
+    return fields
+
+
+def order_load_options(fields=None):
+    """
+    Opciones de carga para serializar órdenes sin consultas N+1.
+
+    El creador se trae con JOIN en la misma consulta de órdenes y los items
+    (junto con su producto del menú) en una sola consulta SELECT ... IN,
+    sin importar cuántas órdenes se devuelvan. Las relaciones que no forman
+    parte de `fields` no se cargan.
+    """
+    options = []
+    if fields is None or "created_by" in fields:
+        options.append(joinedload(Order.created_by))
+    if fields is None or "items" in fields:
+        options.append(selectinload(Order.items).joinedload(OrderItem.menu_item))
+    return tuple(options)
+
+
+def serialize_orders(criteria, order_by=(), fields=None) -> list:
+    """
+    Serializa las órdenes que cumplen `criteria` a partir de sus columnas
+    (read_models.OrderRow), sin instanciar modelos del ORM.
+    """
+    return [order.to_dict(fields) for order in load_orders(criteria, order_by, fields=fields)]
+
+
+def serialize_order(order_id: int) -> dict:
+    """Recarga una orden con sus relaciones y la serializa."""
+    order = (
+        Order.query.options(*order_load_options())
+        .populate_existing()
+        .filter_by(id=order_id)
+        .first_or_404()
+    )
+    return order.to_dict()
+
+
+def encode_cursor(order: Order) -> str:
+    """Codifica la posición `(created_at, id)` de una orden como cursor opaco."""
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """
+    Decodifica un cursor. Lanza ValueError si no es válido (los errores de
+    base64 y de decodificación también son subclases de ValueError).
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, order_id = raw.split("|")
+    return datetime.fromisoformat(created_at), int(order_id)
+
+
+def paginate_orders(criteria, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=None) -> dict:
+    """
+    Pagina órdenes por llave `(created_at, id)` en orden descendente.
+
+    En lugar de OFFSET se filtra a partir de la última fila de la página
+    anterior, así que el costo de cada página no depende de cuántas órdenes
+    existan antes de ella. Las órdenes se leen como read_models.OrderRow.
+    """
+    criteria = list(criteria)
+    if cursor:
+        created_at, order_id = decode_cursor(cursor)
+        criteria.append(tuple_(Order.created_at, Order.id) < (created_at, order_id))
+
+    orders = load_orders(
+        criteria, (Order.created_at.desc(), Order.id.desc()), limit + 1, fields
+    )
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1])
+
+    return {
+        "orders": [order.to_dict(fields) for order in orders],
+        "next_cursor": next_cursor,
+    }
+
+
+def ticket_data(order: Order) -> dict:
+    """Datos que necesita el generador de tickets a partir de una orden."""
+    # Las fechas se guardan en UTC; el ticket se imprime en hora local
+    printed_at = (order.completed_at or order.created_at).replace(tzinfo=timezone.utc)
+    return {
+        "ticket_number": order.ticket_number,
+        "customer_name": order.customer_name,
+        "order_type": order.order_type,
+        "delivery_phone": order.delivery_phone,
+        "delivery_address": order.delivery_address,
+        "date": printed_at.astimezone().replace(tzinfo=None),
+        "items": [
+            {
+                "name": item.menu_item.name,
+                "quantity": item.quantity,
+                "price": item.unit_price,
+                "notes": item.notes,
+            }
+            for item in order.items
+        ],
+        "subtotal": order.subtotal,
+        "iva": order.iva,
+        "total": order.total,
+        "payment_method": order.payment_method,
+    }
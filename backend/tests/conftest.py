@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from database import db
+from events import LocalBroker
+
+CREDENTIALS = {
+    "admin": {"username": "admin", "password": "admin123"},
+    "cashier": {"username": "cajero1", "password": "cajero123"},
+    "waiter": {"username": "mesero1", "password": "mesero123"},
+}
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Devuelve una función que genera headers Authorization según rol."""
+
+    def _headers(role="admin"):
+        response = client.post("/api/auth/login", json=CREDENTIALS[role])
+        token = response.get_json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return _headers
+
+
+@pytest.fixture
+def query_counter(app):
+    """Cuenta las sentencias SQL ejecutadas mientras el contador está activo."""
+
+    class Counter:
+        count = 0
+        enabled = False
+
+        def __enter__(self):
+            self.count = 0
+            self.enabled = True
+            return self
+
+        def __exit__(self, *exc):
+            self.enabled = False
+
+    counter = Counter()
+
+    def _before_cursor_execute(*args, **kwargs):
+        if counter.enabled:
+            counter.count += 1
+
+    event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+    yield counter
+    event.remove(db.engine, "before_cursor_execute", _before_cursor_execute)
+
+
+class SharedBroker(LocalBroker):
+    """Broker que se declara compartido entre workers (como uno sobre Redis)."""
+
+    shared = True
+
+
+@pytest.fixture
+def shared_broker(app):
+    app.extensions["event_bus"] = SharedBroker(app)
+    return app.extensions["event_bus"]
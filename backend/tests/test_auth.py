@@ -0,0 +1,149 @@
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from flask_jwt_extended import decode_token
+from werkzeug.security import generate_password_hash
+
+from database import db
+from models import RevokedToken, User
+from passwords import password_hasher
+from tests.conftest import CREDENTIALS
+
+
+def _user(username):
+    return User.query.filter_by(username=username).first()
+
+
+def _after_ttl(app):
+    """Simula que ya pasó el TTL de los cachés de autenticación."""
+    later = time.monotonic() + app.config["AUTH_CACHE_TTL_SECONDS"] + 1
+    return patch("auth_cache.time.monotonic", return_value=later)
+
+
+def test_deactivated_users_are_rejected_immediately(client, auth_headers):
+    waiter = auth_headers("waiter")
+    user_id = _user("mesero1").id
+    assert client.get("/api/orders/open", headers=waiter).status_code == 200
+
+    response = client.put(f"/api/auth/users/{user_id}", json={"active": False},
+                          headers=auth_headers("admin"))
+    assert response.status_code == 200
+
+    response = client.get("/api/orders/open", headers=waiter)
+    assert response.status_code == 401
+    assert response.get_json()["message"] == "Usuario inactivo"
+    response = client.post("/api/auth/login", json={"username": "mesero1", "password": "mesero123"})
+    assert response.status_code == 403
+
+
+def test_role_changes_apply_to_existing_tokens(client, auth_headers):
+    waiter = auth_headers("waiter")
+    assert client.get("/api/orders/export", headers=waiter).status_code == 403
+
+    client.put(f"/api/auth/users/{_user('mesero1').id}", json={"role": "admin"},
+               headers=auth_headers("admin"))
+
+    assert client.get("/api/orders/export", headers=waiter).status_code == 200
+    response = client.put(f"/api/auth/users/{_user('mesero1').id}", json={"role": "chef"},
+                          headers=auth_headers("admin"))
+    assert response.status_code == 400
+
+
+def test_changes_from_other_workers_apply_after_the_ttl(app, client, auth_headers):
+    cashier = auth_headers("cashier")
+    client.get("/api/orders/open", headers=cashier)
+
+    # Otro worker desactiva al usuario: este proceso aún tiene el estado en caché
+    _user("cajero1").active = False
+    db.session.commit()
+    assert client.get("/api/orders/open", headers=cashier).status_code == 200
+
+    with _after_ttl(app):
+        assert client.get("/api/orders/open", headers=cashier).status_code == 401
+
+
+def test_logout_revokes_only_the_current_token(client, auth_headers):
+    first = auth_headers("cashier")
+    second = auth_headers("cashier")
+
+    assert client.post("/api/auth/logout", headers=first).status_code == 200
+
+    response = client.get("/api/orders/open", headers=first)
+    assert response.status_code == 401
+    assert response.get_json()["error"] == "Token revoked"
+    assert client.get("/api/orders/open", headers=second).status_code == 200
+
+
+def test_tokens_revoked_by_other_workers_are_picked_up(app, client, auth_headers):
+    headers = auth_headers("cashier")
+    client.get("/api/orders/open", headers=headers)
+    jti = decode_token(headers["Authorization"].split()[1])["jti"]
+
+    db.session.add(RevokedToken(jti=jti, expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db.session.commit()
+    assert client.get("/api/orders/open", headers=headers).status_code == 200
+
+    with _after_ttl(app):
+        assert client.get("/api/orders/open", headers=headers).status_code == 401
+
+
+def test_auth_checks_do_not_query_on_the_hot_path(client, auth_headers, query_counter, shared_broker):
+    headers = auth_headers("waiter")
+    version = client.get("/api/kitchen/queue", headers=headers).get_json()["version"]
+
+    with query_counter:
+        response = client.get(f"/api/kitchen/queue?since={version}", headers=headers)
+
+    assert response.status_code == 200
+    assert query_counter.count == 0
+
+
+def test_legacy_hashes_are_upgraded_on_login(app, client):
+    waiter = _user("mesero1")
+    waiter.password_hash = generate_password_hash("mesero123", method="pbkdf2:sha256:500")
+    db.session.commit()
+
+    assert client.post("/api/auth/login", json=CREDENTIALS["waiter"]).status_code == 200
+
+    db.session.refresh(waiter)
+    assert waiter.password_hash.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+    assert not password_hasher.needs_rehash(waiter.password_hash)
+    assert client.post("/api/auth/login", json=CREDENTIALS["waiter"]).status_code == 200
+
+
+def test_repeated_failures_are_throttled_before_hashing(app, client):
+    wrong = {"username": "mesero1", "password": "incorrecta"}
+    for _ in range(app.config["LOGIN_MAX_FAILURES"]):
+        assert client.post("/api/auth/login", json=wrong).status_code == 401
+
+    with patch.object(password_hasher, "verify") as verify:
+        response = client.post("/api/auth/login", json=CREDENTIALS["waiter"])
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    verify.assert_not_called()
+    # Otros usuarios (desde la misma IP) siguen entrando
+    assert client.post("/api/auth/login", json=CREDENTIALS["cashier"]).status_code == 200
+
+    later = time.monotonic() + app.config["LOGIN_FAILURE_WINDOW_SECONDS"] + 1
+    with patch("passwords.time.monotonic", return_value=later):
+        assert client.post("/api/auth/login", json=CREDENTIALS["waiter"]).status_code == 200
+
+
+def test_login_answers_503_when_the_hash_pool_is_saturated(app, client):
+    app.config["PASSWORD_HASH_MAX_PENDING"] = 0
+
+    response = client.post("/api/auth/login", json=CREDENTIALS["waiter"])
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_unknown_users_are_verified_against_a_dummy_hash(app, client):
+    with patch.object(password_hasher, "verify", wraps=password_hasher.verify) as verify:
+        response = client.post("/api/auth/login", json={"username": "nadie", "password": "x"})
+
+    assert response.status_code == 401
+    # Misma verificación (método y costo) que un usuario real
+    verify.assert_called_once_with(password_hasher.dummy_hash(), "x")
+    assert not password_hasher.needs_rehash(password_hasher.dummy_hash())
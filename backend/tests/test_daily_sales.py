@@ -0,0 +1,96 @@
+import random
+from collections import Counter as Tally
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from app import create_app
+from database import db
+from models import DailySales, Order
+from tests.conftest import CREDENTIALS
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """App sobre un archivo SQLite para que cada hilo tenga su propia conexión."""
+    app = create_app(
+        "testing", {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'sales.db'}"}
+    )
+    with app.app_context():
+        yield app
+
+
+def _open_orders(count):
+    rng = random.Random(7)
+    orders = []
+    for n in range(count):
+        subtotal = rng.randint(1, 2000) * 0.5
+        iva = round(subtotal * 0.16, 2)
+        orders.append(
+            Order(
+                ticket_number=n + 1,
+                subtotal=subtotal,
+                iva=iva,
+                total=round(subtotal + iva, 2),
+                status="open",
+            )
+        )
+    db.session.add_all(orders)
+    db.session.commit()
+    return [order.id for order in orders]
+
+
+def _cashier_headers(app):
+    token = app.test_client().post(
+        "/api/auth/login", json=CREDENTIALS["cashier"]
+    ).get_json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_concurrent_completions_keep_daily_totals_exact(file_app):
+    order_ids = _open_orders(400)
+    headers = _cashier_headers(file_app)
+
+    def complete(order_id):
+        method = "cash" if order_id % 2 else "card"
+        response = file_app.test_client().put(
+            f"/api/orders/{order_id}/complete",
+            json={"payment_method": method},
+            headers=headers,
+        )
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        statuses = Tally(pool.map(complete, order_ids))
+    assert statuses == {200: len(order_ids)}
+
+    db.session.expire_all()
+    completed = Order.query.filter_by(status="completed").all()
+    daily = DailySales.query.filter_by(date=date.today()).one()
+
+    assert daily.total_orders == len(completed)
+    assert daily.total_sales == pytest.approx(sum(o.total for o in completed))
+    assert daily.total_iva == pytest.approx(sum(o.iva for o in completed))
+    assert daily.cash_sales == pytest.approx(
+        sum(o.total for o in completed if o.payment_method == "cash")
+    )
+    assert daily.card_sales == pytest.approx(
+        sum(o.total for o in completed if o.payment_method == "card")
+    )
+
+
+def test_same_ticket_completed_concurrently_counts_once(file_app):
+    (order_id,) = _open_orders(1)
+    headers = _cashier_headers(file_app)
+
+    def complete(_):
+        return file_app.test_client().put(
+            f"/api/orders/{order_id}/complete", json={}, headers=headers
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = Tally(pool.map(complete, range(8)))
+
+    assert statuses == {200: 1, 400: 7}
+    assert DailySales.query.filter_by(date=date.today()).one().total_orders == 1
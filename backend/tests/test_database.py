@@ -0,0 +1,54 @@
+import os
+from unittest.mock import patch
+
+from flask_migrate import upgrade
+from sqlalchemy import inspect, text
+
+from app import create_app
+from config import _engine_options
+from database import db
+from models import User
+
+
+def _pragma(name):
+    return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_sqlite_connections_use_wal_and_pragmas(tmp_path):
+    app = create_app("testing", {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'pos.db'}"})
+
+    with app.app_context():
+        assert _pragma("journal_mode") == "wal"
+        assert _pragma("synchronous") == 1  # NORMAL
+        assert _pragma("busy_timeout") == app.config["SQLITE_PRAGMAS"]["busy_timeout"]
+        assert _pragma("mmap_size") == app.config["SQLITE_PRAGMAS"]["mmap_size"]
+
+
+def test_pool_options_come_from_the_environment(monkeypatch):
+    assert _engine_options("sqlite:///restaurant.db") == {}
+
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    options = _engine_options("postgresql+psycopg2://pos@db/restaurant")
+
+    assert options["pool_size"] == 12
+    assert options["max_overflow"] == 10
+    assert options["pool_pre_ping"] is False
+
+
+def test_migrations_own_the_schema_when_create_all_is_off(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'migrated.db'}"
+    app = create_app("testing", {"SQLALCHEMY_DATABASE_URI": uri, "DB_CREATE_ALL": False})
+
+    with app.app_context():
+        # Sin create_all ni seeds: la base queda vacía para `flask db upgrade`
+        assert inspect(db.engine).get_table_names() == []
+        upgrade(directory=os.path.join(app.root_path, "migrations"))
+        assert "alembic_version" in inspect(db.engine).get_table_names()
+
+    # Con la base bajo Alembic no se vuelve a llamar create_all, solo los seeds
+    with patch.object(db, "create_all") as create_all:
+        app = create_app("testing", {"SQLALCHEMY_DATABASE_URI": uri})
+    create_all.assert_not_called()
+    with app.app_context():
+        assert User.query.count() == 3
@@ -0,0 +1,65 @@
+import re
+from datetime import datetime
+from pathlib import Path
+
+from models import MenuItem
+from utils.escpos import EscPosGenerator
+
+GOLDEN = Path(__file__).parent / "golden" / "ticket_delivery.escpos"
+
+SAMPLE_ORDER = {
+    "ticket_number": 7,
+    "customer_name": "Juan Pérez",
+    "order_type": "delivery",
+    "delivery_phone": "33-1234-5678",
+    "delivery_address": "Calle Morelos #123, Col. Centro, Guadalajara, Jalisco",
+    "date": datetime(2026, 1, 2, 13, 45),
+    "items": [
+        {"name": "Tacos al Pastor", "quantity": 3, "price": 45.00, "notes": "Sin cebolla"},
+        {"name": "Agua de Horchata", "quantity": 2, "price": 25.00, "notes": None},
+    ],
+    "subtotal": 185.00,
+    "iva": 29.60,
+    "total": 214.60,
+    "payment_method": "card",
+}
+
+
+def test_escpos_ticket_matches_golden_file():
+    # Si el layout cambia a propósito, regenerar con:
+    #   GOLDEN.write_bytes(EscPosGenerator().render(SAMPLE_ORDER))
+    assert EscPosGenerator().render(SAMPLE_ORDER) == GOLDEN.read_bytes()
+
+
+def test_escpos_lines_fit_the_paper():
+    data = EscPosGenerator().render(SAMPLE_ORDER)
+    text = data.decode("cp858")
+
+    assert data.startswith(b"\x1b@\x1bt\x13")
+    assert data.endswith(b"\x1dVB\x00")
+    assert "Cliente: Juan Pérez" in text
+    assert "Nota: Sin cebolla" in text
+    # Sin comandos, ninguna línea pasa de 48 columnas
+    plain = re.sub(r"\x1b@|\x1b[taEd].|\x1d!.|\x1dV..", "", text)
+    assert max(len(line) for line in plain.split("\n")) <= 48
+
+
+def test_ticket_endpoint_serves_escpos(client, auth_headers):
+    menu_item = MenuItem.query.first()
+    order = client.post(
+        "/api/orders/",
+        json={"items": [{"id": menu_item.id, "quantity": 2}]},
+        headers=auth_headers("waiter"),
+    ).get_json()
+    headers = auth_headers("cashier")
+
+    response = client.get(f"/api/orders/{order['id']}/ticket?format=escpos", headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/octet-stream"
+    assert response.data.startswith(b"\x1b@")
+    assert f"#{order['ticket_number']:04d}".encode() in response.data
+    assert menu_item.name.encode("cp858") in response.data
+
+    response = client.get(f"/api/orders/{order['id']}/ticket?format=zpl", headers=headers)
+    assert response.status_code == 400
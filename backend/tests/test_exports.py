@@ -0,0 +1,137 @@
+import csv
+import gc
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from database import db
+from models import MenuItem, Order, OrderItem
+
+
+def _place_orders(client, auth_headers):
+    waiter = auth_headers("waiter")
+    cashier = auth_headers("cashier")
+    menu = MenuItem.query.limit(2).all()
+
+    first = client.post(
+        "/api/orders/",
+        json={
+            "customer_name": "Mesa, 4",
+            "items": [{"id": menu[0].id, "quantity": 2, "notes": 'sin "salsa"'},
+                      {"id": menu[1].id, "quantity": 1}],
+        },
+        headers=waiter,
+    ).get_json()
+    client.put(f"/api/orders/{first['id']}/complete", json={}, headers=cashier)
+    second = client.post(
+        "/api/orders/", json={"items": [{"id": menu[0].id, "quantity": 1}]}, headers=waiter
+    ).get_json()
+    return first, second
+
+
+def test_csv_export_has_one_row_per_order_line(client, auth_headers):
+    first, second = _place_orders(client, auth_headers)
+
+    response = client.get("/api/orders/export", headers=auth_headers())
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.is_streamed
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [int(row["order_id"]) for row in rows] == [first["id"], first["id"], second["id"]]
+    assert rows[0]["customer_name"] == "Mesa, 4"
+    assert rows[0]["notes"] == 'sin "salsa"'
+    assert rows[0]["status"] == "completed"
+    assert rows[0]["created_by"] == "mesero1"
+    assert float(rows[0]["order_total"]) == first["total"]
+
+
+def test_ndjson_export_filters_by_status_and_dates(client, auth_headers):
+    first, _ = _place_orders(client, auth_headers)
+    today = datetime.utcnow().date()
+
+    response = client.get(
+        f"/api/orders/export?format=ndjson&status=completed&from={today}&to={today}",
+        headers=auth_headers(),
+    )
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.mimetype == "application/x-ndjson"
+    assert {line["order_id"] for line in lines} == {first["id"]}
+    assert sorted(line["item_name"] for line in lines) == sorted(
+        item["menu_item"]["name"] for item in first["items"]
+    )
+
+    yesterday = today - timedelta(days=1)
+    response = client.get(f"/api/orders/export?to={yesterday}", headers=auth_headers())
+    assert response.get_data(as_text=True).count("\n") == 1  # solo el encabezado
+
+
+def test_export_validates_parameters(client, auth_headers):
+    headers = auth_headers()
+
+    assert client.get("/api/orders/export?format=xlsx", headers=headers).status_code == 400
+    assert client.get("/api/orders/export?from=01/01/2026", headers=headers).status_code == 400
+    assert client.get("/api/orders/export", headers=auth_headers("cashier")).status_code == 403
+
+
+def _bulk_orders(count):
+    menu_item = MenuItem.query.first()
+    start = datetime(2026, 1, 1)
+    batch = 10_000
+    for offset in range(0, count, batch):
+        ids = range(offset + 1, min(offset + batch, count) + 1)
+        db.session.execute(insert(Order), [
+            {
+                "id": order_id,
+                "ticket_number": order_id,
+                "ticket_scope": "export",
+                "customer_name": "Cliente General",
+                "subtotal": 100.0,
+                "iva": 16.0,
+                "total": 116.0,
+                "status": "completed",
+                "created_at": start + timedelta(seconds=order_id),
+            }
+            for order_id in ids
+        ])
+        db.session.execute(insert(OrderItem), [
+            {
+                "order_id": order_id,
+                "menu_item_id": menu_item.id,
+                "quantity": 2,
+                "unit_price": 50.0,
+                "subtotal": 100.0,
+            }
+            for order_id in ids
+        ])
+    db.session.commit()
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="requiere /proc (Linux)")
+def test_export_of_100k_orders_uses_constant_memory(client, auth_headers):
+    _bulk_orders(100_000)
+    headers = auth_headers()
+    gc.collect()
+    baseline = _rss_bytes()
+
+    response = client.get("/api/orders/export?format=ndjson", headers=headers, buffered=False)
+    lines = 0
+    peak = baseline
+    for chunk in response.response:
+        lines += chunk.count(b"\n")
+        peak = max(peak, _rss_bytes())
+    response.close()
+
+    assert lines == 100_000
+    # Cargar las 100k filas como dicts haría crecer el proceso cientos de MB
+    assert peak - baseline < 32 * 1024 * 1024
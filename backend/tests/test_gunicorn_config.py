@@ -0,0 +1,74 @@
+import importlib
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy.engine import Engine
+
+import gunicorn_config
+from app import create_app
+from database import db
+
+
+def _load(monkeypatch, env):
+    if env is None:
+        monkeypatch.delenv("FLASK_ENV", raising=False)
+        monkeypatch.delenv("ENV", raising=False)
+    else:
+        monkeypatch.setenv("FLASK_ENV", env)
+    return importlib.reload(gunicorn_config)
+
+
+def test_profile_follows_flask_env(monkeypatch):
+    monkeypatch.delenv("EVENTS_BROKER", raising=False)
+    monkeypatch.delenv("EVENTS_SINGLE_WRITER", raising=False)
+    production = _load(monkeypatch, "production")
+    assert production.preload_app and not production.reload
+    assert production.worker_class == "gthread"
+    assert production.max_requests_jitter > 0
+    # Sin broker compartido, un solo worker ve todos los eventos en memoria
+    assert production.workers == 1
+    assert production.threads >= 32
+    # ... y la cola de cocina se mantiene solo con sus eventos
+    assert os.environ["EVENTS_SINGLE_WRITER"] == "true"
+
+    development = _load(monkeypatch, "development")
+    assert development.reload and not development.preload_app
+    assert development.workers == 1
+
+    # Mismo perfil por defecto que create_app
+    assert _load(monkeypatch, None)._ENV == "development"
+
+    monkeypatch.setenv("EVENTS_BROKER", "brokers:RedisBroker")
+    monkeypatch.delenv("EVENTS_SINGLE_WRITER")
+    assert _load(monkeypatch, "production").workers >= 2
+    assert "EVENTS_SINGLE_WRITER" not in os.environ
+
+    monkeypatch.setenv("GUNICORN_WORKERS", "7")
+    assert _load(monkeypatch, "production").workers == 7
+
+
+def test_workers_drop_the_engine_pools_inherited_from_the_master(tmp_path):
+    app = create_app("testing", {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+        "SQLALCHEMY_BINDS": {"replica": f"sqlite:///{tmp_path / 'replica.db'}"},
+    })
+    worker = SimpleNamespace(app=SimpleNamespace(wsgi=lambda: app))
+
+    with app.app_context(), patch.object(Engine, "dispose", autospec=True) as dispose:
+        gunicorn_config.post_fork(SimpleNamespace(cfg=SimpleNamespace(preload_app=True)), worker)
+        assert {call.args[0] for call in dispose.call_args_list} == set(db.engines.values())
+        assert len(db.engines) == 2
+        assert all(call.kwargs == {"close": False} for call in dispose.call_args_list)
+
+        dispose.reset_mock()
+        gunicorn_config.post_fork(SimpleNamespace(cfg=SimpleNamespace(preload_app=False)), worker)
+        dispose.assert_not_called()
+
+
+def test_worker_exit_closes_the_ticket_render_pool(app):
+    worker = SimpleNamespace(app=SimpleNamespace(wsgi=lambda: app))
+
+    with patch("ticket_queue.ticket_queue.shutdown") as shutdown:
+        gunicorn_config.worker_exit(None, worker)
+        shutdown.assert_called_once_with(app)
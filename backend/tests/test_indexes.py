@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from database import db
+from models import Order, OrderItem
+
+
+def _query_plan(query) -> str:
+    """Devuelve el plan de SQLite (EXPLAIN QUERY PLAN) para una consulta ORM."""
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(
+        str(value) if isinstance(value, datetime) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    )
+    rows = db.session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {compiled}", params
+    )
+    return " | ".join(row[-1] for row in rows)
+
+
+def _day_range():
+    day_start = datetime(2026, 1, 15)
+    return day_start, day_start + timedelta(days=1)
+
+
+def test_status_date_range_uses_composite_index(app):
+    day_start, day_end = _day_range()
+    query = Order.query.filter(
+        Order.status == "completed",
+        Order.created_at >= day_start,
+        Order.created_at < day_end,
+    )
+
+    assert "ix_orders_status_created_at" in _query_plan(query)
+
+
+def test_order_type_date_range_uses_composite_index(app):
+    day_start, day_end = _day_range()
+    query = Order.query.filter(
+        Order.order_type == "delivery",
+        Order.created_at >= day_start,
+        Order.created_at < day_end,
+    )
+
+    assert "ix_orders_order_type_created_at" in _query_plan(query)
+
+
+def test_date_range_is_sargable(app):
+    day_start, day_end = _day_range()
+    query = Order.query.filter(Order.created_at >= day_start, Order.created_at < day_end)
+
+    plan = _query_plan(query)
+    assert "SCAN orders" not in plan
+    assert "ix_orders_created_at_id" in plan
+
+
+def test_order_items_foreign_keys_are_indexed(app):
+    assert "ix_order_items_order_id" in _query_plan(
+        OrderItem.query.filter(OrderItem.order_id == 1)
+    )
+    assert "ix_order_items_menu_item_id" in _query_plan(
+        OrderItem.query.filter(OrderItem.menu_item_id == 1)
+    )
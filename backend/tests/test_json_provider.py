@@ -0,0 +1,37 @@
+import json
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app
+
+PAYLOAD = {"total": Decimal("104.40"), "created_at": datetime(2026, 10, 17, 13, 5, 9), "name": "Piña"}
+
+
+def _encoder(fast: bool):
+    """Con `fast=False` se simula que orjson no está instalado."""
+    return nullcontext() if fast else patch("json_provider.orjson", None)
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["orjson", "json"])
+def test_decimals_and_datetimes_are_encoded_natively(app, fast):
+    with _encoder(fast):
+        body = app.json.response(PAYLOAD).get_data(as_text=True)
+
+    assert json.loads(body) == {"total": 104.4, "created_at": "2026-10-17T13:05:09", "name": "Piña"}
+    assert app.json.loads(app.json.dumps(PAYLOAD))["total"] == 104.4
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["orjson", "json"])
+def test_responses_are_compact_outside_debug(fast):
+    app = create_app("testing", {"DEBUG": False})
+    with _encoder(fast):
+        compact = app.json.response({"b": 1, "a": [1, 2]}).get_data(as_text=True)
+        app.debug = True
+        pretty = app.json.response({"b": 1, "a": [1, 2]}).get_data(as_text=True)
+
+    assert compact == '{"a":[1,2],"b":1}\n'
+    assert pretty.startswith('{\n  "a": [')
@@ -0,0 +1,170 @@
+from sqlalchemy import update
+
+from database import db
+from models import MenuItem, Order, OrderItem
+
+
+def _menu_by_category():
+    menu = {}
+    for item in MenuItem.query.order_by(MenuItem.id):
+        menu.setdefault(item.category, item)
+    return menu
+
+
+def _create(client, headers, *lines):
+    return client.post(
+        "/api/orders/",
+        json={"items": [{"id": item.id, "quantity": quantity} for item, quantity in lines]},
+        headers=headers,
+    ).get_json()
+
+
+def test_queue_groups_open_lines_by_station(client, auth_headers):
+    waiter = auth_headers("waiter")
+    menu = _menu_by_category()
+    _create(client, waiter, (menu["Tacos"], 3), (menu["Bebidas"], 1))
+    done = _create(client, waiter, (menu["Tacos"], 1))
+    client.put(f"/api/orders/{done['id']}/complete", json={}, headers=auth_headers("cashier"))
+
+    queue = client.get("/api/kitchen/queue", headers=waiter).get_json()
+
+    assert queue["full"] is True
+    assert sorted(queue["stations"]) == ["Bebidas", "Tacos"]
+    assert [line["quantity"] for line in queue["stations"]["Tacos"]] == [3]
+
+    tacos = client.get("/api/kitchen/queue?category=Tacos", headers=waiter).get_json()
+    assert list(tacos["stations"]) == ["Tacos"]
+
+
+def test_since_returns_only_changed_lines(client, auth_headers):
+    waiter = auth_headers("waiter")
+    menu = _menu_by_category()
+    order = _create(client, waiter, (menu["Tacos"], 2))
+    version = client.get("/api/kitchen/queue", headers=waiter).get_json()["version"]
+
+    client.post(
+        f"/api/orders/{order['id']}/items",
+        json={"items": [{"id": menu["Bebidas"].id, "quantity": 4}]},
+        headers=waiter,
+    )
+    delta = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+
+    assert delta["full"] is False
+    assert list(delta["stations"]) == ["Bebidas"]
+    drink = delta["stations"]["Bebidas"][0]
+    assert drink["quantity"] == 4
+    assert drink["ticket_number"] == order["ticket_number"]
+
+    client.put(f"/api/orders/{order['id']}/items/{drink['id']}", json={"quantity": 1},
+               headers=waiter)
+    delta = client.get(f"/api/kitchen/queue?since={delta['version']}", headers=waiter).get_json()
+    assert [line["quantity"] for line in delta["stations"]["Bebidas"]] == [1]
+    assert delta["removed"] == []
+
+    client.put(f"/api/orders/{order['id']}/complete", json={}, headers=auth_headers("cashier"))
+    delta = client.get(f"/api/kitchen/queue?since={delta['version']}", headers=waiter).get_json()
+    assert delta["stations"] == {}
+    assert sorted(delta["removed"]) == sorted(
+        [drink["id"], order["items"][0]["id"]]
+    )
+
+
+def test_polling_with_a_shared_broker_does_not_query_the_database(client, auth_headers, query_counter,
+                                                                   shared_broker):
+    waiter = auth_headers("waiter")
+    _create(client, waiter, (MenuItem.query.first(), 1))
+    version = client.get("/api/kitchen/queue", headers=waiter).get_json()["version"]
+
+    with query_counter:
+        for _ in range(5):
+            delta = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+
+    assert query_counter.count == 0
+    assert delta == {"version": version, "full": False, "stations": {}, "removed": []}
+
+    order = _create(client, waiter, (MenuItem.query.first(), 2))
+    delta = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+    assert delta["full"] is False
+    assert [line["order_id"] for lines in delta["stations"].values() for line in lines] == [order["id"]]
+
+
+def test_polling_with_the_local_broker_only_reads_the_watermark(client, auth_headers, query_counter):
+    waiter = auth_headers("waiter")
+    _create(client, waiter, (MenuItem.query.first(), 1))
+    version = client.get("/api/kitchen/queue", headers=waiter).get_json()["version"]
+
+    with query_counter:
+        for _ in range(5):
+            delta = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+
+    assert query_counter.count == 5
+    assert delta == {"version": version, "full": False, "stations": {}, "removed": []}
+
+
+def test_polling_as_the_only_writer_does_not_query_the_database(app, client, auth_headers, query_counter):
+    app.config["EVENTS_SINGLE_WRITER"] = True
+    waiter = auth_headers("waiter")
+    _create(client, waiter, (MenuItem.query.first(), 1))
+    version = client.get("/api/kitchen/queue", headers=waiter).get_json()["version"]
+
+    with query_counter:
+        for _ in range(5):
+            delta = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+
+    assert query_counter.count == 0
+    assert delta == {"version": version, "full": False, "stations": {}, "removed": []}
+
+    order = _create(client, waiter, (MenuItem.query.first(), 2))
+    delta = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+    assert [line["order_id"] for lines in delta["stations"].values() for line in lines] == [order["id"]]
+
+
+def test_changes_made_by_other_workers_reach_the_queue(client, auth_headers):
+    waiter = auth_headers("waiter")
+    menu = _menu_by_category()
+    closed = _create(client, waiter, (menu["Tacos"], 1))
+    version = client.get("/api/kitchen/queue", headers=waiter).get_json()["version"]
+
+    # Otro worker crea una orden y cierra otra: aquí no llega ningún evento
+    order = Order(ticket_number=999, status="open", subtotal=0, iva=0, total=0)
+    db.session.add(order)
+    db.session.flush()
+    db.session.add(OrderItem(order_id=order.id, menu_item_id=menu["Bebidas"].id, quantity=2,
+                             unit_price=menu["Bebidas"].price, subtotal=menu["Bebidas"].price * 2))
+    db.session.execute(
+        update(Order).where(Order.id == closed["id"]).values(status="completed", version=Order.version + 1)
+    )
+    db.session.commit()
+
+    delta = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+    assert delta["full"] is False
+    assert list(delta["stations"]) == ["Bebidas"]
+    assert delta["stations"]["Bebidas"][0]["ticket_number"] == 999
+    assert delta["removed"] == [closed["items"][0]["id"]]
+
+
+def test_versions_from_another_worker_get_a_full_queue(client, auth_headers):
+    waiter = auth_headers("waiter")
+    _create(client, waiter, (MenuItem.query.first(), 1))
+    epoch, number = client.get("/api/kitchen/queue", headers=waiter).get_json()["version"].split(":")
+
+    queue = client.get(f"/api/kitchen/queue?since=otro{epoch}:{number}", headers=waiter).get_json()
+    assert queue["full"] is True
+    assert sum(len(lines) for lines in queue["stations"].values()) == 1
+
+    for since in ("x", "7", f"{epoch}:x"):
+        assert client.get(f"/api/kitchen/queue?since={since}", headers=waiter).status_code == 400
+
+
+def test_old_versions_get_a_full_queue(app, client, auth_headers):
+    app.config["KITCHEN_CHANGELOG_SIZE"] = 2
+    waiter = auth_headers("waiter")
+    menu_item = MenuItem.query.first()
+    version = client.get("/api/kitchen/queue", headers=waiter).get_json()["version"]
+
+    for _ in range(3):
+        _create(client, waiter, (menu_item, 1))
+    queue = client.get(f"/api/kitchen/queue?since={version}", headers=waiter).get_json()
+
+    assert queue["full"] is True
+    assert sum(len(lines) for lines in queue["stations"].values()) == 3
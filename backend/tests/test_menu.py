@@ -0,0 +1,73 @@
+from models import MenuItem
+
+
+def test_menu_sends_etag_and_honours_if_none_match(client):
+    response = client.get("/api/menu/")
+    etag = response.headers["ETag"]
+
+    assert response.status_code == 200
+    assert etag.startswith('"')
+
+    response = client.get("/api/menu/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_menu_cache_hit_does_no_orm_work(client, query_counter):
+    client.get("/api/menu/?category=Tacos")
+
+    with query_counter:
+        response = client.get("/api/menu/?category=Tacos")
+
+    assert response.status_code == 200
+    assert {item["category"] for item in response.get_json()} == {"Tacos"}
+    # Solo se lee la versión del menú
+    assert query_counter.count == 1
+
+
+def test_menu_changes_invalidate_cached_responses(client, auth_headers):
+    headers = auth_headers("admin")
+    old_etag = client.get("/api/menu/?category=Bebidas").headers["ETag"]
+    old_categories = client.get("/api/menu/categories").get_json()
+
+    created = client.post(
+        "/api/menu/",
+        json={"name": "Café de olla", "price": 30, "category": "Calientes"},
+        headers=headers,
+    ).get_json()
+    assert "Calientes" in client.get("/api/menu/categories").get_json()
+    assert len(client.get("/api/menu/categories").get_json()) == len(old_categories) + 1
+
+    drink = MenuItem.query.filter_by(category="Bebidas").first()
+    client.put(f"/api/menu/{drink.id}", json={"available": False}, headers=headers)
+
+    response = client.get("/api/menu/?category=Bebidas", headers={"If-None-Match": old_etag})
+    assert response.status_code == 200
+    assert drink.id not in [item["id"] for item in response.get_json()]
+
+    client.delete(f"/api/menu/{created['id']}", headers=headers)
+    assert client.get("/api/menu/?category=Calientes").get_json() == []
+
+
+def test_menu_todos_returns_all_available_items(client):
+    everything = client.get("/api/menu/").get_json()
+
+    assert client.get("/api/menu/?category=Todos").get_json() == everything
+    assert len(everything) == MenuItem.query.filter_by(available=True).count()
+
+
+def test_invalid_prices_are_rejected(client, auth_headers):
+    headers = auth_headers("admin")
+    item = MenuItem.query.first()
+
+    for price in ("abc", "NaN", "Infinity", None, True, -5, [10]):
+        response = client.post(
+            "/api/menu/", json={"name": "Agua", "price": price, "category": "Bebidas"}, headers=headers
+        )
+        assert response.status_code == 400, price
+        response = client.put(f"/api/menu/{item.id}", json={"price": price}, headers=headers)
+        assert response.status_code == 400, price
+
+    response = client.put(f"/api/menu/{item.id}", json={"price": "25.50"}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["price"] == 25.5
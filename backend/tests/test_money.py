@@ -0,0 +1,157 @@
+import random
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import func, select, text
+
+from database import db
+from models import DailySales, MenuItem, Order
+from money import from_cents, to_cents
+from rollups import record_daily_sale
+from totals import order_totals_cents
+
+
+def _reference_totals(subtotal: Decimal) -> tuple[Decimal, Decimal]:
+    """Cálculo de referencia con Decimal: IVA 16 % redondeado a centavos."""
+    iva = (subtotal * Decimal("0.16")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return iva, subtotal + iva
+
+
+def test_amounts_convert_to_exact_cents():
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents("10.005") == 1001
+    assert to_cents(45) == 4500
+    assert to_cents(Decimal("-3.25")) == -325
+    assert from_cents(1050) == Decimal("10.50")
+    assert from_cents(to_cents(99.99)) == Decimal("99.99")
+
+
+def test_money_columns_store_cents_and_read_decimals(app):
+    item = MenuItem(name="Café de olla", price=0.1 + 0.2, category="Bebidas")
+    db.session.add(item)
+    db.session.commit()
+    db.session.expire_all()
+
+    assert db.session.get(MenuItem, item.id).price == Decimal("0.30")
+    raw = db.session.execute(db.text("SELECT price FROM menu_items WHERE id = :id"), {"id": item.id})
+    assert raw.scalar() == 30
+
+
+def test_daily_sales_upsert_and_sql_sum_stay_exact(app):
+    rng = random.Random(20261017)
+    day_reference = Decimal("0.00")
+    iva_reference = Decimal("0.00")
+    card_reference = Decimal("0.00")
+    orders = []
+
+    for number in range(1, 2001):
+        subtotal = from_cents(rng.randrange(50, 500_000))  # de $0.50 a $5,000.00
+        iva, total = _reference_totals(subtotal)
+        assert order_totals_cents(to_cents(subtotal)) == (to_cents(subtotal), to_cents(iva), to_cents(total))
+
+        method = rng.choice(["cash", "card"])
+        order = Order(ticket_number=number, subtotal=subtotal, iva=iva, total=total,
+                      status="completed", payment_method=method)
+        orders.append(order)
+        record_daily_sale(order)
+        day_reference += total
+        iva_reference += iva
+        if method == "card":
+            card_reference += total
+
+    db.session.add_all(orders)
+    db.session.commit()
+
+    daily = DailySales.query.one()
+    assert daily.total_orders == len(orders)
+    assert daily.total_sales == day_reference
+    assert daily.total_iva == iva_reference
+    assert daily.card_sales == card_reference
+    assert daily.cash_sales == day_reference - card_reference
+    assert db.session.scalar(select(func.sum(Order.total))) == day_reference
+
+
+def _check_stored_totals(client, headers, order_id, prices, lines):
+    """Compara los totales guardados de una orden contra el cálculo de referencia."""
+    subtotal = sum((prices[menu_item_id] * quantity for menu_item_id, quantity in lines.values()),
+                   Decimal("0.00"))
+    iva, total = _reference_totals(subtotal)
+    raw = db.session.execute(
+        text("SELECT subtotal, iva, total FROM orders WHERE id = :id"), {"id": order_id}
+    ).one()
+    assert tuple(raw) == (to_cents(subtotal), to_cents(iva), to_cents(total))
+    order = client.get(f"/api/orders/{order_id}", headers=headers).get_json()
+    assert {item["id"]: (item["menu_item"]["id"], item["quantity"]) for item in order["items"]} == lines
+    assert [Decimal(str(order[key])) for key in ("subtotal", "iva", "total")] == [subtotal, iva, total]
+    return total
+
+
+def _new_lines(client, headers, order_id, lines, sent):
+    """Asigna a las líneas enviadas (en orden) los ids nuevos que devolvió la API."""
+    order = client.get(f"/api/orders/{order_id}", headers=headers).get_json()
+    new_ids = sorted(item["id"] for item in order["items"] if item["id"] not in lines)
+    assert len(new_ids) == len(sent)
+    lines.update({line_id: (item["id"], item["quantity"]) for line_id, item in zip(new_ids, sent)})
+
+
+def test_random_orders_through_the_api_match_a_decimal_reference(client, auth_headers):
+    """
+    Órdenes aleatorias creadas y editadas por la API: los totales guardados
+    deben coincidir con Decimal calculado aparte a partir de los precios y
+    cantidades enviados, y las ventas del día con la suma de los cobrados.
+    """
+    rng = random.Random(20261017)
+    admin, waiter, cashier = auth_headers("admin"), auth_headers("waiter"), auth_headers("cashier")
+
+    prices = {}
+    for number in range(12):
+        # De $0.01 a $50,000.00; se envían como número JSON, igual que las terminales
+        price = from_cents(rng.randrange(1, 5_000_001))
+        created = client.post("/api/menu/", headers=admin, json={
+            "name": f"Producto {number}", "price": float(price), "category": "Pruebas",
+        })
+        assert created.status_code == 201
+        prices[created.get_json()["id"]] = price
+    menu_ids = list(prices)
+
+    def random_items(count):
+        return [{"id": rng.choice(menu_ids), "quantity": rng.randint(1, 25)} for _ in range(count)]
+
+    day_reference = Decimal("0.00")
+    for _ in range(60):
+        sent = random_items(rng.randint(1, 4))
+        response = client.post("/api/orders/", headers=waiter, json={"items": sent})
+        assert response.status_code == 201
+        order_id = response.get_json()["id"]
+        lines = {}
+        _new_lines(client, waiter, order_id, lines, sent)
+
+        for _ in range(rng.randint(0, 3)):
+            change = rng.choice(["add", "update", "remove"])
+            if change == "add":
+                sent = random_items(rng.randint(1, 2))
+                response = client.post(f"/api/orders/{order_id}/items", headers=waiter, json={"items": sent})
+                assert response.status_code == 200
+                _new_lines(client, waiter, order_id, lines, sent)
+            elif change == "update":
+                line_id, quantity = rng.choice(list(lines)), rng.randint(1, 25)
+                response = client.put(f"/api/orders/{order_id}/items/{line_id}", headers=waiter,
+                                      json={"quantity": quantity})
+                assert response.status_code == 200
+                lines[line_id] = (lines[line_id][0], quantity)
+            elif len(lines) > 1:
+                line_id = rng.choice(list(lines))
+                response = client.delete(f"/api/orders/{order_id}/items/{line_id}", headers=waiter)
+                assert response.status_code == 200
+                del lines[line_id]
+            _check_stored_totals(client, waiter, order_id, prices, lines)
+
+        total = _check_stored_totals(client, waiter, order_id, prices, lines)
+        if rng.random() < 0.7:
+            response = client.put(f"/api/orders/{order_id}/complete", headers=cashier,
+                                  json={"payment_method": rng.choice(["cash", "card"])})
+            assert response.status_code == 200
+            day_reference += total
+
+    daily = DailySales.query.one()
+    assert daily.total_sales == day_reference
+    assert daily.cash_sales + daily.card_sales == day_reference
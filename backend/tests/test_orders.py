@@ -0,0 +1,265 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from database import db
+from models import DailySales, HourlySales, MenuItem, Order
+from totals import apply_subtotal_delta, check_order_totals
+
+
+def _create_orders(client, headers, count, lines=3):
+    menu_ids = [item.id for item in MenuItem.query.limit(lines).all()]
+    for n in range(count):
+        payload = {
+            "customer_name": f"Mesa {n}",
+            "items": [{"id": menu_id, "quantity": 1} for menu_id in menu_ids],
+        }
+        response = client.post("/api/orders/", json=payload, headers=headers)
+        assert response.status_code == 201
+
+
+@pytest.mark.parametrize("url", ["/api/orders/", "/api/orders/open"])
+def test_order_listing_query_count_is_constant(client, auth_headers, query_counter, url):
+    """El número de consultas no crece con el número de órdenes devueltas."""
+    headers = auth_headers("waiter")
+
+    _create_orders(client, headers, 2)
+    with query_counter:
+        response = client.get(url, headers=headers)
+    few_orders_queries = query_counter.count
+    assert response.status_code == 200
+
+    _create_orders(client, headers, 15)
+    with query_counter:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+
+    assert query_counter.count == few_orders_queries
+    assert query_counter.count <= 3
+
+
+def test_order_listing_includes_nested_relations(client, auth_headers):
+    headers = auth_headers("waiter")
+    _create_orders(client, headers, 1, lines=2)
+
+    order = client.get("/api/orders/open", headers=headers).get_json()[0]
+
+    assert order["created_by"]["username"] == "mesero1"
+    assert len(order["items"]) == 2
+    assert all(item["menu_item"]["name"] for item in order["items"])
+
+
+def test_get_orders_cursor_pagination(client, auth_headers):
+    headers = auth_headers("waiter")
+    _create_orders(client, headers, 5, lines=1)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/orders/", query_string=params, headers=headers).get_json()
+        seen.extend(order["id"] for order in page["orders"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_get_orders_fields_projection(client, auth_headers):
+    headers = auth_headers("waiter")
+    _create_orders(client, headers, 2)
+
+    response = client.get("/api/orders/?fields=id,total", headers=headers)
+
+    assert response.status_code == 200
+    for order in response.get_json()["orders"]:
+        assert set(order) == {"id", "total"}
+
+
+def test_get_orders_rejects_unknown_fields_and_bad_cursor(client, auth_headers):
+    headers = auth_headers("waiter")
+
+    response = client.get("/api/orders/?fields=id,password", headers=headers)
+    assert response.status_code == 400
+
+    response = client.get("/api/orders/?cursor=not-a-cursor", headers=headers)
+    assert response.status_code == 400
+
+
+def test_get_orders_date_filter_uses_whole_day(client, auth_headers):
+    headers = auth_headers("waiter")
+    _create_orders(client, headers, 2, lines=1)
+    today = datetime.utcnow().date()
+
+    response = client.get(f"/api/orders/?date={today.isoformat()}", headers=headers)
+    assert len(response.get_json()["orders"]) == 2
+
+    yesterday = today - timedelta(days=1)
+    response = client.get(f"/api/orders/?date={yesterday.isoformat()}", headers=headers)
+    assert response.get_json()["orders"] == []
+
+
+def test_create_order_query_count_does_not_grow_with_lines(client, auth_headers, query_counter):
+    headers = auth_headers("waiter")
+    menu_ids = [item.id for item in MenuItem.query.all()]
+
+    def create(lines):
+        payload = {"items": [{"id": menu_ids[n % len(menu_ids)], "quantity": 1} for n in range(lines)]}
+        with query_counter:
+            response = client.post("/api/orders/", json=payload, headers=headers)
+        assert response.status_code == 201
+        assert len(response.get_json()["items"]) == lines
+        return query_counter.count
+
+    # La primera petición autenticada llena los cachés de autenticación
+    create(1)
+    assert create(2) == create(20)
+
+
+def test_create_order_reports_all_unavailable_items(client, auth_headers):
+    headers = auth_headers("waiter")
+    available, disabled = MenuItem.query.limit(2).all()
+    disabled.available = False
+    db.session.commit()
+
+    payload = {
+        "items": [
+            {"id": available.id, "quantity": 1},
+            {"id": disabled.id, "quantity": 1},
+            {"id": 9999, "quantity": 1},
+        ]
+    }
+    response = client.post("/api/orders/", json=payload, headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()["unavailable_ids"] == sorted([disabled.id, 9999], key=str)
+    assert Order.query.count() == 0
+
+
+def test_add_items_updates_totals(client, auth_headers):
+    headers = auth_headers("waiter")
+    first, second = MenuItem.query.limit(2).all()
+
+    order = client.post(
+        "/api/orders/", json={"items": [{"id": first.id, "quantity": 2}]}, headers=headers
+    ).get_json()
+    order = client.post(
+        f"/api/orders/{order['id']}/items",
+        json={"items": [{"id": second.id, "quantity": 1}, {"id": first.id, "quantity": 1}]},
+        headers=headers,
+    ).get_json()
+
+    subtotal = float(first.price * 3 + second.price)
+    assert len(order["items"]) == 3
+    assert order["subtotal"] == pytest.approx(subtotal)
+    assert order["total"] == pytest.approx(round(subtotal * 1.16, 2))
+
+
+def test_incremental_totals_match_full_recomputation(client, auth_headers):
+    headers = auth_headers("waiter")
+    first, second, third = MenuItem.query.limit(3).all()
+
+    order = client.post(
+        "/api/orders/",
+        json={"items": [{"id": first.id, "quantity": 2}, {"id": second.id, "quantity": 1}]},
+        headers=headers,
+    ).get_json()
+    order_id = order["id"]
+    client.post(
+        f"/api/orders/{order_id}/items",
+        json={"items": [{"id": third.id, "quantity": 3}]},
+        headers=headers,
+    )
+    line_ids = [item["id"] for item in client.get(f"/api/orders/{order_id}", headers=headers).get_json()["items"]]
+    client.put(f"/api/orders/{order_id}/items/{line_ids[0]}", json={"quantity": 5}, headers=headers)
+    order = client.delete(f"/api/orders/{order_id}/items/{line_ids[1]}", headers=headers).get_json()
+
+    subtotal = float(first.price * 5 + third.price * 3)
+    assert order["subtotal"] == pytest.approx(subtotal)
+    assert order["total"] == pytest.approx(round(subtotal * 1.16, 2))
+    assert check_order_totals() == []
+
+
+def test_concurrent_deltas_on_same_order_are_not_lost(client, auth_headers):
+    headers = auth_headers("waiter")
+    order_id = client.post("/api/orders/", json={}, headers=headers).get_json()["id"]
+
+    # Dos terminales leen la misma orden (subtotal 0) antes de que alguna escriba
+    first = Session(db.engine, expire_on_commit=False)
+    second = Session(db.engine, expire_on_commit=False)
+    first_order = first.get(Order, order_id)
+    second_order = second.get(Order, order_id)
+    first.commit()
+    second.commit()
+
+    apply_subtotal_delta(first_order, 10_000)
+    first.commit()
+    apply_subtotal_delta(second_order, 2_550)
+    second.commit()
+    first.close()
+    second.close()
+
+    db.session.expire_all()
+    order = db.session.get(Order, order_id)
+    assert (order.subtotal, order.iva, order.total) == (
+        Decimal("125.50"), Decimal("20.08"), Decimal("145.58")
+    )
+
+
+def test_check_totals_command_repairs_drift(app, client, auth_headers):
+    headers = auth_headers("waiter")
+    _create_orders(client, headers, 2, lines=1)
+    drifting = Order.query.first()
+    expected_total = drifting.total
+    drifting.total = 1.0
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["orders", "check-totals"])
+    assert "1 órdenes con diferencias" in result.output
+    assert db.session.get(Order, drifting.id).total == 1.0
+
+    result = runner.invoke(args=["orders", "check-totals", "--repair"])
+    assert "1 órdenes corregidas" in result.output
+    assert db.session.get(Order, drifting.id).total == pytest.approx(expected_total)
+    assert check_order_totals() == []
+
+
+def test_repairing_a_completed_order_fixes_its_sales_and_ticket_version(client, auth_headers):
+    menu_item = MenuItem.query.first()
+    order = client.post(
+        "/api/orders/", json={"items": [{"id": menu_item.id, "quantity": 2}]},
+        headers=auth_headers("waiter"),
+    ).get_json()
+    client.put(f"/api/orders/{order['id']}/complete", json={}, headers=auth_headers("cashier"))
+    expected_total = db.session.get(Order, order["id"]).total
+
+    stored = db.session.get(Order, order["id"])
+    stored.total = Decimal("1.00")
+    db.session.commit()
+    # La venta se registró con el total incorrecto (p. ej. antes de un bug ya corregido)
+    db.session.execute(update(DailySales).values(total_sales=Decimal("1.00"), cash_sales=Decimal("1.00")))
+    db.session.execute(update(HourlySales).values(total_sales=Decimal("1.00")))
+    db.session.commit()
+    version = stored.version
+
+    drifting = check_order_totals(repair=True)
+
+    assert [entry["status"] for entry in drifting] == ["completed"]
+    order = db.session.get(Order, order["id"])
+    assert order.total == expected_total
+    assert order.version == version + 1
+    daily = DailySales.query.one()
+    assert (daily.total_orders, daily.total_sales, daily.cash_sales) == (1, expected_total, expected_total)
+    assert HourlySales.query.one().total_sales == expected_total
+    assert check_order_totals() == []
@@ -0,0 +1,53 @@
+from database import db
+from models import MenuItem, Order
+from read_models import load_orders
+from serializers import order_load_options
+
+
+def _orm_dicts(fields=None):
+    orders = Order.query.options(*order_load_options()).order_by(Order.id).all()
+    return [order.to_dict(fields) for order in orders]
+
+
+def _row_dicts(fields=None):
+    return [order.to_dict(fields) for order in load_orders(order_by=[Order.id], fields=fields)]
+
+
+def test_read_models_serialize_like_the_orm(client, auth_headers):
+    headers = auth_headers("cashier")
+    taco, agua = MenuItem.query.limit(2).all()
+    taco.price = 45.5
+    taco.description = "Con piña"
+    db.session.commit()
+
+    client.post("/api/orders/", json={
+        "order_type": "delivery",
+        "delivery_phone": "33-1234-5678",
+        "delivery_address": "Calle Morelos #123",
+        "items": [{"id": taco.id, "quantity": 3, "notes": "Sin cebolla"}, {"id": agua.id}],
+    }, headers=headers)
+    completed = client.post("/api/orders/", json={"items": [{"id": agua.id, "quantity": 2}]},
+                            headers=headers).get_json()
+    response = client.put(f"/api/orders/{completed['id']}/complete", json={"payment_method": "card"},
+                          headers=headers)
+    assert response.status_code == 200
+    client.post("/api/orders/", json={}, headers=headers)
+    # Orden sin creador
+    db.session.add(Order(ticket_number=999, order_type="takeout", status="open"))
+    db.session.commit()
+    db.session.expire_all()
+
+    assert _row_dicts() == _orm_dicts()
+    fields = {"id", "total", "items"}
+    assert _row_dicts(fields) == _orm_dicts(fields)
+
+
+def test_listings_skip_relations_not_requested(client, auth_headers, query_counter):
+    headers = auth_headers("waiter")
+    client.post("/api/orders/", json={"items": [{"id": MenuItem.query.first().id}]}, headers=headers)
+
+    with query_counter:
+        response = client.get("/api/orders/?fields=id,ticket_number,total", headers=headers)
+
+    assert set(response.get_json()["orders"][0]) == {"id", "ticket_number", "total"}
+    assert query_counter.count == 1
@@ -0,0 +1,141 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, update
+
+from app import create_app
+from database import db
+from models import Order
+from replica import replica_router
+from tests.conftest import CREDENTIALS
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    """Primaria y réplica en dos archivos SQLite; `sync()` copia la primaria."""
+    primary_path, replica_path = tmp_path / "primary.db", tmp_path / "replica.db"
+    app = create_app("testing", {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary_path}",
+        "SQLALCHEMY_BINDS": {"replica": f"sqlite:///{replica_path}"},
+    })
+
+    def sync():
+        with sqlite3.connect(primary_path) as source, sqlite3.connect(replica_path) as target:
+            source.backup(target)
+
+    with app.app_context():
+        sync()
+        statements = {"replica": 0}
+
+        def _count(*args, **kwargs):
+            statements["replica"] += 1
+
+        event.listen(db.engines["replica"], "before_cursor_execute", _count)
+        client = app.test_client()
+        token = client.post("/api/auth/login", json=CREDENTIALS["admin"]).get_json()["access_token"]
+        yield app, client, {"Authorization": f"Bearer {token}"}, statements, sync
+
+
+def test_read_only_endpoints_use_the_replica(replicated):
+    app, client, headers, statements, sync = replicated
+
+    assert client.get("/api/reports/daily", headers=headers).status_code == 200
+    assert client.get("/api/orders/", headers=headers).status_code == 200
+    assert statements["replica"] > 0
+    assert replica_router.status() == {"configured": True, "healthy": True, "lag": 0.0}
+
+    statements["replica"] = 0
+    response = client.post("/api/orders/", json={"items": [{"id": 1}]}, headers=headers)
+    assert response.status_code == 201
+    # La pantalla de órdenes abiertas lee sus propias escrituras en la primaria
+    assert client.get("/api/orders/open", headers=headers).status_code == 200
+    assert statements["replica"] == 0
+
+
+def test_lagging_replica_falls_back_to_the_primary(replicated):
+    app, client, headers, statements, sync = replicated
+    order_id = client.post("/api/orders/", json={}, headers=headers).get_json()["id"]
+    db.session.execute(
+        update(Order).where(Order.id == order_id)
+        .values(created_at=datetime.utcnow() - timedelta(minutes=1))
+    )
+    db.session.commit()
+
+    statements["replica"] = 0
+    orders = client.get("/api/orders/", headers=headers).get_json()["orders"]
+    assert [order["id"] for order in orders] == [order_id]
+    assert replica_router.status()["healthy"] is False
+    assert replica_router.status()["lag"] >= 60
+
+    # Cuando la réplica se pone al día se vuelve a usar en la siguiente revisión
+    sync()
+    app.extensions["replica_router"]["next_check"] = 0
+    client.get("/api/orders/", headers=headers)
+    assert replica_router.status()["healthy"] is True
+    assert statements["replica"] > 0
+
+
+def test_replica_errors_retry_on_the_primary(replicated):
+    app, client, headers, statements, sync = replicated
+    # La réplica responde a la revisión pero le falta la tabla del reporte
+    with db.engines["replica"].begin() as connection:
+        connection.exec_driver_sql("DROP TABLE daily_sales")
+
+    response = client.get("/api/reports/daily", headers=headers)
+
+    assert response.status_code == 200
+    assert replica_router.status()["healthy"] is False
+
+
+def test_unreachable_replica_is_skipped(tmp_path, caplog):
+    app = create_app("testing", {
+        "SQLALCHEMY_BINDS": {"replica": f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"},
+    })
+    with app.app_context():
+        client = app.test_client()
+        token = client.post("/api/auth/login", json=CREDENTIALS["admin"]).get_json()["access_token"]
+
+        response = client.get("/api/reports/daily", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert replica_router.status()["healthy"] is False
+        assert "Réplica no disponible" in caplog.text
+
+
+class _PostgresReplica:
+    """Engine falso con las funciones de replay de PostgreSQL."""
+
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self, row):
+        self.row = row
+
+    @contextmanager
+    def connect(self):
+        yield SimpleNamespace(execute=lambda statement: SimpleNamespace(one=lambda: self.row))
+
+
+@pytest.mark.parametrize(
+    "row, healthy, lag",
+    [
+        ((True, True, True, 900.0), True, 0.0),  # al día aunque el último replay sea viejo
+        ((True, True, False, 3.5), True, 3.5),
+        ((True, True, False, 120.0), False, 120.0),
+        ((True, True, False, None), False, None),
+        # Sin receptor de WAL los LSN iguales no dicen nada: cuenta el último replay
+        ((True, False, True, 3.5), True, 3.5),
+        ((True, False, True, 900.0), False, 900.0),
+        # No está en recovery: no es una réplica
+        ((False, False, None, None), False, None),
+    ],
+)
+def test_postgres_replicas_report_replay_lag(replicated, monkeypatch, row, healthy, lag):
+    app, client, headers, statements, sync = replicated
+    monkeypatch.setitem(db.engines, "replica", _PostgresReplica(row))
+
+    replica_router.engine()
+
+    assert replica_router.status() == {"configured": True, "healthy": healthy, "lag": lag}
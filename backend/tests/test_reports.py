@@ -0,0 +1,221 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from database import db
+from models import DailyItemSales, HourlySales, MenuItem, Order, OrderItem
+from rollups import record_order
+
+
+def _completed_order(client, auth_headers, quantity, payment_method, order_type="local"):
+    menu_item = MenuItem.query.first()
+    order = client.post(
+        "/api/orders/",
+        json={"order_type": order_type, "items": [{"id": menu_item.id, "quantity": quantity}]},
+        headers=auth_headers("waiter"),
+    ).get_json()
+    return client.put(
+        f"/api/orders/{order['id']}/complete",
+        json={"payment_method": payment_method},
+        headers=auth_headers("cashier"),
+    ).get_json()
+
+
+def _rollup_rows():
+    return sorted(
+        (row["hour"], row["order_type"], row["payment_method"], row["created_by_user_id"],
+         row["total_orders"], round(row["total_sales"], 2))
+        for row in (bucket.to_dict() for bucket in HourlySales.query.all())
+        if row["total_orders"]
+    )
+
+
+def test_hourly_rollup_tracks_completions_and_cancellations(client, auth_headers):
+    cash = _completed_order(client, auth_headers, 2, "cash")
+    card = _completed_order(client, auth_headers, 1, "card", order_type="takeout")
+    _completed_order(client, auth_headers, 3, "cash")
+    admin = auth_headers("admin")
+
+    response = client.put(f"/api/orders/{cash['id']}/cancel", headers=admin)
+    assert response.status_code == 200
+
+    hourly = client.get("/api/reports/hourly", headers=admin).get_json()
+    assert sum(row["total_orders"] for row in hourly) == 2
+
+    by_method = {
+        row["payment_method"]: row
+        for row in client.get("/api/reports/breakdown?by=payment_method", headers=admin).get_json()
+    }
+    assert by_method["card"]["total_sales"] == pytest.approx(card["total"])
+    assert by_method["cash"]["total_orders"] == 1
+
+    by_user = client.get("/api/reports/breakdown?by=user", headers=admin).get_json()
+    assert [row["username"] for row in by_user] == ["mesero1"]
+    assert by_user[0]["total_orders"] == 2
+
+    response = client.get("/api/reports/breakdown?by=color", headers=admin)
+    assert response.status_code == 400
+
+
+def test_cancelling_twice_does_not_subtract_twice(client, auth_headers):
+    order = _completed_order(client, auth_headers, 1, "cash")
+    admin = auth_headers("admin")
+
+    client.put(f"/api/orders/{order['id']}/cancel", headers=admin)
+    client.put(f"/api/orders/{order['id']}/cancel", headers=admin)
+
+    assert _rollup_rows() == []
+
+
+def test_cancelling_completed_order_updates_daily_and_hourly_reports(client, auth_headers):
+    cash = _completed_order(client, auth_headers, 2, "cash")
+    card = _completed_order(client, auth_headers, 1, "card")
+    admin = auth_headers("admin")
+
+    client.put(f"/api/orders/{cash['id']}/cancel", headers=admin)
+
+    daily = client.get("/api/reports/daily", headers=admin).get_json()
+    hourly = client.get("/api/reports/hourly", headers=admin).get_json()
+    assert daily["total_orders"] == sum(row["total_orders"] for row in hourly) == 1
+    assert daily["total_sales"] == pytest.approx(sum(row["total_sales"] for row in hourly))
+    assert daily["total_sales"] == pytest.approx(card["total"])
+    assert daily["total_iva"] == pytest.approx(card["iva"])
+    assert daily["cash_sales"] == 0
+    assert daily["card_sales"] == pytest.approx(card["total"])
+
+
+def test_rebuild_hourly_matches_incremental_rollup(app, client, auth_headers):
+    first = _completed_order(client, auth_headers, 2, "cash")
+    _completed_order(client, auth_headers, 1, "card", order_type="takeout")
+    _completed_order(client, auth_headers, 4, "cash")
+    client.put(f"/api/orders/{first['id']}/cancel", headers=auth_headers("admin"))
+
+    incremental = _rollup_rows()
+    HourlySales.query.delete()
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["reports", "rebuild-hourly"])
+
+    assert "2 buckets por hora reconstruidos" in result.output
+    assert _rollup_rows() == incremental
+
+
+def _join_best_sellers(days=7):
+    """Consulta original (join sobre órdenes) usada como referencia."""
+    start_date = datetime.now() - timedelta(days=days)
+    rows = (
+        db.session.query(
+            MenuItem.name,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.subtotal),
+        )
+        .join(OrderItem, OrderItem.menu_item_id == MenuItem.id)
+        .join(Order, OrderItem.order_id == Order.id)
+        .filter(Order.created_at >= start_date, Order.status == "completed")
+        .group_by(MenuItem.id)
+        .all()
+    )
+    return {name: (int(sold), round(float(revenue), 2)) for name, sold, revenue in rows}
+
+
+def _join_sales_by_category(days=7):
+    start_date = datetime.now() - timedelta(days=days)
+    rows = (
+        db.session.query(
+            MenuItem.category,
+            func.count(OrderItem.id),
+            func.sum(OrderItem.subtotal),
+        )
+        .join(OrderItem, OrderItem.menu_item_id == MenuItem.id)
+        .join(Order, OrderItem.order_id == Order.id)
+        .filter(Order.created_at >= start_date, Order.status == "completed")
+        .group_by(MenuItem.category)
+        .all()
+    )
+    return {category: (int(lines), round(float(revenue), 2)) for category, lines, revenue in rows}
+
+
+def _place_orders(client, auth_headers):
+    waiter = auth_headers("waiter")
+    cashier = auth_headers("cashier")
+    menu = MenuItem.query.all()
+    rng = random.Random(3)
+    order_ids = []
+    for _ in range(12):
+        lines = [
+            {"id": rng.choice(menu).id, "quantity": rng.randint(1, 4)}
+            for _ in range(rng.randint(1, 5))
+        ]
+        order = client.post("/api/orders/", json={"items": lines}, headers=waiter).get_json()
+        order_ids.append(order["id"])
+
+    # Dos quedan abiertas, el resto se completa y una completada se cancela
+    for order_id in order_ids[2:]:
+        client.put(f"/api/orders/{order_id}/complete", json={}, headers=cashier)
+    client.put(f"/api/orders/{order_ids[5]}/cancel", headers=cashier)
+
+
+def test_item_aggregates_match_join_queries(app, client, auth_headers):
+    _place_orders(client, auth_headers)
+    admin = auth_headers("admin")
+
+    def endpoint_results():
+        best = {
+            row["name"]: (row["total_sold"], row["total_revenue"])
+            for row in client.get("/api/reports/best-sellers?days=7", headers=admin).get_json()
+        }
+        categories = {
+            row["category"]: (row["items_sold"], row["total_revenue"])
+            for row in client.get("/api/reports/sales-by-category?days=7", headers=admin).get_json()
+        }
+        return best, categories
+
+    best, categories = endpoint_results()
+    join_best = _join_best_sellers()
+    # Mismo top 10 por cantidad (los empates pueden ordenarse distinto)
+    assert all(join_best[name] == values for name, values in best.items())
+    assert sorted((sold for sold, _ in best.values()), reverse=True) == sorted(
+        (sold for sold, _ in join_best.values()), reverse=True
+    )[:10]
+    assert categories == _join_sales_by_category()
+
+    # La reconstrucción desde el historial da el mismo resultado
+    DailyItemSales.query.delete()
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["reports", "rebuild-items"])
+    assert "filas de ventas por producto reconstruidas" in result.output
+    assert endpoint_results() == (best, categories)
+
+
+@pytest.fixture
+def mexico_city_tz(monkeypatch):
+    """Servidor en America/Mexico_City (UTC-6) en lugar de UTC."""
+    monkeypatch.setenv("TZ", "America/Mexico_City")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_daily_and_hourly_reports_use_the_local_day(client, auth_headers, mexico_city_tz):
+    # 03:30 UTC del 10 de marzo son las 21:30 del 9 de marzo en Ciudad de México
+    late = datetime(2026, 3, 10, 3, 30)
+    order = Order(ticket_number=1, subtotal=100, iva=16, total=116, status="completed",
+                  payment_method="cash", created_at=late, completed_at=late + timedelta(minutes=20))
+    db.session.add(order)
+    db.session.flush()
+    record_order(order)
+    db.session.commit()
+    admin = auth_headers("admin")
+
+    daily = client.get("/api/reports/daily?date=2026-03-09", headers=admin).get_json()
+    hourly = client.get("/api/reports/hourly?date=2026-03-09", headers=admin).get_json()
+
+    assert daily["total_orders"] == 1
+    assert daily["total_sales"] == 116
+    assert hourly == [{"hour": "2026-03-09T21:00:00-06:00", "total_orders": 1, "total_sales": 116.0}]
+    assert client.get("/api/reports/hourly?date=2026-03-10", headers=admin).get_json() == []
+    assert client.get("/api/reports/daily?date=2026-03-10", headers=admin).get_json()["total_orders"] == 0
@@ -0,0 +1,112 @@
+import io
+import re
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from models import MenuItem
+from ticket_batch import batch_orders
+from ticket_queue import ticket_queue
+
+
+@pytest.fixture
+def completed_orders(client, auth_headers):
+    """Tres órdenes completadas y una abierta."""
+    waiter = auth_headers("waiter")
+    cashier = auth_headers("cashier")
+    menu = MenuItem.query.limit(3).all()
+    order_ids = []
+    for index in range(4):
+        order = client.post(
+            "/api/orders/",
+            json={"items": [{"id": item.id, "quantity": index + 1} for item in menu]},
+            headers=waiter,
+        ).get_json()
+        if index < 3:
+            client.put(f"/api/orders/{order['id']}/complete", json={}, headers=cashier)
+        order_ids.append(order["id"])
+    return order_ids
+
+
+def _today():
+    return datetime.utcnow().date().isoformat()
+
+
+def test_batch_orders_loads_everything_in_one_query(app, completed_orders, query_counter):
+    with query_counter:
+        orders = batch_orders(ids=completed_orders)
+        names = [item.menu_item.name for order in orders for item in order.items]
+
+    assert query_counter.count == 1
+    assert len(orders) == 3
+    assert len(names) == 9
+
+
+def test_export_day_as_multipage_pdf(client, auth_headers, completed_orders):
+    response = client.get(f"/api/orders/tickets/batch?date={_today()}", headers=auth_headers())
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+    assert response.is_streamed
+    assert response.data.startswith(b"%PDF")
+    assert len(re.findall(rb"/Type /Page\b(?!s)", response.data)) == 3
+
+
+def test_export_ids_as_zip_reuses_cached_tickets(app, client, auth_headers, completed_orders):
+    headers = auth_headers("cashier")
+    client.get(f"/api/orders/{completed_orders[0]}/ticket", headers=headers)
+    hits = app.extensions["ticket_cache"].stats()["hits"]
+
+    ids = ",".join(str(order_id) for order_id in completed_orders)
+    response = client.get(f"/api/orders/tickets/batch?ids={ids}&format=zip", headers=headers)
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    # La orden abierta no se exporta
+    assert len(archive.namelist()) == 3
+    assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+    assert app.extensions["ticket_cache"].stats()["hits"] == hits + 1
+
+
+def test_export_zip_renders_in_the_process_pool(app, client, auth_headers, completed_orders):
+    app.config["TICKET_RENDER_WORKERS"] = 2
+    try:
+        response = client.get(
+            f"/api/orders/tickets/batch?date={_today()}&format=zip", headers=auth_headers()
+        )
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+    finally:
+        ticket_queue.shutdown(app)
+
+    assert archive.testzip() is None
+    assert len(archive.namelist()) == 3
+
+
+def test_export_validates_parameters(client, auth_headers, completed_orders):
+    headers = auth_headers()
+
+    assert client.get("/api/orders/tickets/batch", headers=headers).status_code == 400
+    assert client.get("/api/orders/tickets/batch?ids=1,x", headers=headers).status_code == 400
+    assert client.get("/api/orders/tickets/batch?date=ayer", headers=headers).status_code == 400
+    assert client.get(
+        f"/api/orders/tickets/batch?date={_today()}&format=doc", headers=headers
+    ).status_code == 400
+    assert client.get(
+        "/api/orders/tickets/batch?date=2000-01-01", headers=headers
+    ).status_code == 404
+    # Los meseros no exportan tickets
+    assert client.get(
+        f"/api/orders/tickets/batch?date={_today()}", headers=auth_headers("waiter")
+    ).status_code == 403
+
+
+def test_export_tickets_cli(app, completed_orders, tmp_path):
+    output = tmp_path / "cierre.zip"
+
+    result = app.test_cli_runner().invoke(
+        args=["orders", "export-tickets", "--date", _today(), "--format", "zip", "--output", str(output)]
+    )
+
+    assert "3 tickets exportados" in result.output
+    assert len(zipfile.ZipFile(output).namelist()) == 3
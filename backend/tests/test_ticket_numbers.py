@@ -0,0 +1,94 @@
+from collections import Counter as Tally
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from app import create_app
+from database import db
+from models import Counter, MenuItem, Order
+from tests.conftest import CREDENTIALS
+from ticket_numbers import ticket_allocator
+
+
+def test_sequential_orders_get_consecutive_tickets(client, auth_headers):
+    headers = auth_headers("waiter")
+
+    tickets = [
+        client.post("/api/orders/", json={}, headers=headers).get_json()["ticket_number"]
+        for _ in range(3)
+    ]
+
+    assert tickets == [1, 2, 3]
+
+
+def test_daily_reset_restarts_numbering(app):
+    app.config["TICKET_RESET"] = "daily"
+
+    day_one = datetime(2026, 3, 1, 13, 0)
+    day_two = datetime(2026, 3, 2, 9, 0)
+
+    assert ticket_allocator.allocate(day_one) == ("2026-03-01", 1)
+    assert ticket_allocator.allocate(day_one) == ("2026-03-01", 2)
+    assert ticket_allocator.allocate(day_two) == ("2026-03-02", 1)
+
+
+@pytest.mark.parametrize(
+    "now, scope",
+    [
+        (datetime(2026, 3, 2, 7, 30), "2026-03-02#1"),
+        (datetime(2026, 3, 2, 15, 0), "2026-03-02#2"),
+        (datetime(2026, 3, 2, 2, 0), "2026-03-01#2"),
+    ],
+)
+def test_shift_scope(app, now, scope):
+    app.config["TICKET_RESET"] = "shift"
+    app.config["TICKET_SHIFT_START_HOURS"] = [6, 15]
+
+    assert ticket_allocator.current_scope(now) == scope
+
+
+def test_block_preallocation_reserves_once_per_block(app):
+    app.config["TICKET_BLOCK_SIZE"] = 5
+
+    numbers = [ticket_allocator.allocate()[1] for _ in range(7)]
+
+    assert numbers == [1, 2, 3, 4, 5, 6, 7]
+    # Dos bloques de 5 reservados en la base de datos
+    assert db.session.get(Counter, "ticket:global").value == 10
+
+
+@pytest.mark.parametrize("block_size", [1, 20])
+def test_concurrent_order_creation_has_no_duplicates(tmp_path, block_size):
+    """Muchas órdenes abiertas al mismo tiempo no chocan en ticket_number."""
+    app = create_app(
+        "testing",
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'tickets.db'}",
+            "TICKET_BLOCK_SIZE": block_size,
+        },
+    )
+    total_orders = 2000
+
+    with app.app_context():
+        menu_id = MenuItem.query.first().id
+        token = app.test_client().post(
+            "/api/auth/login", json=CREDENTIALS["waiter"]
+        ).get_json()["access_token"]
+
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {"items": [{"id": menu_id, "quantity": 1}]}
+
+    def open_order(_):
+        response = app.test_client().post("/api/orders/", json=payload, headers=headers)
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        statuses = Tally(pool.map(open_order, range(total_orders)))
+
+    assert statuses == {201: total_orders}
+
+    with app.app_context():
+        tickets = [number for (number,) in Order.query.with_entities(Order.ticket_number)]
+    assert len(tickets) == total_orders
+    assert len(set(tickets)) == total_orders
@@ -0,0 +1,232 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+import ticket_queue as ticket_queue_module
+from models import MenuItem
+from ticket_queue import ticket_queue
+from utils.ticket_cache import TicketCache
+from utils.ticket_generator import TicketGenerator
+
+
+def _open_order(client, auth_headers):
+    menu_item = MenuItem.query.first()
+    return client.post(
+        "/api/orders/",
+        json={"items": [{"id": menu_item.id, "quantity": 2}]},
+        headers=auth_headers("waiter"),
+    ).get_json()
+
+
+def test_ticket_is_rendered_once_per_order_version(app, client, auth_headers):
+    order = _open_order(client, auth_headers)
+    headers = auth_headers("cashier")
+    url = f"/api/orders/{order['id']}/ticket"
+
+    with patch.object(TicketGenerator, "render", autospec=True,
+                      side_effect=TicketGenerator.render) as render:
+        first = client.get(url, headers=headers)
+        second = client.get(url, headers=headers)
+
+        assert first.status_code == 200
+        assert first.mimetype == "application/pdf"
+        assert first.data.startswith(b"%PDF")
+        assert second.data == first.data
+        assert render.call_count == 1
+
+        # Cualquier cambio a la orden sube la versión y obliga a re-renderizar
+        client.post(
+            f"/api/orders/{order['id']}/items",
+            json={"items": [{"id": MenuItem.query.first().id, "quantity": 1}]},
+            headers=headers,
+        )
+        client.get(url, headers=headers)
+        assert render.call_count == 2
+
+    stats = app.extensions["ticket_cache"].stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1
+
+
+def test_ticket_archive_folder_keeps_a_copy(app, client, auth_headers, tmp_path):
+    app.config["TICKET_ARCHIVE_FOLDER"] = str(tmp_path)
+    order = _open_order(client, auth_headers)
+
+    response = client.get(f"/api/orders/{order['id']}/ticket", headers=auth_headers("cashier"))
+
+    archived = tmp_path / f"ticket_{order['id']}_v1.pdf"
+    assert archived.read_bytes() == response.data
+
+
+def test_order_changes_bump_version(client, auth_headers):
+    order = _open_order(client, auth_headers)
+    headers = auth_headers("cashier")
+    assert order["version"] == 1
+
+    item_id = order["items"][0]["id"]
+    order = client.put(
+        f"/api/orders/{order['id']}/items/{item_id}", json={"quantity": 5}, headers=headers
+    ).get_json()
+    assert order["version"] == 2
+
+    order = client.put(f"/api/orders/{order['id']}/complete", json={}, headers=headers).get_json()
+    assert order["version"] == 3
+
+    # Imprimir no es un cambio de contenido
+    client.get(f"/api/orders/{order['id']}/ticket", headers=headers)
+    order = client.get(f"/api/orders/{order['id']}", headers=headers).get_json()
+    assert order["printed"] is True
+    assert order["version"] == 3
+
+
+def test_ticket_cache_evicts_least_recently_used_by_size():
+    cache = TicketCache(max_bytes=10)
+    cache.put((1, 1), b"aaaa")
+    cache.put((2, 1), b"bbbb")
+    assert cache.get((1, 1)) == b"aaaa"
+
+    cache.put((3, 1), b"cccc")
+
+    assert cache.get((2, 1)) is None
+    assert cache.get((1, 1)) == b"aaaa"
+    assert cache.stats()["bytes"] == 8
+
+    # Un ticket más grande que el caché completo no se guarda
+    cache.put((4, 1), b"x" * 11)
+    assert cache.get((4, 1)) is None
+
+
+@pytest.fixture
+def render_pool(app):
+    """Activa el pool de renderizado (las pruebas renderizan en línea)."""
+    app.config["TICKET_RENDER_WORKERS"] = 1
+    yield ticket_queue
+    ticket_queue.shutdown(app)
+
+
+def _wait_until_ready(client, order_id, headers, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/api/orders/{order_id}/ticket/status", headers=headers).get_json()
+        if status["status"] != "rendering":
+            return status
+        time.sleep(0.05)
+    raise AssertionError("el ticket no se renderizó a tiempo")
+
+
+def test_completing_an_order_prerenders_its_ticket(client, auth_headers, render_pool):
+    order = _open_order(client, auth_headers)
+    headers = auth_headers("cashier")
+
+    client.put(f"/api/orders/{order['id']}/complete", json={}, headers=headers)
+
+    assert _wait_until_ready(client, order["id"], headers)["status"] == "ready"
+    response = client.get(f"/api/orders/{order['id']}/ticket", headers=headers)
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+
+    metrics = client.get("/api/orders/tickets/queue", headers=auth_headers("admin")).get_json()
+    assert metrics["submitted"] == 1
+    assert metrics["completed"] == 1
+    assert metrics["pending"] == 0
+
+
+def test_ticket_queue_returns_202_and_applies_backpressure(app, client, auth_headers, render_pool):
+    app.config["TICKET_QUEUE_MAX_PENDING"] = 1
+    first = _open_order(client, auth_headers)
+    second = _open_order(client, auth_headers)
+    headers = auth_headers("cashier")
+
+    # El PDF no se guarda en el caché hasta liberar el evento
+    released = threading.Event()
+    store = ticket_queue_module._store
+
+    def gated_store(*args):
+        released.wait(10)
+        store(*args)
+
+    with patch.object(ticket_queue_module, "_store", gated_store):
+        response = client.get(f"/api/orders/{first['id']}/ticket", headers=headers)
+        assert response.status_code == 202
+        assert response.headers["Location"] == f"/api/orders/{first['id']}/ticket/status"
+        assert response.get_json()["status"] == "rendering"
+
+        # La misma orden no se encola dos veces
+        assert client.get(f"/api/orders/{first['id']}/ticket", headers=headers).status_code == 202
+
+        response = client.get(f"/api/orders/{second['id']}/ticket", headers=headers)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"]
+
+        metrics = client.get("/api/orders/tickets/queue", headers=auth_headers("admin")).get_json()
+        assert metrics["pending"] == 1
+        assert metrics["rejected"] == 1
+
+        released.set()
+        assert _wait_until_ready(client, first["id"], headers)["status"] == "ready"
+
+    response = client.get(f"/api/orders/{first['id']}/ticket", headers=headers)
+    assert response.status_code == 200
+    assert response.data.startswith(b"%PDF")
+
+
+def test_failed_archive_write_releases_the_pending_slot(app, client, auth_headers, render_pool, tmp_path):
+    blocker = tmp_path / "no_es_carpeta"
+    blocker.write_text("")
+    app.config["TICKET_ARCHIVE_FOLDER"] = str(blocker / "tickets")
+    app.config["TICKET_QUEUE_MAX_PENDING"] = 1
+    first = _open_order(client, auth_headers)
+    second = _open_order(client, auth_headers)
+    headers = auth_headers("cashier")
+
+    assert client.get(f"/api/orders/{first['id']}/ticket", headers=headers).status_code == 202
+    _wait_until_ready(client, first["id"], headers)
+
+    metrics = client.get("/api/orders/tickets/queue", headers=auth_headers("admin")).get_json()
+    assert metrics["pending"] == 0
+    assert metrics["errors"] == 1
+    assert metrics["completed"] == 0
+
+    # El lugar en la cola quedó libre: la siguiente orden se acepta
+    assert client.get(f"/api/orders/{second['id']}/ticket", headers=headers).status_code == 202
+
+
+def test_inline_archive_errors_still_return_the_pdf_and_are_capped(app, client, auth_headers, tmp_path):
+    blocker = tmp_path / "no_es_carpeta"
+    blocker.write_text("")
+    app.config["TICKET_ARCHIVE_FOLDER"] = str(blocker / "tickets")
+    app.config["TICKET_QUEUE_MAX_FAILED"] = 2
+    orders = [_open_order(client, auth_headers) for _ in range(3)]
+    headers = auth_headers("cashier")
+
+    for order in orders:
+        response = client.get(f"/api/orders/{order['id']}/ticket", headers=headers)
+        assert response.status_code == 200
+        assert response.data.startswith(b"%PDF")
+
+    state = app.extensions["ticket_queue"]
+    assert state["errors"] == 3
+    # Solo se recuerdan los dos fallos más recientes
+    assert [order_id for order_id, _ in state["failed"]] == [orders[1]["id"], orders[2]["id"]]
+
+
+def test_a_broken_render_pool_is_replaced(app, client, auth_headers, render_pool):
+    first = _open_order(client, auth_headers)
+    second = _open_order(client, auth_headers)
+    headers = auth_headers("cashier")
+    client.get(f"/api/orders/{first['id']}/ticket", headers=headers)
+    assert _wait_until_ready(client, first["id"], headers)["status"] == "ready"
+
+    # Un proceso del pool muere (p. ej. por falta de memoria)
+    broken = app.extensions["ticket_queue"]["executor"]
+    for process in list(broken._processes.values()):
+        process.kill()
+    deadline = time.monotonic() + 10
+    while not broken._broken and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert client.get(f"/api/orders/{second['id']}/ticket", headers=headers).status_code == 202
+    assert _wait_until_ready(client, second["id"], headers)["status"] == "ready"
+    assert app.extensions["ticket_queue"]["executor"] is not broken
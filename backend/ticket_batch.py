@@ -0,0 +1,91 @@
+import io
+import zipfile
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
+
+from models import Order, OrderItem
+from serializers import ticket_data
+from ticket_queue import ticket_queue
+from utils.ticket_generator import TicketGenerator
+
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+def batch_orders(day: date | None = None, ids: list[int] | None = None) -> list[Order]:
+    """
+    Órdenes completadas de un día (por fecha de creación) o de una lista de
+    ids, con sus items y productos cargados en una sola consulta.
+    """
+    query = (
+        Order.query.options(joinedload(Order.items).joinedload(OrderItem.menu_item))
+        .filter(Order.status == "completed")
+    )
+    if day is not None:
+        day_start = datetime.combine(day, datetime.min.time())
+        query = query.filter(
+            Order.created_at >= day_start, Order.created_at < day_start + timedelta(days=1)
+        )
+    if ids is not None:
+        query = query.filter(Order.id.in_(ids))
+    return query.order_by(Order.created_at, Order.id).all()
+
+
+def _archive_name(order: Order) -> str:
+    return f"ticket_{order.ticket_number:04d}_{order.id}.pdf"
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Destino no posicionable para ZipFile que acumula lo escrito."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(orders: list[Order]):
+    """
+    Genera un ZIP con un PDF por orden, entregándolo por partes conforme se
+    renderiza cada ticket. Los tickets que faltan en el caché se
+    renderizan en paralelo en el pool de tickets; los que ya estaban se
+    reutilizan.
+    """
+    cache = current_app.extensions["ticket_cache"]
+    entries = [(_archive_name(order), (order.id, order.version), order) for order in orders]
+    cached = {key: cache.get(key) for _, key, _ in entries}
+    missing = [order for _, key, order in entries if cached[key] is None]
+    rendered = ticket_queue.map([ticket_data(order) for order in missing])
+
+    writer = _ChunkWriter()
+    with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, key, _ in entries:
+            pdf = cached[key]
+            if pdf is None:
+                pdf = next(rendered)
+                cache.put(key, pdf)
+            archive.writestr(name, pdf)
+            yield writer.drain()
+    yield writer.drain()
+
+
+def stream_pdf(orders: list[Order]):
+    """
+    Genera un solo PDF multipágina con todos los tickets. ReportLab arma el
+    documento completo antes de escribirlo, así que se entrega por bloques
+    una vez terminado.
+    """
+    pdf = TicketGenerator().render_many(ticket_data(order) for order in orders)
+    for start in range(0, len(pdf), PDF_CHUNK_SIZE):
+        yield pdf[start:start + PDF_CHUNK_SIZE]
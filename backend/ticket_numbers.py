@@ -0,0 +1,100 @@
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from database import db, dialect_insert
+from models import Counter, ticket_number_seq
+
+
+class TicketAllocator:
+    """
+    Asigna números de ticket sin leer la tabla de órdenes.
+
+    - PostgreSQL sin reinicios: usa la secuencia `ticket_number_seq`.
+    - Cualquier otro caso: incrementa atómicamente una fila de `counters`
+      (una por periodo) con INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+    La reserva se hace en una transacción corta e independiente de la
+    petición, para que el bloqueo de la fila del contador no se mantenga
+    mientras se insertan los items. Un rollback posterior deja un hueco en
+    la numeración, pero nunca un duplicado.
+
+    Con TICKET_BLOCK_SIZE > 1 cada proceso reserva bloques de números y los
+    reparte localmente; los números no usados de un bloque se pierden si el
+    proceso termina o cambia el periodo.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["ticket_allocator"] = {
+            "lock": threading.Lock(),
+            "blocks": {},
+        }
+
+    def current_scope(self, now: datetime | None = None) -> str:
+        """Devuelve el periodo de numeración vigente según TICKET_RESET."""
+        config = current_app.config
+        reset = config.get("TICKET_RESET", "never")
+        now = now or datetime.now()
+
+        if reset == "daily":
+            return now.date().isoformat()
+
+        if reset == "shift":
+            starts = sorted(config.get("TICKET_SHIFT_START_HOURS") or [0])
+            shift_day = now.date()
+            shift_index = None
+            for index, hour in enumerate(starts):
+                if now.hour >= hour:
+                    shift_index = index
+            if shift_index is None:
+                # Antes del primer turno: sigue el último turno del día anterior
+                shift_day -= timedelta(days=1)
+                shift_index = len(starts) - 1
+            return f"{shift_day.isoformat()}#{shift_index + 1}"
+
+        return "global"
+
+    def allocate(self, now: datetime | None = None) -> tuple[str, int]:
+        """Devuelve `(ticket_scope, ticket_number)` para una orden nueva."""
+        scope = self.current_scope(now)
+        block_size = max(1, int(current_app.config.get("TICKET_BLOCK_SIZE", 1)))
+
+        if block_size == 1:
+            return scope, self._reserve(scope, 1)[0]
+
+        state = current_app.extensions["ticket_allocator"]
+        with state["lock"]:
+            block = state["blocks"].get(scope)
+            if not block:
+                # Los bloques de periodos anteriores ya no sirven
+                state["blocks"] = {scope: list(self._reserve(scope, block_size))}
+                block = state["blocks"][scope]
+            return scope, block.pop(0)
+
+    def _reserve(self, scope: str, count: int):
+        """Reserva `count` números en la base de datos y los devuelve en orden."""
+        with db.engine.begin() as conn:
+            if scope == "global" and conn.dialect.name == "postgresql":
+                numbers = conn.execute(
+                    select(ticket_number_seq.next_value()).select_from(
+                        func.generate_series(1, count)
+                    )
+                ).scalars()
+                return sorted(numbers)
+
+            stmt = dialect_insert(Counter).values(name=f"ticket:{scope}", value=count)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Counter.name],
+                set_={"value": Counter.value + count},
+            ).returning(Counter.value)
+            last = conn.execute(stmt).scalar_one()
+        return range(last - count + 1, last + 1)
+
+
+ticket_allocator = TicketAllocator()
@@ -0,0 +1,258 @@
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+
+from models import Order
+from serializers import order_load_options, ticket_data
+from utils.ticket_generator import TicketGenerator
+
+# Estados que reporta `status()`
+READY = "ready"
+RENDERING = "rendering"
+FAILED = "failed"
+MISSING = "missing"
+
+_generator = None
+
+
+def _render_ticket(order_data: dict) -> bytes:
+    """Renderiza un ticket; se ejecuta dentro de un proceso del pool."""
+    global _generator
+    if _generator is None:
+        _generator = TicketGenerator()
+    return _generator.render(order_data)
+
+
+class QueueFull(Exception):
+    """Hay demasiados tickets pendientes de renderizar."""
+
+
+class TicketRenderQueue:
+    """
+    Cola de renderizado de tickets PDF fuera de la petición.
+
+    El maquetado con ReportLab es trabajo de CPU; en lugar de hacerlo en el
+    worker que atiende la petición se envía a un pool de procesos
+    (TICKET_RENDER_WORKERS). El PDF terminado se guarda en el caché de
+    tickets con la llave `(order_id, version)`, igual que al renderizarlo
+    en línea.
+
+    - Un mismo ticket nunca se encola dos veces.
+    - Con TICKET_QUEUE_MAX_PENDING tickets en proceso, `submit()` lanza
+      QueueFull y la petición responde 503.
+    - Con TICKET_RENDER_WORKERS=0 no hay pool: se renderiza en línea.
+
+    El pool se crea con el primer ticket encolado, así cada worker de
+    gunicorn crea el suyo después del fork; `shutdown()` lo cierra al
+    terminar el worker (hook worker_exit de gunicorn_config.py).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["ticket_queue"] = {
+            "lock": threading.Lock(),
+            "executor": None,
+            "pending": {},
+            # (order_id, version) -> error; los más viejos salen al pasar
+            # de TICKET_QUEUE_MAX_FAILED
+            "failed": OrderedDict(),
+            "submitted": 0,
+            "completed": 0,
+            "errors": 0,
+            "rejected": 0,
+        }
+
+    @property
+    def workers(self) -> int:
+        return current_app.config.get("TICKET_RENDER_WORKERS", 0)
+
+    def status(self, order: Order) -> str:
+        key = (order.id, order.version)
+        if key in current_app.extensions["ticket_cache"]:
+            return READY
+        state = current_app.extensions["ticket_queue"]
+        with state["lock"]:
+            if key in state["pending"]:
+                return RENDERING
+            if key in state["failed"]:
+                return FAILED
+        return MISSING
+
+    def submit(self, order: Order) -> bytes | None:
+        """
+        Encola el renderizado del ticket de una orden (cargada con sus items).
+        Si no hay pool lo renderiza en línea y devuelve el PDF; con pool
+        devuelve None y el PDF llega al caché cuando termina.
+        """
+        key = (order.id, order.version)
+        cache = current_app.extensions["ticket_cache"]
+        state = current_app.extensions["ticket_queue"]
+        archive_folder = current_app.config.get("TICKET_ARCHIVE_FOLDER")
+
+        if not self.workers:
+            pdf = _render_ticket(ticket_data(order))
+            # Mismo manejo que con pool: si falla el caché o el archivo el
+            # error se registra y el PDF se entrega de todos modos
+            try:
+                _store(cache, archive_folder, key, pdf)
+            except Exception as error:
+                with state["lock"]:
+                    _record_failure(state, key, error, self.max_failed)
+                current_app.logger.error("Falló el ticket de la orden %s (versión %s): %r", *key, error)
+            return pdf
+
+        if key in cache:
+            return None
+
+        with state["lock"]:
+            if key in state["pending"]:
+                return None
+            if len(state["pending"]) >= current_app.config.get("TICKET_QUEUE_MAX_PENDING", 64):
+                state["rejected"] += 1
+                raise QueueFull()
+            state["failed"].pop(key, None)
+            future = self._submit(state, _render_ticket, ticket_data(order))
+            executor = state["executor"]
+            state["pending"][key] = future
+            state["submitted"] += 1
+
+        logger = current_app.logger
+        max_failed = self.max_failed
+
+        def done(future):
+            # Corre en un hilo del pool, fuera del contexto de la app. Lo que
+            # falle aquí lo tragaría concurrent.futures: se registra como
+            # fallo y la llave siempre sale de `pending`.
+            error = future.exception()
+            try:
+                if error is None:
+                    _store(cache, archive_folder, key, future.result())
+            except Exception as exc:
+                error = exc
+            finally:
+                with state["lock"]:
+                    state["pending"].pop(key, None)
+                    if error is None:
+                        state["completed"] += 1
+                    else:
+                        _record_failure(state, key, error, max_failed)
+                    if isinstance(error, BrokenProcessPool):
+                        self._drop_broken(state, executor)
+            if error is not None:
+                logger.error("Falló el ticket de la orden %s (versión %s): %r", *key, error)
+
+        future.add_done_callback(done)
+        return None
+
+    def map(self, orders_data: list[dict]):
+        """
+        Renderiza varios tickets repartidos en el pool y los devuelve en el
+        mismo orden, conforme van quedando listos. Sin pool, en línea.
+        No pasa por la cola ni por su límite de pendientes.
+        """
+        if not self.workers:
+            return map(_render_ticket, orders_data)
+        state = current_app.extensions["ticket_queue"]
+        chunksize = max(1, len(orders_data) // (self.workers * 4))
+        with state["lock"]:
+            try:
+                return self._executor(state).map(_render_ticket, orders_data, chunksize=chunksize)
+            except BrokenProcessPool:
+                self._drop_broken(state, state["executor"])
+                return self._executor(state).map(_render_ticket, orders_data, chunksize=chunksize)
+
+    @property
+    def max_failed(self) -> int:
+        return current_app.config.get("TICKET_QUEUE_MAX_FAILED", 256)
+
+    def _submit(self, state, fn, *args):
+        # Se llama con state["lock"] tomado. Si un proceso del pool murió
+        # (BrokenProcessPool) se descarta el pool y se reintenta con uno nuevo.
+        try:
+            return self._executor(state).submit(fn, *args)
+        except BrokenProcessPool:
+            self._drop_broken(state, state["executor"])
+            return self._executor(state).submit(fn, *args)
+
+    def _drop_broken(self, state, executor) -> None:
+        # Se llama con state["lock"] tomado; el siguiente ticket crea otro
+        # pool. Solo si `executor` sigue siendo el actual: los demás tickets
+        # del pool roto no deben tirar el pool nuevo.
+        if executor is None or state["executor"] is not executor:
+            return
+        state["executor"] = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _executor(self, state) -> ProcessPoolExecutor:
+        # Se llama con state["lock"] tomado
+        if state["executor"] is None:
+            # forkserver: no hacer fork del worker de gunicorn, que tiene
+            # hilos (gthread) y podría heredar locks tomados
+            state["executor"] = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+            )
+        return state["executor"]
+
+    def prerender(self, order_id: int) -> None:
+        """
+        Adelanta el ticket de una orden recién completada. Solo aplica con
+        pool; si la cola está llena se omite y se renderiza al descargarlo.
+        """
+        if not self.workers:
+            return
+        order = Order.query.options(*order_load_options()).filter_by(id=order_id).first()
+        if order is None:
+            return
+        try:
+            self.submit(order)
+        except QueueFull:
+            current_app.logger.warning("Cola de tickets llena, se omite la orden %s", order_id)
+
+    def metrics(self) -> dict:
+        state = current_app.extensions["ticket_queue"]
+        with state["lock"]:
+            return {
+                "workers": self.workers,
+                "pending": len(state["pending"]),
+                "max_pending": current_app.config.get("TICKET_QUEUE_MAX_PENDING", 64),
+                "submitted": state["submitted"],
+                "completed": state["completed"],
+                "errors": state["errors"],
+                "rejected": state["rejected"],
+                "cache": current_app.extensions["ticket_cache"].stats(),
+            }
+
+    def shutdown(self, app) -> None:
+        """Espera los tickets en proceso y cierra el pool (si existe)."""
+        state = app.extensions["ticket_queue"]
+        with state["lock"]:
+            executor, state["executor"] = state["executor"], None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def _record_failure(state, key, error, max_failed: int) -> None:
+    # Se llama con state["lock"] tomado
+    state["errors"] += 1
+    failed = state["failed"]
+    failed.pop(key, None)
+    failed[key] = repr(error)
+    while len(failed) > max_failed:
+        failed.popitem(last=False)
+
+
+def _store(cache, archive_folder, key, pdf: bytes) -> None:
+    cache.put(key, pdf)
+    if archive_folder:
+        order_id, version = key
+        TicketGenerator(archive_folder).save(pdf, f"ticket_{order_id}_v{version}.pdf")
+
+
+ticket_queue = TicketRenderQueue()
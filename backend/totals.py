@@ -0,0 +1,112 @@
+from sqlalchemy import BigInteger, func, type_coerce, update
+from sqlalchemy.orm import object_session
+
+from database import db
+from models import Order, OrderItem
+from money import from_cents, to_cents
+from rollups import record_daily_sale, record_order_sale
+
+IVA_PERCENT = 16
+
+
+def iva_cents(subtotal_cents: int) -> int:
+    """IVA en centavos, redondeado a la mitad hacia arriba (subtotal >= 0)."""
+    return (subtotal_cents * IVA_PERCENT + 50) // 100
+
+
+def order_totals_cents(subtotal_cents: int) -> tuple[int, int, int]:
+    """`(subtotal, iva, total)` en centavos a partir del subtotal."""
+    iva = iva_cents(subtotal_cents)
+    return subtotal_cents, iva, subtotal_cents + iva
+
+
+def set_order_totals(order: Order, subtotal_cents: int) -> None:
+    """Asigna subtotal, IVA y total de una orden a partir de su subtotal en centavos."""
+    subtotal, iva, total = order_totals_cents(subtotal_cents)
+    order.subtotal = from_cents(subtotal)
+    order.iva = from_cents(iva)
+    order.total = from_cents(total)
+
+
+def apply_subtotal_delta(order: Order, delta_cents: int) -> None:
+    """
+    Ajusta los totales con la diferencia (en centavos) de las líneas que
+    cambiaron, sin cargar ni recorrer la colección completa de items.
+
+    El subtotal se suma en SQL (`subtotal = subtotal + :delta RETURNING
+    subtotal`), no sobre el valor leído en Python: si dos terminales editan
+    el mismo ticket a la vez, la segunda espera el bloqueo de la fila y
+    suma sobre el resultado de la primera. IVA y total salen del subtotal
+    devuelto.
+    """
+    orders = Order.__table__
+    subtotal_cents = type_coerce(orders.c.subtotal, BigInteger)
+    new_subtotal = object_session(order).execute(
+        update(orders)
+        .where(orders.c.id == order.id)
+        .values(subtotal=subtotal_cents + delta_cents)
+        .returning(subtotal_cents)
+    ).scalar_one()
+    set_order_totals(order, new_subtotal)
+
+
+def check_order_totals(repair: bool = False, status: str | None = None) -> list:
+    """
+    Compara los totales guardados de cada orden contra la suma de sus líneas
+    (calculada con un solo GROUP BY) y devuelve las órdenes que no coinciden.
+
+    Con `repair=True` corrige los totales, sube `version` en el mismo UPDATE
+    (el caché de tickets tiene la llave `(order_id, version)`, así no se
+    sirve el PDF con el total anterior) y, si la orden ya estaba cobrada,
+    corrige las ventas del día y por hora con la diferencia: se resta la
+    venta con los importes anteriores y se suma con los nuevos. Los
+    acumulados por producto salen de las líneas y no cambian.
+    """
+    line_sums = (
+        db.session.query(
+            OrderItem.order_id.label("order_id"),
+            func.sum(OrderItem.subtotal).label("lines_subtotal"),
+        )
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+
+    query = db.session.query(Order, line_sums.c.lines_subtotal).outerjoin(
+        line_sums, line_sums.c.order_id == Order.id
+    )
+    if status:
+        query = query.filter(Order.status == status)
+
+    drifting = []
+    to_repair = []
+    for order, lines_subtotal in query.yield_per(500):
+        expected = order_totals_cents(to_cents(lines_subtotal or 0))
+        stored = (to_cents(order.subtotal), to_cents(order.iva), to_cents(order.total))
+        if stored == expected:
+            continue
+
+        drifting.append(
+            {
+                "order_id": order.id,
+                "ticket_number": order.ticket_number,
+                "status": order.status,
+                "stored_total": float(order.total),
+                "expected_total": float(from_cents(expected[2])),
+            }
+        )
+        to_repair.append((order, expected[0]))
+
+    if repair and to_repair:
+        for order, subtotal_cents in to_repair:
+            completed = order.status == "completed"
+            if completed:
+                record_daily_sale(order, sign=-1)
+                record_order_sale(order, sign=-1)
+            set_order_totals(order, subtotal_cents)
+            order.version = Order.version + 1
+            if completed:
+                record_daily_sale(order)
+                record_order_sale(order)
+        db.session.commit()
+
+    return drifting
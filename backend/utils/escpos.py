@@ -0,0 +1,84 @@
+from utils.ticket_layout import build_layout
+
+ESC = b"\x1b"
+GS = b"\x1d"
+
+INIT = ESC + b"@"
+# ESC t 19: tabla de caracteres PC858 (Latin-1 con símbolo de euro)
+CODEPAGE = ESC + b"t\x13"
+ALIGN = {"left": ESC + b"a\x00", "center": ESC + b"a\x01"}
+BOLD_ON = ESC + b"E\x01"
+BOLD_OFF = ESC + b"E\x00"
+# GS ! n: 0x11 = doble ancho y alto, 0x01 = doble alto
+SIZE_NORMAL = GS + b"!\x00"
+SIZE_TITLE = GS + b"!\x11"
+SIZE_TOTAL = GS + b"!\x01"
+FEED_AND_CUT = ESC + b"d\x04" + GS + b"V\x42\x00"
+
+BOLD_STYLES = {"bold", "title", "total", "footer"}
+# Margen del layout (mm) -> columnas de sangría; 15mm alinea con el producto
+INDENT_COLUMNS = {5: 0, 10: 2, 15: 6}
+
+
+class EscPosGenerator:
+    """
+    Generador de tickets en ESC/POS crudo para impresoras térmicas de 80mm.
+
+    Usa el mismo layout que el PDF (`utils.ticket_layout`) con texto de
+    ancho fijo: 48 columnas en la fuente A.
+    """
+
+    def __init__(self, columns: int = 48, encoding: str = "cp858"):
+        self.columns = columns
+        self.encoding = encoding
+
+    def render(self, order_data: dict) -> bytes:
+        """
+        Genera el ticket de una orden como comandos ESC/POS.
+
+        Args:
+            order_data: Diccionario con datos de la orden.
+
+        Returns:
+            bytes: Comandos listos para enviar a la impresora.
+        """
+        out = bytearray(INIT + CODEPAGE)
+        for line in build_layout(order_data):
+            if line.kind == "separator":
+                out += ALIGN["left"] + self._encode("-" * self.columns) + b"\n"
+                continue
+
+            bold = line.style in BOLD_STYLES
+            if line.style == "title":
+                size, width = SIZE_TITLE, self.columns // 2
+            elif line.style == "total":
+                size, width = SIZE_TOTAL, self.columns
+            else:
+                size, width = SIZE_NORMAL, self.columns
+
+            out += ALIGN[line.align] + size
+            if bold:
+                out += BOLD_ON
+            out += self._encode(self._text(line, width)) + b"\n"
+            if bold:
+                out += BOLD_OFF
+            if size != SIZE_NORMAL:
+                out += SIZE_NORMAL
+
+        out += FEED_AND_CUT
+        return bytes(out)
+
+    def _text(self, line, width: int) -> str:
+        """Acomoda una línea del layout en `width` columnas."""
+        if line.kind == "item":
+            left = f"{line.quantity:<5} {line.text}"
+        else:
+            left = " " * INDENT_COLUMNS.get(line.x, 0) + line.text
+
+        if not line.right:
+            return left[:width]
+        room = width - len(line.right) - 1
+        return f"{left[:room]:<{room}} {line.right}"
+
+    def _encode(self, text: str) -> bytes:
+        return text.encode(self.encoding, errors="replace")
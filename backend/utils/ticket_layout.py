@@ -0,0 +1,128 @@
+from datetime import datetime
+from typing import NamedTuple
+
+RESTAURANT_NAME = "La Cantina Mexicana"
+RESTAURANT_INFO = ("RFC: CME123456ABC", "Guadalajara, Jalisco", "Tel: (33) 1234-5678")
+
+ORDER_TYPE_LABELS = {
+    "local": "Local",
+    "takeout": "Para llevar",
+    "delivery": "A domicilio",
+}
+
+PAYMENT_LABELS = {
+    "cash": "Efectivo",
+    "card": "Tarjeta",
+    "transfer": "Transferencia",
+}
+
+
+class TicketLine(NamedTuple):
+    """
+    Una línea del ticket, independiente del formato de salida.
+
+    - kind: "text", "item" (cantidad | texto | importe) o "separator".
+    - style: normal, bold, small, italic, title o total.
+    - x: margen izquierdo en mm (5 = margen, 10 = continuación, 15 = detalle).
+    - space: avance vertical en mm después de la línea (solo PDF).
+    """
+
+    kind: str
+    text: str = ""
+    right: str = ""
+    quantity: str = ""
+    style: str = "normal"
+    align: str = "left"
+    x: float = 5
+    space: float = 4
+
+
+def _separator() -> TicketLine:
+    return TicketLine("separator", space=6)
+
+
+def _split_address(address: str) -> list[str]:
+    """Divide una dirección larga en dos líneas (~35 caracteres la primera)."""
+    if len(address) <= 35:
+        return [address]
+    line1 = ""
+    line2 = ""
+    for word in address.split():
+        if len(line1 + word) < 35:
+            line1 += word + " "
+        else:
+            line2 += word + " "
+    return [line1.strip(), line2.strip()] if line2 else [line1.strip()]
+
+
+def build_layout(order_data: dict) -> list[TicketLine]:
+    """
+    Arma las líneas del ticket (encabezado, datos de la orden, items,
+    totales, pago y pie) a partir de los datos de la orden. Los
+    generadores PDF y ESC/POS dibujan estas mismas líneas.
+    """
+    lines = [TicketLine("text", RESTAURANT_NAME, style="title", align="center", space=5)]
+    for index, info in enumerate(RESTAURANT_INFO):
+        last = index == len(RESTAURANT_INFO) - 1
+        lines.append(TicketLine("text", info, align="center", space=6 if last else 4))
+    lines.append(_separator())
+
+    # Información del ticket
+    lines.append(TicketLine("text", f"Ticket: #{order_data['ticket_number']:04d}"))
+    lines.append(TicketLine("text", f"Cliente: {order_data['customer_name']}"))
+    order_type = order_data.get("order_type") or "local"
+    lines.append(
+        TicketLine("text", f"Tipo: {ORDER_TYPE_LABELS.get(order_type, 'Local')}", style="bold")
+    )
+
+    # Si es delivery, mostrar info adicional
+    if order_type == "delivery":
+        delivery = []
+        if order_data.get("delivery_phone"):
+            delivery.append(TicketLine("text", f"Tel: {order_data['delivery_phone']}",
+                                       style="small", space=3.5))
+        if order_data.get("delivery_address"):
+            first, *rest = _split_address(order_data["delivery_address"])
+            delivery.append(TicketLine("text", f"Dir: {first}", style="small", space=3.5))
+            for continuation in rest:
+                delivery.append(TicketLine("text", continuation, style="small", x=10, space=3.5))
+        if delivery:
+            delivery[-1] = delivery[-1]._replace(space=delivery[-1].space + 1)
+        else:
+            lines[-1] = lines[-1]._replace(space=lines[-1].space + 1)
+        lines.extend(delivery)
+
+    printed_at = order_data.get("date") or datetime.now()
+    lines.append(TicketLine("text", f"Fecha: {printed_at.strftime('%d/%m/%Y %H:%M')}", space=6))
+    lines.append(_separator())
+
+    # Items
+    lines.append(TicketLine("item", "Producto", "Total", quantity="Cant.", style="bold", space=5))
+    for item in order_data["items"]:
+        lines.append(TicketLine(
+            "item",
+            item["name"][:25],
+            f"${item['price'] * item['quantity']:.2f}",
+            quantity=f"{item['quantity']}",
+        ))
+        lines.append(TicketLine("text", f"${item['price']:.2f} c/u", style="small", x=15))
+        if item.get("notes"):
+            lines.append(TicketLine("text", f"Nota: {item['notes'][:30]}", style="italic", x=15))
+        lines[-1] = lines[-1]._replace(space=lines[-1].space + 2)
+    lines.append(_separator())
+
+    # Totales
+    lines.append(TicketLine("text", "Subtotal:", f"${order_data['subtotal']:.2f}"))
+    lines.append(TicketLine("text", "IVA (16%):", f"${order_data['iva']:.2f}", space=6))
+    lines.append(TicketLine("text", "TOTAL:", f"${order_data['total']:.2f}", style="total", space=6))
+
+    payment_method = order_data.get("payment_method") or "cash"
+    lines.append(
+        TicketLine("text", f"Pago: {PAYMENT_LABELS.get(payment_method, 'Efectivo')}", space=8)
+    )
+    lines.append(_separator())
+
+    # Pie de página
+    lines.append(TicketLine("text", "¡Gracias por su preferencia!", style="footer", align="center"))
+    lines.append(TicketLine("text", "Vuelva pronto", align="center"))
+    return lines